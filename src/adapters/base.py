@@ -1,7 +1,59 @@
 # adapters/base.py
+
+# Motores disponíveis em 'processing.backend' (módulo, classe), importados sob demanda
+ADAPTERS = {
+    "pandas": ("adapters.pandas_adapter", "PandasAdapter"),
+    "duckdb": ("adapters.duckdb_adapter", "DuckDBAdapter"),
+}
+
+
 class DataFrameAdapter:
+    """
+    Interface comum dos motores de dados.
+
+    `read` devolve o objeto nativo do motor (DataFrame no pandas, relação lazy no DuckDB);
+    as demais operações recebem e devolvem esse mesmo objeto, e `to_pandas` materializa o
+    resultado. `source` é o nome de uma fonte do config.yaml ou o caminho de um arquivo.
+    Condições de `where` são expressões no dialeto do motor.
+
+    `duplicates` e `compare` produzem os mesmos DataFrames de quality.duplicates e
+    py_processor.compare, independentemente do motor.
+    """
+
+    name = None
+
+    def __init__(self, config=None):
+        self.config = config or {}
+
     def read(self, source): ...
     def select(self, df, columns): ...
+    def where(self, df, condition): ...
     def groupby(self, df, cols): ...
-    def join(self, df1, df2): ...
-    def count(self, df): ...
\ No newline at end of file
+    def join(self, df1, df2, on, how="inner"): ...
+    def count(self, df): ...
+    def to_pandas(self, df): ...
+    def duplicates(self, df, key_columns, kind=True): ...
+    def compare(self, df1, df2, key_columns): ...
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def get_adapter(config, backend=None):
+    """
+    Instancia o motor de 'processing.backend' (ou `backend`) com as opções da seção de mesmo nome.
+    """
+    import importlib
+
+    backend = (backend or (config.get("processing") or {}).get("backend") or "pandas").lower()
+    if backend not in ADAPTERS:
+        raise ValueError(f"Motor '{backend}' não suportado. Use: {', '.join(ADAPTERS)}.")
+    module, cls = ADAPTERS[backend]
+    return getattr(importlib.import_module(module), cls)(config, **(config.get(backend) or {}))
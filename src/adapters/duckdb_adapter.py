@@ -0,0 +1,293 @@
+# adapters/duckdb_adapter.py
+import itertools
+from pathlib import Path
+
+import pandas as pd
+
+from adapters.base import DataFrameAdapter
+from py_processor.compare import DIFF_COLUMN, DIFF_VALUE_A, DIFF_VALUE_B
+from py_processor.loader import check_where, detect_encoding, load_database, load_file, resolve_path
+from py_processor.utils.tratamentos import normalize_column_names_list
+from quality.duplicates import COUNT_COLUMN, GROUP_COLUMN, KIND_COLUMN, ROW_COLUMN
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Textos lidos como nulo, os mesmos do pandas.read_csv (nulos viram "" na comparação)
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+# Encodings lidos diretamente pelo leitor de CSV do DuckDB (os demais passam pelo pandas)
+CSV_ENCODINGS = {"utf-8": "utf-8", "utf-8-sig": "utf-8", "latin1": "latin-1", "iso-8859-1": "latin-1"}
+
+# Colunas auxiliares usadas nas consultas (não aparecem nos resultados)
+_ROW = "__row"
+
+_views = itertools.count()
+
+
+def quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _text(expr):
+    # Mesma normalização da comparação no pandas: texto, nulos como ""
+    return f"coalesce(CAST({expr} AS VARCHAR), '')"
+
+
+class DuckDBAdapter(DataFrameAdapter):
+    """
+    Motor out-of-core sobre DuckDB.
+
+    `read` devolve relações lazy: nada é lido até o resultado ser pedido, e projeções e
+    filtros ('where' da fonte) são empurrados para a leitura dos arquivos (CSV, Parquet,
+    JSON). Joins e agregações rodam em paralelo (`threads`) e usam disco
+    (`temp_directory`) quando passam de `memory_limit`.
+
+    A posição de cada linha na origem (LINHA_ORIGEM e o critério de "última ocorrência"
+    da comparação) segue a ordem de leitura, preservada pelo DuckDB
+    (preserve_insertion_order).
+
+    Args:
+        config (dict): Configuração geral (fontes em 'sources').
+        threads (int): Threads do DuckDB. Padrão: núcleos da máquina.
+        memory_limit (str): Limite de memória (ex: '2GB'). Padrão: processing.memory_limit.
+        temp_directory (str): Diretório de spill. Padrão: processing.spill_directory.
+        database (str): Arquivo do banco DuckDB. Padrão: em memória.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, config=None, threads=None, memory_limit=None, temp_directory=None, database=":memory:"):
+        super().__init__(config)
+        if duckdb is None:
+            raise ImportError("O motor 'duckdb' requer o pacote 'duckdb'.")
+
+        processing = self.config.get("processing") or {}
+        memory_limit = memory_limit or processing.get("memory_limit")
+        temp_directory = temp_directory or processing.get("spill_directory")
+
+        settings = {"preserve_insertion_order": True}
+        if threads:
+            settings["threads"] = int(threads)
+        if memory_limit:
+            settings["memory_limit"] = str(memory_limit)
+        if temp_directory:
+            settings["temp_directory"] = str(resolve_path(temp_directory))
+        self.con = duckdb.connect(database, config=settings)
+
+    def close(self):
+        self.con.close()
+
+    # ---------------- Leitura ----------------
+
+    def read(self, source):
+        sources = self.config.get("sources") or {}
+        if source not in sources:
+            return self._normalized(self._scan(Path(source), {}))
+
+        source_cfg = sources[source]
+        if source_cfg.get("type") == "database":
+            return self._normalized(self.con.from_df(load_database(self.config, source)), source_cfg)
+
+        path = resolve_path(source_cfg["file_path"])
+        if not path.exists():
+            raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+        rel = self._scan(path, source_cfg)
+        if rel is None:
+            rel = self.con.from_df(load_file(self.config, source))
+
+        where = check_where(source_cfg.get("where"), source)
+        if where:
+            rel = rel.filter(where)
+        return self._normalized(rel, source_cfg)
+
+    def _scan(self, path, source_cfg):
+        # Leitura lazy do arquivo; None quando o formato precisa passar pelo pandas
+        ext = path.suffix.lower()
+        if ext in (".csv", ".txt"):
+            encoding = detect_encoding(path, [source_cfg.get("encoding", "utf-8"), "utf-8-sig", "latin1", "cp1252"])
+            if encoding.lower() not in CSV_ENCODINGS:
+                return None
+            return self.con.read_csv(
+                str(path),
+                sep=source_cfg.get("separator", ","),
+                header=True,
+                all_varchar=True,
+                encoding=CSV_ENCODINGS[encoding.lower()],
+                na_values=NA_VALUES,
+            )
+        if ext == ".parquet":
+            return self.con.read_parquet(str(path))
+        if ext in (".jsonl", ".ndjson"):
+            return self.con.read_json(str(path), format="newline_delimited")
+        if ext == ".json":
+            return self.con.read_json(str(path))
+        if not source_cfg:
+            return self.con.from_df(pd.read_excel(path, dtype=str))
+        return None
+
+    def _normalized(self, rel, source_cfg=None):
+        # Nomes de colunas no mesmo padrão do loader; 'columns' da fonte limita a projeção
+        names = normalize_column_names_list(rel.columns)
+        columns = list(zip(rel.columns, names))
+        wanted = normalize_column_names_list((source_cfg or {}).get("columns") or [])
+        if wanted:
+            columns = [(col, name) for col, name in columns if name in wanted]
+        if all(col == name for col, name in columns) and len(columns) == len(rel.columns):
+            return rel
+        return rel.project(", ".join(f"{quote_ident(col)} AS {quote_ident(name)}" for col, name in columns))
+
+    def _relation(self, df):
+        return self.con.from_df(df) if isinstance(df, pd.DataFrame) else df
+
+    # ---------------- Operações ----------------
+
+    def select(self, df, columns):
+        return self._relation(df).project(", ".join(quote_ident(col) for col in columns))
+
+    def where(self, df, condition):
+        return self._relation(df).filter(condition)
+
+    def groupby(self, df, cols):
+        cols = ", ".join(quote_ident(col) for col in cols)
+        return self._relation(df).aggregate(f"{cols}, count(*) AS {COUNT_COLUMN}", cols)
+
+    def join(self, df1, df2, on, how="inner"):
+        condition = " AND ".join(f"a.{quote_ident(col)} = b.{quote_ident(col)}" for col in on)
+        return self._relation(df1).set_alias("a").join(self._relation(df2).set_alias("b"), condition, how=how)
+
+    def count(self, df):
+        return self._relation(df).aggregate("count(*)").fetchone()[0]
+
+    def to_pandas(self, df):
+        return self._relation(df).df()
+
+    def _view(self, df):
+        name = f"__datalyzer_{next(_views)}"
+        self._relation(df).create_view(name, replace=True)
+        return name
+
+    def _drop(self, *views):
+        for view in views:
+            self.con.execute(f"DROP VIEW IF EXISTS {view}")
+
+    # ---------------- Duplicidade e comparação ----------------
+
+    def duplicates(self, df, key_columns, kind=True):
+        """
+        Mesmo resultado de quality.duplicates.analyze_duplicates (com DUPLICIDADE quando `kind`).
+        """
+        rel = self._relation(df)
+        key_columns = normalize_column_names_list(key_columns)
+        if not key_columns:
+            raise ValueError("Nenhuma chave primária definida para validação de duplicidade.")
+
+        columns = rel.columns
+        value_columns = [col for col in columns if col not in key_columns]
+        keys = [f"__k{i}" for i in range(len(key_columns))]
+        row_hash = f"hash({', '.join(_text(quote_ident(col)) for col in value_columns)})" if value_columns else "0"
+
+        view = self._view(rel)
+        try:
+            sql = f"""
+            WITH src AS (
+                SELECT *, row_number() OVER () - 1 AS {_ROW},
+                       {", ".join(f"{_text(quote_ident(col))} AS {k}" for col, k in zip(key_columns, keys))},
+                       {row_hash} AS __hash
+                FROM {view}
+            ),
+            groups AS (
+                SELECT {", ".join(keys)}, count(*) AS __count, min({_ROW}) AS __first,
+                       count(DISTINCT __hash) AS __hashes
+                FROM src
+                GROUP BY {", ".join(keys)}
+                HAVING count(*) > 1
+            )
+            SELECT {", ".join(f"s.{quote_ident(col)}" for col in columns)},
+                   dense_rank() OVER (ORDER BY g.__first) AS {GROUP_COLUMN},
+                   g.__count AS {COUNT_COLUMN},
+                   s.{_ROW} AS {ROW_COLUMN}
+                   {f", CASE WHEN g.__hashes = 1 THEN 'EXATA' ELSE 'DIVERGENTE' END AS {KIND_COLUMN}" if kind else ""}
+            FROM src s
+            JOIN groups g USING ({", ".join(keys)})
+            ORDER BY {GROUP_COLUMN}, {ROW_COLUMN}
+            """
+            return self.con.sql(sql).df()
+        finally:
+            self._drop(view)
+
+    def compare(self, df1, df2, key_columns):
+        """
+        Mesmo resultado de py_processor.compare.compare_columnar: (somente em A, somente em B,
+        diferenças), com a última ocorrência de cada chave no pareamento.
+        """
+        rel_a, rel_b = self._relation(df1), self._relation(df2)
+        key_columns = normalize_column_names_list(key_columns)
+        if not key_columns:
+            raise ValueError("Nenhuma coluna-chave definida para a comparação.")
+        for rel, source in ((rel_a, "origem A"), (rel_b, "origem B")):
+            missing = [col for col in key_columns if col not in rel.columns]
+            if missing:
+                raise KeyError(f"Colunas-chave ausentes na {source}: {missing}")
+
+        columns_a, columns_b = rel_a.columns, rel_b.columns
+        value_columns = [col for col in columns_a if col in columns_b and col not in key_columns]
+        keys = [f"__k{i}" for i in range(len(key_columns))]
+        using = ", ".join(keys)
+        normalized_keys = ", ".join(f"{_text(quote_ident(col))} AS {k}" for col, k in zip(key_columns, keys))
+
+        view_a, view_b = self._view(rel_a), self._view(rel_b)
+        numbered = f"""
+            a AS (SELECT *, row_number() OVER () - 1 AS {_ROW}, {normalized_keys} FROM {view_a}),
+            b AS (SELECT *, row_number() OVER () - 1 AS {_ROW}, {normalized_keys} FROM {view_b}),
+            a_keys AS (SELECT {using}, min({_ROW}) AS __first, max({_ROW}) AS __last FROM a GROUP BY {using}),
+            b_keys AS (SELECT {using}, max({_ROW}) AS __last FROM b GROUP BY {using})
+        """
+        try:
+            only_a = self.con.sql(f"""
+                WITH {numbered}
+                SELECT {", ".join(quote_ident(col) for col in columns_a)}
+                FROM a ANTI JOIN b_keys USING ({using})
+                ORDER BY {_ROW}
+            """).df()
+            only_b = self.con.sql(f"""
+                WITH {numbered}
+                SELECT {", ".join(quote_ident(col) for col in columns_b)}
+                FROM b ANTI JOIN a_keys USING ({using})
+                ORDER BY {_ROW}
+            """).df()
+
+            result_columns = list(key_columns) + [DIFF_COLUMN, DIFF_VALUE_A, DIFF_VALUE_B]
+            if not value_columns:
+                return only_a, only_b, pd.DataFrame(columns=result_columns)
+
+            # Uma linha por (par, coluna) divergente: as colunas viram uma lista de structs
+            cells = ", ".join(
+                f"{{'pos': {i}, 'col': '{col.replace(chr(39), chr(39) * 2)}', "
+                f"'va': {_text('pa.' + quote_ident(col))}, 'vb': {_text('pb.' + quote_ident(col))}}}"
+                for i, col in enumerate(value_columns)
+            )
+            differences = self.con.sql(f"""
+                WITH {numbered},
+                cells AS (
+                    SELECT {", ".join(f"pa.{quote_ident(col)}" for col in key_columns)},
+                           ak.__first, unnest([{cells}]) AS cell
+                    FROM a_keys ak
+                    JOIN b_keys bk USING ({using})
+                    JOIN a pa ON pa.{_ROW} = ak.__last
+                    JOIN b pb ON pb.{_ROW} = bk.__last
+                )
+                SELECT {", ".join(quote_ident(col) for col in key_columns)},
+                       cell.col AS {DIFF_COLUMN}, cell.va AS {DIFF_VALUE_A}, cell.vb AS {DIFF_VALUE_B}
+                FROM cells
+                WHERE cell.va <> cell.vb
+                ORDER BY cell.pos, __first
+            """).df()
+            return only_a, only_b, differences
+        finally:
+            self._drop(view_a, view_b)
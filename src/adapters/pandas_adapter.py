@@ -1,9 +1,43 @@
 # adapters/pandas_adapter.py
 import pandas as pd
 
-class PandasAdapter:
+from adapters.base import DataFrameAdapter
+from py_processor.compare import compare_columnar
+from py_processor.loader import load_database, load_file
+from quality.duplicates import COUNT_COLUMN, analyze_duplicates
+
+
+class PandasAdapter(DataFrameAdapter):
+    name = "pandas"
+
     def read(self, source):
+        sources = self.config.get("sources") or {}
+        if source in sources:
+            if sources[source].get("type") == "database":
+                return load_database(self.config, source)
+            return load_file(self.config, source)
         return pd.read_csv(source)
 
+    def select(self, df, columns):
+        return df[list(columns)]
+
+    def where(self, df, condition):
+        return df.query(condition)
+
+    def groupby(self, df, cols):
+        return df.groupby(list(cols), dropna=False).size().reset_index(name=COUNT_COLUMN)
+
+    def join(self, df1, df2, on, how="inner"):
+        return df1.merge(df2, on=list(on), how=how, suffixes=("_A", "_B"))
+
     def count(self, df):
-        return len(df)
\ No newline at end of file
+        return len(df)
+
+    def to_pandas(self, df):
+        return df
+
+    def duplicates(self, df, key_columns, kind=True):
+        return analyze_duplicates(df, key_columns, fingerprints=True if kind else None)
+
+    def compare(self, df1, df2, key_columns):
+        return compare_columnar(df1, df2, key_columns)
@@ -0,0 +1,181 @@
+# ------------------------------------------------------------
+# Gerador de dados sintéticos no formato das origens (pagamentos de benefícios)
+# ------------------------------------------------------------
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from py_processor.loader import resolve_path
+
+# Colunas geradas, na ordem dos arquivos de origem
+COLUMNS = [
+      "MES_COMPETENCIA"
+    , "MES_REFERENCIA"
+    , "UF"
+    , "CODIGO_MUNICIPIO_SIAFI"
+    , "NOME_MUNICIPIO"
+    , "CPF_FAVORECIDO"
+    , "NIS_FAVORECIDO"
+    , "NOME_FAVORECIDO"
+    , "VALOR PARCELA"
+]
+
+KEY_COLUMNS = ["MES_REFERENCIA", "NIS_FAVORECIDO", "VALOR PARCELA"]
+
+# Colunas alteradas na origem B para simular divergências
+MISMATCH_COLUMNS = ["NOME_MUNICIPIO", "NOME_FAVORECIDO", "UF"]
+
+UFS = np.array([
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO"
+])
+MONTHS = np.array([f"2024{m:02d}" for m in range(1, 13)])
+FIRST_NAMES = np.array([
+    "MARIA", "JOSE", "ANA", "JOAO", "ANTONIO", "FRANCISCA", "FRANCISCO", "ADRIANA",
+    "CARLOS", "JULIANA", "PAULO", "MARCIA", "PEDRO", "ALINE", "LUCAS", "SANDRA"
+])
+LAST_NAMES = np.array([
+    "SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "RODRIGUES", "FERREIRA", "ALVES", "PEREIRA",
+    "LIMA", "GOMES", "COSTA", "RIBEIRO", "MARTINS", "CARVALHO", "ALMEIDA", "LOPES"
+])
+N_MUNICIPIOS = 5570
+
+# Linhas geradas por bloco (limita a memória na geração de 10M de linhas)
+BLOCK_ROWS = 1_000_000
+
+# Multiplicador ímpar e não múltiplo de 5: i -> (i * NIS_MULTIPLIER) mod 10^11 é uma bijeção,
+# então NIS distintos para cada linha gerada, sem colisões entre blocos
+NIS_MULTIPLIER = 2654435761
+
+
+def parse_rows(value) -> int:
+    """
+    Converte '100k', '1M', '10M' ou '2500' em número de linhas.
+    """
+    text = str(value).strip().upper().replace("_", "")
+    factor = {"K": 1_000, "M": 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if factor > 1 else text
+    return int(float(number) * factor)
+
+
+def _base_rows(rng: np.random.Generator, start: int, size: int) -> pd.DataFrame:
+    ids = np.arange(start, start + size, dtype=np.int64)
+    municipio = rng.integers(0, N_MUNICIPIOS, size)
+    cpf = rng.integers(0, 10**6, size)
+    valor = rng.integers(4_000, 140_000, size) * 5  # centavos
+    return pd.DataFrame({
+          "MES_COMPETENCIA": rng.choice(MONTHS, size)
+        , "MES_REFERENCIA": rng.choice(MONTHS, size)
+        , "UF": UFS[municipio % len(UFS)]
+        , "CODIGO_MUNICIPIO_SIAFI": pd.Series(municipio + 1000).astype(str).str.zfill(4).to_numpy()
+        , "NOME_MUNICIPIO": pd.Series(municipio).map("MUNICIPIO {}".format).to_numpy()
+        , "CPF_FAVORECIDO": pd.Series(cpf).map(lambda c: f"***.{c // 1000:03d}.{c % 1000:03d}-**").to_numpy()
+        , "NIS_FAVORECIDO": pd.Series((ids * NIS_MULTIPLIER) % 10**11).astype(str).str.zfill(11).to_numpy()
+        , "NOME_FAVORECIDO": np.char.add(np.char.add(rng.choice(FIRST_NAMES, size), " "), rng.choice(LAST_NAMES, size))
+        , "VALOR PARCELA": pd.Series(valor).map(lambda v: f"{v // 100},{v % 100:02d}").to_numpy()
+    }, columns=COLUMNS)
+
+
+def _with_duplicates(rng: np.random.Generator, df: pd.DataFrame, rate: float) -> pd.DataFrame:
+    # Repete chaves de linhas sorteadas; metade das repetições é idêntica, metade diverge no nome
+    n = int(round(len(df) * rate))
+    if n == 0:
+        return df
+    copies = df.iloc[rng.integers(0, len(df), n)].copy()
+    divergent = rng.random(n) < 0.5
+    copies.loc[divergent, "NOME_FAVORECIDO"] = copies.loc[divergent, "NOME_FAVORECIDO"] + " JUNIOR"
+    return pd.concat([df, copies], ignore_index=True)
+
+
+def generate_block(seed: int, start: int, size: int, duplicate_rate: float = 0.01,
+                   mismatch_rate: float = 0.01, missing_rate: float = 0.01) -> tuple:
+    """
+    Gera um bloco das origens A e B.
+
+    A origem B parte das mesmas linhas da origem A, com:
+    - `missing_rate` das linhas de A ausentes em B, e a mesma quantidade de linhas novas só em B;
+    - `mismatch_rate` das linhas em comum com uma coluna alterada (MISMATCH_COLUMNS);
+    - `duplicate_rate` de linhas com chave repetida, sorteadas de forma independente em A e em B;
+    - ordem das linhas embaralhada.
+
+    Returns:
+        tuple: (origem A, origem B), pd.DataFrame com todas as colunas em texto.
+    """
+    rng = np.random.default_rng([seed, start])
+    df_a = _base_rows(rng, start, size)
+
+    missing = rng.random(size) < missing_rate
+    df_b = df_a[~missing].reset_index(drop=True)
+
+    mismatch = np.flatnonzero(rng.random(len(df_b)) < mismatch_rate)
+    columns = rng.choice(MISMATCH_COLUMNS, len(mismatch))
+    for col in MISMATCH_COLUMNS:
+        rows = mismatch[columns == col]
+        df_b.loc[rows, col] = df_b.loc[rows, col] + "_ALTERADO"
+
+    # Linhas novas usam ids além do total gerado em A (offset fixo por bloco)
+    extra = _base_rows(rng, 10**10 + start, int(missing.sum()))
+    df_b = pd.concat([df_b, extra], ignore_index=True)
+
+    df_a = _with_duplicates(rng, df_a, duplicate_rate)
+    df_b = _with_duplicates(rng, df_b, duplicate_rate)
+    df_b = df_b.iloc[rng.permutation(len(df_b))].reset_index(drop=True)
+    return df_a, df_b
+
+
+def dataset_paths(directory, rows: int, seed: int, duplicate_rate: float, mismatch_rate: float,
+                  missing_rate: float) -> tuple:
+    name = f"{rows}_s{seed}_d{duplicate_rate:g}_m{mismatch_rate:g}_x{missing_rate:g}"
+    directory = Path(directory)
+    return directory / f"origemA_{name}.csv", directory / f"origemB_{name}.csv"
+
+
+def write_dataset(directory, rows: int, seed: int = 42, duplicate_rate: float = 0.01,
+                  mismatch_rate: float = 0.01, missing_rate: float = 0.01, overwrite: bool = False) -> tuple:
+    """
+    Grava as origens A e B (CSV ';', UTF-8) em blocos de BLOCK_ROWS linhas.
+
+    O resultado depende apenas dos parâmetros (mesma semente, mesmos arquivos); arquivos
+    já gerados com os mesmos parâmetros são reaproveitados.
+
+    Returns:
+        tuple: (caminho da origem A, caminho da origem B).
+    """
+    path_a, path_b = dataset_paths(directory, rows, seed, duplicate_rate, mismatch_rate, missing_rate)
+    if path_a.exists() and path_b.exists() and not overwrite:
+        return path_a, path_b
+
+    path_a.parent.mkdir(parents=True, exist_ok=True)
+    tmp_a, tmp_b = path_a.with_suffix(".tmp"), path_b.with_suffix(".tmp")
+    for start in range(0, rows, BLOCK_ROWS):
+        size = min(BLOCK_ROWS, rows - start)
+        df_a, df_b = generate_block(seed, start, size, duplicate_rate, mismatch_rate, missing_rate)
+        first = start == 0
+        df_a.to_csv(tmp_a, sep=";", index=False, header=first, mode="w" if first else "a", encoding="utf-8")
+        df_b.to_csv(tmp_b, sep=";", index=False, header=first, mode="w" if first else "a", encoding="utf-8")
+    tmp_a.replace(path_a)
+    tmp_b.replace(path_b)
+    return path_a, path_b
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera origens A/B sintéticas para os benchmarks.")
+    parser.add_argument("--rows", default="100k", help="Linhas da origem A (ex: 100k, 1M, 10M).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--mismatch-rate", type=float, default=0.01)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    parser.add_argument("--output", default="data/benchmarks/input", help="Diretório dos arquivos gerados (relativo à raiz do projeto).")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args(argv)
+
+    paths = write_dataset(resolve_path(args.output), parse_rows(args.rows), args.seed, args.duplicate_rate,
+                          args.mismatch_rate, args.missing_rate, args.overwrite)
+    for path in paths:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,26 @@
 # src/connectors/postgres.py
 
 import psycopg2
+from sqlalchemy.engine import URL
+
+
+def postgres_url(host, port, dbname, user, password):
+    return URL.create(
+        "postgresql+psycopg2",
+        username=user,
+        password=password,
+        host=host,
+        port=port,
+        database=dbname,
+    )
 
 
 class PostgresConnector:
-    def __init__(self, host, port, dbname, user, password):
+    def __init__(self, host=None, port=None, dbname=None, user=None, password=None, connection=None):
+        # Com `connection` (ex: conexão do pool do registro), close() a devolve ao pool
+        if connection is not None:
+            self.conn = connection
+            return
         self.conn = psycopg2.connect(
             host=host,
             port=port,
@@ -13,12 +29,23 @@ class PostgresConnector:
             password=password
         )
 
-    def query(self, sql):
+    @classmethod
+    def pooled(cls, registry, host, port, dbname, user, password):
+        url = postgres_url(host, port, dbname, user, password)
+        return cls(connection=registry.raw_connection(url))
+
+    def query(self, sql, params=None):
         with self.conn.cursor() as cur:
-            cur.execute(sql)
+            cur.execute(sql, params)
             cols = [desc[0] for desc in cur.description]
             rows = cur.fetchall()
             return [dict(zip(cols, row)) for row in rows]
 
+    def rollback(self):
+        self.conn.rollback()
+
+    def dsn_parameters(self):
+        return self.conn.get_dsn_parameters()
+
     def close(self):
         self.conn.close()
\ No newline at end of file
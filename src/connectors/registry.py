@@ -0,0 +1,122 @@
+# src/connectors/registry.py
+
+import threading
+import time
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+
+# Opções padrão dos pools (seção 'connections' do config.yaml)
+DEFAULT_POOL_OPTIONS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pre_ping": True,
+    "idle_timeout": 300,
+    "recycle": 1800,
+}
+
+
+class ConnectorRegistry:
+    """
+    Engines SQLAlchemy (com pool de conexões) compartilhados por destino de conexão.
+
+    Cada URL recebe um único engine, criado no primeiro uso e reaproveitado por loader,
+    pushdown e profilers, de modo que o custo de abrir conexões é pago uma vez por
+    destino e não a cada consulta.
+
+    Opções:
+        pool_size (int): Conexões mantidas abertas por destino.
+        max_overflow (int): Conexões extras permitidas em picos (fechadas ao serem devolvidas).
+        pool_timeout (int): Segundos de espera por uma conexão livre.
+        pre_ping (bool): Testa a conexão antes de entregá-la (descarta conexões caídas).
+        idle_timeout (int): Conexões ociosas há mais que isso (segundos) são reabertas.
+        recycle (int): Idade máxima (segundos) de uma conexão.
+    """
+
+    def __init__(self, options=None):
+        self.options = {**DEFAULT_POOL_OPTIONS, **(options or {})}
+        unknown = set(self.options) - set(DEFAULT_POOL_OPTIONS)
+        if unknown:
+            raise ValueError(f"Opções de conexão desconhecidas: {', '.join(sorted(unknown))}")
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def engine(self, url):
+        """
+        Engine (com pool) do destino `url`, criado no primeiro uso.
+        """
+        key = make_url(url).render_as_string(hide_password=False)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = self._create_engine(key)
+                self._engines[key] = engine
+            return engine
+
+    def raw_connection(self, url):
+        """
+        Conexão DBAPI do pool; close() a devolve ao pool em vez de fechá-la.
+        """
+        return self.engine(url).raw_connection()
+
+    def _create_engine(self, url):
+        engine = create_engine(
+            url,
+            pool_size=self.options["pool_size"],
+            max_overflow=self.options["max_overflow"],
+            pool_timeout=self.options["pool_timeout"],
+            pool_pre_ping=self.options["pre_ping"],
+            pool_recycle=self.options["recycle"] or -1,
+        )
+
+        idle_timeout = self.options["idle_timeout"]
+        if idle_timeout:
+            # Marca a devolução ao pool; na retirada, conexão ociosa demais é descartada e reaberta
+            @event.listens_for(engine, "checkin")
+            def _checkin(dbapi_connection, record):
+                if record is not None:
+                    record.info["checkin_time"] = time.monotonic()
+
+            @event.listens_for(engine, "checkout")
+            def _checkout(dbapi_connection, record, proxy):
+                checkin_time = record.info.pop("checkin_time", None)
+                if checkin_time is not None and time.monotonic() - checkin_time > idle_timeout:
+                    raise exc.DisconnectionError("Conexão ociosa além de idle_timeout")
+
+        return engine
+
+    def dispose(self, url=None):
+        """
+        Fecha as conexões do pool de um destino (ou de todos).
+        """
+        with self._lock:
+            if url is None:
+                keys = list(self._engines)
+            else:
+                keys = [make_url(url).render_as_string(hide_password=False)]
+            for key in keys:
+                engine = self._engines.pop(key, None)
+                if engine is not None:
+                    engine.dispose()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(config=None):
+    """
+    Registro de conexões do processo.
+
+    Com `config`, usa as opções da seção 'connections'; se elas diferirem das do registro
+    atual, os pools antigos são fechados e um novo registro é criado.
+    """
+    global _registry
+    options = {**DEFAULT_POOL_OPTIONS, **((config or {}).get("connections") or {})}
+    with _registry_lock:
+        if _registry is None or (config is not None and _registry.options != options):
+            if _registry is not None:
+                _registry.dispose()
+            _registry = ConnectorRegistry(options)
+        return _registry
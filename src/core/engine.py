@@ -19,21 +19,55 @@
 # src/core/engine.py
 
 # from connectors.postgres import PostgresConnector
+from pathlib import Path
+
 from src.connectors.postgres import PostgresConnector
-from profiling.schema_profiler import SchemaProfiler
+from connectors.registry import get_registry
+from profiling.schema_profiler import SchemaProfiler, CatalogProfiler
+from profiling.table_profiler import TableProfiler
+
+# Perfis de schema guardados entre execuções (invalidados pelo digest do catálogo)
+PROFILE_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "cache" / "profiles"
 
 
 class DataEngine:
 
-    def __init__(self, config):
+    def __init__(self, config, registry=None):
         self.config = config
+        self.registry = registry or get_registry()
+
+    def connect(self):
+        # Conexão do pool compartilhado; close() a devolve ao pool
+        return PostgresConnector.pooled(self.registry, **self.config)
+
+    def run_schema_profile(self, schemas=None, tables=None, use_cache=True, backend="catalog"):
+        conn = self.connect()
 
-    def run_schema_profile(self):
-        conn = PostgresConnector(**self.config)
+        try:
+            if backend == "information_schema":
+                profiler = SchemaProfiler(conn)
+            else:
+                profiler = CatalogProfiler(
+                    conn,
+                    schemas=schemas,
+                    tables=tables,
+                    cache_dir=PROFILE_CACHE_DIR if use_cache else None,
+                )
+            result = profiler.run_full_profile()
+        finally:
+            conn.close()
 
-        profiler = SchemaProfiler(conn)
-        result = profiler.run_full_profile()
+        return result
 
-        conn.close()
+    def run_table_profile(self, tables=None, schemas=None, max_connections=4, sample_percent=None, use_stats=False):
+        # Sem lista de tabelas, perfila as tabelas do catálogo (filtradas por schema)
+        if tables is None:
+            tables = self.run_schema_profile(schemas=schemas)["tables"]
 
-        return result
\ No newline at end of file
+        profiler = TableProfiler(
+            self.connect,
+            max_connections=max_connections,
+            sample_percent=sample_percent,
+            use_stats=use_stats,
+        )
+        return profiler.run(tables)
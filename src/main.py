@@ -3,35 +3,322 @@ import pandas as pd
 import logging
 from pathlib import Path
 from py_processor.utils.tratamentos import normalize_column_names_list , infer_column_types
-from py_processor.loader import load_config, load_file, load_database
-from py_processor.validator import check_duplicates
+from py_processor.loader import load_config, load_file, load_database, resolve_path, iter_source, get_chunk_size, source_cache_key
 import py_processor.rust_bridge as rust_bridge
+from py_processor.compare import compare_sources
+from py_processor.key_index import KeyIndex
+from py_processor.compact import compact_sources, load_compact, DEFAULT_CATEGORY_RATIO
+from quality.duplicates import analyze_duplicates, partition_duplicates, merge_duplicates
+from quality.stats import collect_stats, validate_unique_percentage
+from quality.nulls import validate_null_percentage
+from py_processor.partitioning import iter_partition_pairs, fits_in_memory
+from py_processor.parallel import parallel_compare
+from py_processor.fingerprint import compute_fingerprints, save_fingerprints, load_fingerprints, fingerprints_for
+from py_processor.output import open_output
+from py_processor.incremental import get_snapshot_store, get_watermarks, incremental_compare
+from py_processor.pushdown import PushdownSource, resolve_value_columns, pushdown_compare, duplicate_rows
+from py_processor.reconcile import SqlReconciliation
+from py_processor.scheduler import run_jobs
 from py_processor.utils.logger import logger
+from py_processor.utils.metrics import metrics, start_metrics
+from adapters.base import get_adapter
 import os
 
-def duplicated(origem, key_columns, source):
-    
-    # print(f'#### 1 - origem:  {origem}') #MKDKR - RETIRAR.
-    # print(f'#### 1 - key_columns:  {key_columns}') #MKDKR - RETIRAR.
-    # os.system("PAUSE") #MKDKR - RETIRAR.
+def save_duplicates(output, duplicates, source):
+    # Gravado em segundo plano, nos formatos da seção 'output' do config.yaml
+    output.write(f"{source}_duplicados", duplicates)
+    logger.info(f"{len(duplicates)} registros duplicados encontrados na origem {source}.")
+
+def save_results(output, diffs_origemA, diffs_origemB, diffs_AB):
+    # Cada chamada acrescenta um bloco aos arquivos de resultado (ex: um por partição)
+    output.write("only_in_origemA", diffs_origemA)
+    output.write("only_in_origemB", diffs_origemB)
+    output.write("differences", diffs_AB)
+
+def log_results(output):
+    if output.rows:
+        summary = ", ".join(f"{name}: {rows}" for name, rows in output.rows.items())
+        logger.info(f"Verificação de diferenças finalizada. Resultados salvos em: {output.directory} ({summary})")
+    else:
+        logger.info("Verificação de diferenças finalizada. Nenhuma diferença encontrada.")
 
+def run_partitioned(config, engine, output):
+    """
+    Executa a verificação de duplicidade e a comparação partição a partição (modo out-of-core).
+
+    As duas origens são particionadas em disco pelo hash de 'key_columns' e apenas um par
+    de partições fica em memória por vez. Como registros com a mesma chave caem sempre na
+    mesma partição, os duplicados também são encontrados partição a partição; eles são
+    acumulados e gravados ao final, numerados como no modo memory.
+    """
+    key_columns = config["sources"]["origemB"].get("key_columns", [])
     key_columns = normalize_column_names_list(key_columns)
-    duplicates = check_duplicates(origem, key_columns)
-    if not duplicates.empty:
-        # Mascara booleana para duplicados
-        duplicate_mask = origem.duplicated(subset=key_columns, keep=False)
+    kind = (config.get("comparison") or {}).get("fingerprints", True)
+
+    duplicates = {"origemA": [], "origemB": []}
+
+    logger.info(f"\n\n####  Iniciando comparação particionada entre as origens A e B.  ####")
+    for partition, df_origemA, df_origemB in iter_partition_pairs(config, "origemA", "origemB", key_columns):
+        # Um único índice de chaves por partição: duplicidade das duas origens e comparação
+        with metrics.stage("normalizacao", rows=len(df_origemA) + len(df_origemB)):
+            key_index = KeyIndex.build(key_columns, df_origemA, df_origemB)
+        for side, (source, df) in enumerate((("origemA", df_origemA), ("origemB", df_origemB))):
+            with metrics.stage("duplicidade", rows=len(df)):
+                duplicates[source].append(partition_duplicates(df, key_columns, key_index=key_index, side=side, kind=kind))
+            df.index = pd.RangeIndex(len(df))
+
+        # Resultados da partição gravados em segundo plano enquanto a próxima é comparada
+        with metrics.stage("comparacao", rows=len(df_origemA) + len(df_origemB)):
+            results = compare_sources(df_origemA, df_origemB, key_columns, engine=engine, key_index=key_index)
+        save_results(output, *results)
+
+    save_partition_duplicates(output, duplicates)
+
+def run_parallel(config, engine, output):
+    """
+    Executa a verificação de duplicidade e a comparação em vários processos (modo parallel).
+
+    As partições das duas origens ficam em memória compartilhada (Arrow) e cada processo
+    compara um par por vez; os resultados são gravados aqui, na ordem das partições, e os
+    duplicados ao final, numerados como no modo memory.
+    """
+    key_columns = config["sources"]["origemB"].get("key_columns", [])
+    key_columns = normalize_column_names_list(key_columns)
+    kind = (config.get("comparison") or {}).get("fingerprints", True)
+
+    duplicates = {"origemA": [], "origemB": []}
+
+    logger.info(f"\n\n####  Iniciando comparação paralela entre as origens A e B.  ####")
+    with metrics.stage("comparacao"):
+        for partition, dup_a, dup_b, *results in parallel_compare(config, "origemA", "origemB", key_columns,
+                                                                  engine=engine, kind=kind):
+            duplicates["origemA"].append(dup_a)
+            duplicates["origemB"].append(dup_b)
+            save_results(output, *results)
+
+    save_partition_duplicates(output, duplicates)
+
+def save_partition_duplicates(output, duplicates):
+    # Grupos renumerados pela primeira linha de cada chave na origem inteira
+    for source, parts in duplicates.items():
+        merged = merge_duplicates(parts)
+        if not merged.empty:
+            save_duplicates(output, merged, source)
+        else:
+            logger.info(f"Nenhum registro duplicado encontrado na origem {source} com base nas chaves configuradas.")
+
+def run_pushdown(config, engine, output):
+    """
+    Executa a comparação em duas fases (modo pushdown).
+
+    Fase 1: apenas chaves + hash das colunas comparadas (calculado no banco para origens
+    database). Fase 2: linhas completas somente das chaves ausentes ou com hash diferente.
+    A verificação de duplicidade usa as chaves da fase 1.
+    """
+    key_columns = config["sources"]["origemB"].get("key_columns", [])
+    key_columns = normalize_column_names_list(key_columns)
+
+    sources = {source: PushdownSource(config, source) for source in ("origemA", "origemB")}
+    try:
+        value_columns = resolve_value_columns(sources["origemA"], sources["origemB"], key_columns)
+
+        hashes = {}
+        for source, pushdown_source in sources.items():
+            logger.info(f"\n\n####  ANALISANDO {source.upper()} (pushdown)  ####")
+            with metrics.stage("carga") as stage:
+                hashes[source] = pushdown_source.key_hashes(key_columns, value_columns)
+                stage.rows = len(hashes[source])
+            logger.info(f'{source} carregada com {len(hashes[source])} chaves')
+
+            logger.info(f"Iniciando verificação de duplicidade na origem {source}")
+            with metrics.stage("duplicidade", rows=len(hashes[source])):
+                # Linhas completas apenas das chaves repetidas (fase 2)
+                duplicates = duplicate_rows(pushdown_source, hashes[source], key_columns)
+            if not duplicates.empty:
+                save_duplicates(output, duplicates, source)
+            else:
+                logger.info("Nenhum registro duplicado encontrado com base nas chaves configuradas.")
+
+        logger.info(f"\n\n####  Iniciando verificação de diferenças entre origens na origem A e B.  ####")
+        with metrics.stage("comparacao", rows=len(hashes["origemA"]) + len(hashes["origemB"])):
+            diffs_origemA, diffs_origemB, diffs_AB = pushdown_compare(
+                  sources["origemA"]
+                , sources["origemB"]
+                , key_columns
+                , hashes["origemA"]
+                , hashes["origemB"]
+                , engine=engine
+            )
+        save_results(output, diffs_origemA, diffs_origemB, diffs_AB)
+
+    finally:
+        for pushdown_source in sources.values():
+            pushdown_source.close()
+
+def run_database(config, output):
+    """
+    Executa a verificação de duplicidade e a comparação dentro do PostgreSQL (modo database).
+
+    A origem arquivo é copiada (COPY) para uma tabela temporária no banco da outra origem;
+    somente os duplicados e as diferenças voltam para o Python, em blocos.
+    """
+    key_columns = config["sources"]["origemB"].get("key_columns", [])
+
+    with SqlReconciliation(config, "origemA", "origemB", key_columns) as reconciliation:
+        logger.info(f"\n\n####  COPIANDO {reconciliation.file_source.upper()} PARA O BANCO  ####")
+        with metrics.stage("carga") as stage:
+            stage.rows = reconciliation.load()
+
+        for source in ("origemA", "origemB"):
+            logger.info(f"Iniciando verificação de duplicidade na origem {source}")
+            with metrics.stage("duplicidade"):
+                rows = 0
+                for part in reconciliation.duplicates(source):
+                    if not part.empty:
+                        output.write(f"{source}_duplicados", part)
+                        rows += len(part)
+            if rows:
+                logger.info(f"{rows} registros duplicados encontrados na origem {source}.")
+            else:
+                logger.info(f"Nenhum registro duplicado encontrado na origem {source} com base nas chaves configuradas.")
+
+        logger.info(f"\n\n####  Iniciando verificação de diferenças entre origens na origem A e B (no banco).  ####")
+        with metrics.stage("comparacao"):
+            for part in reconciliation.only_in("origemA"):
+                output.write("only_in_origemA", part)
+            for part in reconciliation.only_in("origemB"):
+                output.write("only_in_origemB", part)
+            for part in reconciliation.differences():
+                output.write("differences", part)
+
+def run_incremental(config, engine, output):
+    """
+    Executa a comparação incremental (modo incremental).
+
+    Os snapshots (chaves + hash) da execução anterior indicam as chaves inseridas, removidas
+    ou alteradas em cada origem; apenas essas são buscadas e comparadas, e os resultados das
+    demais são reaproveitados. A coluna 'watermark' de cada fonte (opcional) limita a extração
+    das origens database às linhas a partir do último valor processado.
+    """
+    key_columns = config["sources"]["origemB"].get("key_columns", [])
+    key_columns = normalize_column_names_list(key_columns)
+
+    sources = {source: PushdownSource(config, source) for source in ("origemA", "origemB")}
+    try:
+        value_columns = resolve_value_columns(sources["origemA"], sources["origemB"], key_columns)
+
+        logger.info(f"\n\n####  Iniciando comparação incremental entre as origens A e B.  ####")
+        with metrics.stage("comparacao"):
+            snapshots, results = incremental_compare(
+                  sources
+                , key_columns
+                , value_columns
+                , get_snapshot_store(config)
+                , watermarks=get_watermarks(config, sources)
+                , engine=engine
+            )
+
+        for source, snapshot in snapshots.items():
+            logger.info(f"Iniciando verificação de duplicidade na origem {source}")
+            with metrics.stage("duplicidade", rows=len(snapshot)):
+                duplicates = duplicate_rows(sources[source], snapshot, key_columns)
+            if not duplicates.empty:
+                save_duplicates(output, duplicates, source)
+            else:
+                logger.info("Nenhum registro duplicado encontrado com base nas chaves configuradas.")
+
+        save_results(output, *results)
+
+    finally:
+        for pushdown_source in sources.values():
+            pushdown_source.close()
+
+def run_adapter(config, output):
+    """
+    Executa a verificação de duplicidade e a comparação pela interface de adapters.base,
+    com o motor de 'processing.backend' (ex: duckdb, lazy e out-of-core).
+    """
+    key_columns = config["sources"]["origemB"].get("key_columns", [])
+    key_columns = normalize_column_names_list(key_columns)
+    kind = (config.get("comparison") or {}).get("fingerprints", True)
+
+    with get_adapter(config) as adapter:
+        relations = {}
+        for source in ("origemA", "origemB"):
+            logger.info(f"\n\n####  ANALISANDO {source.upper()} ({adapter.name})  ####")
+            relations[source] = adapter.read(source)
+
+            logger.info(f"Iniciando verificação de duplicidade na origem {source}")
+            with metrics.stage("duplicidade"):
+                duplicates = adapter.duplicates(relations[source], config["sources"][source].get("key_columns", key_columns), kind=kind)
+            if not duplicates.empty:
+                save_duplicates(output, duplicates, source)
+            else:
+                logger.info("Nenhum registro duplicado encontrado com base nas chaves configuradas.")
+
+        logger.info(f"\n\n####  Iniciando verificação de diferenças entre origens na origem A e B.  ####")
+        with metrics.stage("comparacao"):
+            results = adapter.compare(relations["origemA"], relations["origemB"], key_columns)
+        save_results(output, *results)
+
+def column_stats(config, output):
+    """
+    Estatísticas por coluna de cada origem (nulos, distintos, média/desvio, quantis e top-k),
+    calculadas em uma única leitura em blocos e gravadas como '<origem>_estatisticas'.
+    """
+    validation = config.get("validation") or {}
+    for source in ("origemA", "origemB"):
+        logger.info(f"Calculando estatísticas por coluna da origem {source}")
+        with metrics.stage("estatisticas") as stage:
+            stats = collect_stats(iter_source(config, source, get_chunk_size(config))).result()
+            stage.rows = int(stats["LINHAS"].max()) if not stats.empty else 0
+        output.write(f"{source}_estatisticas", stats)
 
-        # Filtra duplicados
-        duplicates = origem[duplicate_mask]
+        if validation.get("validate_null_percentage") is not None:
+            for _, row in validate_null_percentage(stats, validation["validate_null_percentage"]).iterrows():
+                logger.warning(f"{source}: coluna {row['COLUNA']} com {row['PERC_NULOS']:.1%} de nulos")
+        if validation.get("validate_unique_percentage") is not None:
+            for _, row in validate_unique_percentage(stats, validation["validate_unique_percentage"]).iterrows():
+                logger.warning(f"{source}: coluna {row['COLUNA']} com apenas {row['PERC_UNICOS']:.1%} de valores distintos")
 
-        # Define caminho absoluto
-        output_path = Path("../data/output") / f"{source}_duplicados.csv"
-        output_path.parent.mkdir(parents=True, exist_ok=True)  # Garante que a pasta exista
+def fingerprint(config, df, key_columns, source):
+    # Fingerprints (hash por linha) reaproveitados na duplicidade e na comparação e, com
+    # 'comparison.fingerprint_dir', nas próximas execuções enquanto o arquivo da origem não mudar
+    comparison = config.get("comparison") or {}
+    if not comparison.get("fingerprints", True):
+        return None
 
-        # Salva com separador ; (CSV estilo Excel brasileiro)
-        duplicates.to_csv(output_path, index=False, sep=";", encoding="utf-8")
+    path = cache_key = None
+    if comparison.get("fingerprint_dir"):
+        path = resolve_path(comparison["fingerprint_dir"]) / f"{source}_fingerprints.pkl"
+        # Bancos podem mudar sem que a query mude: só arquivos reaproveitam os fingerprints gravados
+        if config["sources"][source].get("type") == "file":
+            cache_key = source_cache_key(config, source)
+            stored = load_fingerprints(path, cache_key)
+            value_columns = [col for col in df.columns if col not in normalize_column_names_list(key_columns)]
+            if stored is not None and fingerprints_for(stored, df, value_columns) is not None:
+                logger.info(f"Fingerprints da origem {source} reaproveitados de: {path.resolve()}")
+                return stored
 
-        logger.info(f"Arquivo com duplicados salvo em: {output_path.resolve()}")
+    with metrics.stage("normalizacao", rows=len(df)):
+        fingerprints = compute_fingerprints(df, key_columns)
+    if path is not None:
+        save_fingerprints(fingerprints, path, cache_key)
+        logger.info(f"Fingerprints da origem {source} salvos em: {path.resolve()}")
+    return fingerprints
+
+def duplicated(output, origem, key_columns, source, fingerprints=None, key_index=None, side=0):
+    
+    # print(f'#### 1 - origem:  {origem}') #MKDKR - RETIRAR.
+    # print(f'#### 1 - key_columns:  {key_columns}') #MKDKR - RETIRAR.
+    # os.system("PAUSE") #MKDKR - RETIRAR.
+
+    # Passada única sobre o índice de chaves (reaproveitado da comparação quando as chaves coincidem).
+    # Com fingerprints, indica se as linhas duplicadas são idênticas ou divergentes.
+    with metrics.stage("duplicidade", rows=len(origem)):
+        duplicates = analyze_duplicates(origem, key_columns, key_index=key_index, side=side, fingerprints=fingerprints)
+    if not duplicates.empty:
+        save_duplicates(output, duplicates, source)
     else:
         logger.info("Nenhum registro duplicado encontrado com base nas chaves configuradas.")
 
@@ -42,102 +329,193 @@ def duplicated(origem, key_columns, source):
     # else:
     #     print("Nenhum registro duplicado encontrado com base nas chaves configuradas.")
 
-def main():
-    try:
-        # Ajuste aqui o caminho correto para o config.yaml
-        config_path = Path(__file__).parent / "config" / "config.yaml"
+def compact_options(config):
+    # Opções da carga compacta ('processing.compact'), ou None quando desabilitada
+    processing = config.get("processing") or {}
+    if not processing.get("compact", False):
+        return None
+    return {
+          "declared": {
+              **(config["sources"]["origemA"].get("dtypes") or {})
+            , **(config["sources"]["origemB"].get("dtypes") or {})
+        }
+        , "category_ratio": processing.get("category_ratio", DEFAULT_CATEGORY_RATIO)
+    }
 
-        # Carrega config
-        config = load_config(str(config_path))
+def run_memory(config, engine, output, frames=None):
+    """
+    Executa a verificação de duplicidade e a comparação com as duas origens em memória.
 
-        # # Pega as keys do config
-        # key_columns = config.get("validation", {}).get("key_columns", [])
-        # if not key_columns:
-        #     logger.warning("Nenhuma chave configurada para validação de duplicatas")
-        #     return
-        
-        ### ANALISA DADOS ORIGEM A ###
-        # Use a chave da fonte no config.yaml, por exemplo 'origemA'
-        logger.info(f"\n\n####  ANALISANDO ORIGEM A  ####")
-        source = "origemA"
-        origemType = config["sources"][source]["type"]
-        key_columns = config["sources"][source].get("key_columns", [])
-        
-        if origemType == 'file':
-            df_origemA = load_file(config, source)
-        elif origemType == 'database':
-            df_origemA = load_database(config, source)
-        else:
-            logger.info(f'Type de origem de dados não identificada. Arquivo ou Database')
-
-        logger.info(f'{source} carregada com {len(df_origemA)} registros')
-
-        # # Inferir nos Datatypes das colunas.
-        # tipos = infer_column_types(df_origemA)
-        # print(f'type:  {tipos}')
-        # os.system("PAUSE")
-
-        # Verifica se existe registros duplicados na ORIGEM A.
-        logger.info(f"Iniciando verificação de duplicidade na origem {source}")
-        duplicated(df_origemA, key_columns, source)
-
-
-        ### ANALISA DADOS ORIGEM B ###
-        logger.info(f"\n\n####  ANALISANDO ORIGEM B  ####")
-        source = "origemB"
-        origemType = config["sources"][source]["type"]
-        key_columns = config["sources"][source].get("key_columns", [])
-        key_columns = normalize_column_names_list(key_columns)
-        
-        if origemType == 'file':
-            df_origemB = load_file(config, source)
-        elif origemType == 'database':
-            df_origemB = load_database(config, source)
-            df_origemB.columns = [col.upper() for col in df_origemB.columns]
-        else:
-            logger.info(f'Type de origem de dados não identificada. Arquivo ou Database')
+    `frames` ({'origemA': df, 'origemB': df}) traz as origens já carregadas (ex: compartilhadas
+    entre jobs); sem ele, as origens são carregadas aqui.
+    """
+    # # Pega as keys do config
+    # key_columns = config.get("validation", {}).get("key_columns", [])
+    # if not key_columns:
+    #     logger.warning("Nenhuma chave configurada para validação de duplicatas")
+    #     return
+    
+    ### ANALISA DADOS ORIGEM A ###
+    # Use a chave da fonte no config.yaml, por exemplo 'origemA'
+    logger.info(f"\n\n####  ANALISANDO ORIGEM A  ####")
+    source = "origemA"
+    origemType = config["sources"][source]["type"]
+    key_columns = config["sources"][source].get("key_columns", [])
+    
+    # Carga compacta: category (dicionário compartilhado entre as origens) e string[pyarrow],
+    # convertidas bloco a bloco durante a leitura
+    compact = compact_options(config)
 
-        logger.info(f'{source} carregada com {len(df_origemB)} registros')
+    if frames is not None:
+        df_origemA = frames[source]
+    else:
+        with metrics.stage("carga") as stage:
+            if compact:
+                df_origemA = load_compact(config, source, **compact)
+            elif origemType == 'file':
+                df_origemA = load_file(config, source)
+            elif origemType == 'database':
+                df_origemA = load_database(config, source)
+            else:
+                logger.info(f'Type de origem de dados não identificada. Arquivo ou Database')
+            stage.rows = len(df_origemA)
 
-        # Verifica se existe registros duplicados na ORIGEM B.
-        logger.info(f"Iniciando verificação de duplicidade na origem {source}")
-        duplicated(df_origemB, key_columns, source)
+    logger.info(f'{source} carregada com {len(df_origemA)} registros')
+    key_columns_origemA = key_columns
+    fingerprints_origemA = fingerprint(config, df_origemA, key_columns, source)
 
-        ### ANALISA DIFERENÇA DE DADOS ENTRE ORIGENS A e B ###
-        logger.info(f"\n\n####  Iniciando verificação de diferenças entre origens na origem A e B.  ####")
-        diffs_origemA, diffs_origemB, diffs_AB = rust_bridge.compare_with_rust(
+    # # Inferir nos Datatypes das colunas.
+    # tipos = infer_column_types(df_origemA)
+    # print(f'type:  {tipos}')
+    # os.system("PAUSE")
+
+
+    ### ANALISA DADOS ORIGEM B ###
+    logger.info(f"\n\n####  ANALISANDO ORIGEM B  ####")
+    source = "origemB"
+    origemType = config["sources"][source]["type"]
+    key_columns = config["sources"][source].get("key_columns", [])
+    key_columns = normalize_column_names_list(key_columns)
+    
+    if frames is not None:
+        df_origemB = frames[source]
+    else:
+        with metrics.stage("carga") as stage:
+            if compact:
+                # Dicionários das colunas category compartilhados com a origem A
+                df_origemB = load_compact(config, source, reference=df_origemA, **compact)
+            elif origemType == 'file':
+                df_origemB = load_file(config, source)
+            elif origemType == 'database':
+                df_origemB = load_database(config, source)
+                df_origemB.columns = [col.upper() for col in df_origemB.columns]
+            else:
+                logger.info(f'Type de origem de dados não identificada. Arquivo ou Database')
+            stage.rows = len(df_origemB)
+
+    logger.info(f'{source} carregada com {len(df_origemB)} registros')
+    fingerprints_origemB = fingerprint(config, df_origemB, key_columns, source)
+
+    if compact and frames is not None:
+        # Origens já carregadas (compartilhadas entre jobs): convertidas em cópias rasas
+        with metrics.stage("compactacao", rows=len(df_origemA) + len(df_origemB)):
+            df_origemA, df_origemB = compact_sources([df_origemA, df_origemB], **compact)
+
+    # Índice das chaves das duas origens, construído uma única vez e usado tanto na
+    # verificação de duplicidade quanto na comparação.
+    with metrics.stage("normalizacao", rows=len(df_origemA) + len(df_origemB)):
+        key_index = KeyIndex.build(key_columns, df_origemA, df_origemB)
+
+    # Verifica se existe registros duplicados nas ORIGENS A e B.
+    logger.info(f"Iniciando verificação de duplicidade na origem origemA")
+    duplicated(output, df_origemA, key_columns_origemA, "origemA", fingerprints_origemA, key_index=key_index, side=0)
+    logger.info(f"Iniciando verificação de duplicidade na origem {source}")
+    duplicated(output, df_origemB, key_columns, source, fingerprints_origemB, key_index=key_index, side=1)
+
+    ### ANALISA DIFERENÇA DE DADOS ENTRE ORIGENS A e B ###
+    logger.info(f"\n\n####  Iniciando verificação de diferenças entre origens na origem A e B.  ####")
+    with metrics.stage("comparacao", rows=len(df_origemA) + len(df_origemB)):
+        diffs_origemA, diffs_origemB, diffs_AB = compare_sources(
               df_origemA
             , df_origemB
             , key_columns
+            , engine=engine
+            , fingerprints_a=fingerprints_origemA
+            , fingerprints_b=fingerprints_origemB
+            , key_index=key_index
         )
 
-        msg = ''
-        if diffs_origemA is not None and len(diffs_origemA) > 0:
-            # Exportar os dados em CSV
-            pd.DataFrame(diffs_origemA).to_csv("../data/output/only_in_origemA.csv", sep=";", index=False)
-
-            # Também salva em JSON para inspeção detalhada
-            with open("../data/output/only_in_origemA.json", "w", encoding="utf-8") as f:
-                json.dump(diffs_origemA, f, indent=2, ensure_ascii=False)
-            msg = 'Resultados salvos em: data/output/'
-        if diffs_origemB is not None and len(diffs_origemB) > 0:
-            # Exportar os dados em CSV
-            pd.DataFrame(diffs_origemB).to_csv("../data/output/only_in_origemB.csv", sep=";", index=False)
-
-            # Também salva em JSON para inspeção detalhada
-            with open("../data/output/only_in_origemB.json", "w", encoding="utf-8") as f:
-                json.dump(diffs_origemB, f, indent=2, ensure_ascii=False)
-            msg = 'Resultados salvos em: data/output/'
-        if diffs_AB is not None and len(diffs_AB) > 0:
-            # Exportar os dados em CSV
-            pd.DataFrame(diffs_AB).to_csv("../data/output/differences.csv", sep=";", index=False)
-
-            # Também salva em JSON para inspeção detalhada
-            with open("../data/output/differences.json", "w", encoding="utf-8") as f:
-                json.dump(diffs_AB, f, indent=2, ensure_ascii=False)
-            msg = 'Resultados salvos em: data/output/'
-
-        logger.info(f"Verificação de diferenças finalizada. {msg}")
+    save_results(output, diffs_origemA, diffs_origemB, diffs_AB)
+
+def run_comparison(config, output, frames=None):
+    """
+    Executa a verificação de duplicidade e a comparação das origens A e B no modo de
+    'processing.mode', gravando os resultados em `output`.
+    """
+    engine = config.get("comparison", {}).get("engine", "auto")
+    mode = (config.get("processing") or {}).get("mode", "memory")
+
+    if (config.get("validation") or {}).get("column_stats", False):
+        column_stats(config, output)
+
+    # Modo out-of-core: origens particionadas em disco e comparadas partição a partição
+    if mode == "partitioned":
+        run_partitioned(config, engine, output)
+
+    # Modo paralelo: pares de partições em memória compartilhada comparados em vários processos
+    elif mode == "parallel":
+        run_parallel(config, engine, output)
+
+    # Modo pushdown: chaves + hash primeiro, linhas completas só das chaves divergentes
+    elif mode == "pushdown":
+        run_pushdown(config, engine, output)
+
+    # Modo incremental: compara apenas as chaves alteradas desde a última execução
+    elif mode == "incremental":
+        run_incremental(config, engine, output)
+
+    # Modo database: arquivo copiado para o PostgreSQL da outra origem e comparado em SQL
+    elif mode == "database":
+        run_database(config, output)
+
+    # Outro motor (ex: duckdb) pela interface de adapters.base
+    elif (config.get("processing") or {}).get("backend", "pandas") != "pandas":
+        run_adapter(config, output)
+
+    # Origens que não cabem em 'processing.memory_limit': comparação particionada em disco
+    elif frames is None and not fits_in_memory(config, ["origemA", "origemB"]):
+        logger.warning("As origens não cabem em 'processing.memory_limit' no modo memory: usando o modo partitioned.")
+        run_partitioned(config, engine, output)
+
+    else:
+        run_memory(config, engine, output, frames)
+
+def main():
+    try:
+        # Ajuste aqui o caminho correto para o config.yaml
+        config_path = Path(__file__).parent / "config" / "config.yaml"
+
+        # Carrega config
+        config = load_config(str(config_path))
+
+        # Tempo, CPU, linhas/s e memória por etapa, conforme a seção 'metrics' do config.yaml
+        start_metrics(config)
+
+        # Resultados gravados em segundo plano, conforme a seção 'output' do config.yaml
+        with metrics.stage("total"), open_output(config) as output:
+            # Vários jobs: cada um grava em '<output.directory>/<job>'; aqui fica só o relatório
+            if config.get("jobs"):
+                report = run_jobs(config, run_comparison)
+                output.write("jobs", report)
+                for job in report.itertuples():
+                    logger.info(f"Job {job.JOB}: {job.STATUS} em {job.SEGUNDOS:.1f} s")
+            else:
+                run_comparison(config, output)
+
+        # Escrita medida na thread de gravação (em paralelo às demais etapas)
+        metrics.record("escrita", output.seconds, rows=sum(output.rows.values()))
+        log_results(output)
+        metrics.save()
 
     except Exception as e:
         logger.exception(f"Erro ao executar o processo: {e}")
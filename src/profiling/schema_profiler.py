@@ -1,5 +1,10 @@
 # src/profiling/schema_profiler.py
 
+import hashlib
+import json
+import os
+from pathlib import Path
+
 class SchemaProfiler:
 
     def __init__(self, connector):
@@ -26,6 +31,7 @@ class SchemaProfiler:
         sql = """
         SELECT table_schema, table_name, column_name, data_type
         FROM information_schema.columns
+        WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
         """
         return self.conn.query(sql)
 
@@ -78,4 +84,179 @@ class SchemaProfiler:
             "primary_keys": self.get_primary_keys(),
             "foreign_keys": self.get_foreign_keys(),
             "indexes": self.get_indexes()
-        }
\ No newline at end of file
+        }
+
+
+# ------------------------------------------------------------
+# Perfil do schema lido direto do pg_catalog, com cache local
+# ------------------------------------------------------------
+
+# Relações com o schema e filtros aplicados; base de todas as seções do perfil
+_RELATIONS_SQL = """
+    SELECT c.oid, n.nspname AS table_schema, c.relname AS table_name
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p')
+    AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    AND n.nspname !~ '^pg_(toast|temp)'
+    AND (%(schemas)s::text[] IS NULL OR n.nspname LIKE ANY(%(schemas)s::text[]))
+    AND (%(tables)s::text[] IS NULL
+         OR c.relname LIKE ANY(%(tables)s::text[])
+         OR n.nspname || '.' || c.relname LIKE ANY(%(tables)s::text[]))
+"""
+
+_NAMESPACE_FILTER = """
+    n.nspname NOT IN ('pg_catalog', 'information_schema')
+    AND n.nspname !~ '^pg_(toast|temp)'
+    AND (%(schemas)s::text[] IS NULL OR n.nspname LIKE ANY(%(schemas)s::text[]))
+"""
+
+# Todas as seções em uma única consulta (um round trip), já no formato do SchemaProfiler
+_PROFILE_SQL = f"""
+WITH rels AS ({_RELATIONS_SQL})
+SELECT json_build_object(
+    'schemas', (
+        SELECT coalesce(json_agg(json_build_object('schema_name', n.nspname) ORDER BY n.nspname), '[]')
+        FROM pg_namespace n
+        WHERE {_NAMESPACE_FILTER}
+    ),
+    'tables', (
+        SELECT coalesce(json_agg(json_build_object(
+            'table_schema', r.table_schema,
+            'table_name', r.table_name
+        ) ORDER BY r.table_schema, r.table_name), '[]')
+        FROM rels r
+    ),
+    'columns', (
+        SELECT coalesce(json_agg(json_build_object(
+            'table_schema', r.table_schema,
+            'table_name', r.table_name,
+            'column_name', a.attname,
+            'data_type', format_type(a.atttypid, a.atttypmod)
+        ) ORDER BY r.table_schema, r.table_name, a.attnum), '[]')
+        FROM rels r
+        JOIN pg_attribute a ON a.attrelid = r.oid AND a.attnum > 0 AND NOT a.attisdropped
+    ),
+    'primary_keys', (
+        SELECT coalesce(json_agg(json_build_object(
+            'table_schema', r.table_schema,
+            'table_name', r.table_name,
+            'column_name', a.attname
+        ) ORDER BY r.table_schema, r.table_name, k.ord), '[]')
+        FROM rels r
+        JOIN pg_constraint con ON con.conrelid = r.oid AND con.contype = 'p'
+        CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = r.oid AND a.attnum = k.attnum
+    ),
+    'foreign_keys', (
+        SELECT coalesce(json_agg(json_build_object(
+            'table_schema', r.table_schema,
+            'table_name', r.table_name,
+            'column_name', a.attname,
+            'foreign_table', fc.relname,
+            'foreign_column', fa.attname
+        ) ORDER BY r.table_schema, r.table_name, con.conname, k.ord), '[]')
+        FROM rels r
+        JOIN pg_constraint con ON con.conrelid = r.oid AND con.contype = 'f'
+        CROSS JOIN LATERAL unnest(con.conkey, con.confkey) WITH ORDINALITY AS k(attnum, fattnum, ord)
+        JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+        JOIN pg_class fc ON fc.oid = con.confrelid
+        JOIN pg_attribute fa ON fa.attrelid = con.confrelid AND fa.attnum = k.fattnum
+    ),
+    'indexes', (
+        SELECT coalesce(json_agg(json_build_object(
+            'schemaname', r.table_schema,
+            'tablename', r.table_name,
+            'indexname', ic.relname,
+            'indexdef', pg_get_indexdef(i.indexrelid)
+        ) ORDER BY r.table_schema, r.table_name, ic.relname), '[]')
+        FROM rels r
+        JOIN pg_index i ON i.indrelid = r.oid
+        JOIN pg_class ic ON ic.oid = i.indexrelid
+    )
+) AS profile
+"""
+
+# Digest do catálogo: muda com qualquer DDL nos schemas filtrados (nova versão da linha
+# no pg_class/pg_constraint/pg_namespace/pg_attribute, ou relfilenode trocado).
+_DIGEST_SQL = f"""
+SELECT md5(coalesce(string_agg(item, ',' ORDER BY item), '')) AS digest
+FROM (
+    SELECT 'c' || c.oid || ':' || c.relfilenode || ':' || c.xmin::text AS item
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE {_NAMESPACE_FILTER}
+    UNION ALL
+    SELECT 'k' || con.oid || ':' || con.xmin::text
+    FROM pg_constraint con
+    JOIN pg_namespace n ON n.oid = con.connamespace
+    WHERE {_NAMESPACE_FILTER}
+    UNION ALL
+    SELECT 'n' || n.oid || ':' || n.xmin::text
+    FROM pg_namespace n
+    WHERE {_NAMESPACE_FILTER}
+    UNION ALL
+    SELECT 'a' || count(*) || ':' || coalesce(sum(a.xmin::text::bigint), 0)
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE {_NAMESPACE_FILTER}
+) d
+"""
+
+
+class CatalogProfiler(SchemaProfiler):
+    """
+    Perfil do schema lido direto do pg_catalog em uma única consulta.
+
+    Aceita filtros de schema e tabela (padrões LIKE; tabelas como 'nome' ou 'schema.nome').
+    Com `cache_dir`, o perfil fica guardado em disco junto com o digest do catálogo e só
+    é consultado novamente quando o digest muda (DDL nos schemas filtrados).
+    """
+
+    def __init__(self, connector, schemas=None, tables=None, cache_dir=None):
+        super().__init__(connector)
+        self.params = {
+            "schemas": list(schemas) if schemas else None,
+            "tables": list(tables) if tables else None,
+        }
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def catalog_digest(self):
+        return self.conn.query(_DIGEST_SQL, self.params)[0]["digest"]
+
+    def _cache_path(self):
+        # Um arquivo por banco/usuário + filtros
+        dsn = self.conn.dsn_parameters() if hasattr(self.conn, "dsn_parameters") else {}
+        identity = {key: dsn.get(key) for key in ("host", "port", "dbname", "user")}
+        text = json.dumps({"connection": identity, "filters": self.params}, sort_keys=True)
+        return self.cache_dir / f"{hashlib.sha256(text.encode('utf-8')).hexdigest()}.json"
+
+    def _load_cache(self, digest):
+        try:
+            with open(self._cache_path(), "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return cached["profile"] if cached.get("digest") == digest else None
+
+    def _save_cache(self, digest, profile):
+        path = self._cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"digest": digest, "profile": profile}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def run_full_profile(self):
+        digest = None
+        if self.cache_dir is not None:
+            digest = self.catalog_digest()
+            profile = self._load_cache(digest)
+            if profile is not None:
+                return profile
+
+        profile = self.conn.query(_PROFILE_SQL, self.params)[0]["profile"]
+        if self.cache_dir is not None:
+            self._save_cache(digest, profile)
+        return profile
@@ -0,0 +1,187 @@
+# src/profiling/table_profiler.py
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# Categorias do pg_type com ordenação (min/max) e igualdade (contagem de distintos)
+_ORDERED_CATEGORIES = {"N", "D", "S", "T"}
+_DISTINCT_CATEGORIES = _ORDERED_CATEGORIES | {"B", "I"}
+_DISTINCT_TYPES = {"uuid", "jsonb"}
+
+_COLUMNS_SQL = """
+SELECT a.attname AS column_name,
+       format_type(a.atttypid, a.atttypmod) AS data_type,
+       t.typcategory AS category,
+       t.typname AS type_name
+FROM pg_attribute a
+JOIN pg_class c ON c.oid = a.attrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_type t ON t.oid = a.atttypid
+WHERE n.nspname = %(schema)s
+AND c.relname = %(table)s
+AND a.attnum > 0
+AND NOT a.attisdropped
+ORDER BY a.attnum
+"""
+
+_RELTUPLES_SQL = """
+SELECT c.reltuples
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %(schema)s AND c.relname = %(table)s
+"""
+
+_STATS_SQL = """
+SELECT attname, null_frac, n_distinct, histogram_bounds::text::text[] AS bounds
+FROM pg_stats
+WHERE schemaname = %(schema)s AND tablename = %(table)s
+"""
+
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class TableProfiler:
+    """
+    Perfil de dados das tabelas calculado no próprio banco.
+
+    Cada tabela é lida em uma única varredura: uma consulta agregada cobre a contagem de
+    linhas e, para todas as colunas, nulos, distintos e min/max. Opcionalmente a varredura
+    usa TABLESAMPLE SYSTEM (`sample_percent`) ou é substituída pelas estatísticas do
+    ANALYZE (`use_stats`: pg_class.reltuples + pg_stats). As tabelas são processadas em
+    paralelo com no máximo `max_connections` conexões abertas.
+
+    Args:
+        connect: Função que abre uma conexão (objeto com query(sql, params) e close()).
+        max_connections (int): Conexões (e tabelas) simultâneas.
+        sample_percent (float): Percentual de páginas lidas via TABLESAMPLE SYSTEM.
+        use_stats (bool): Usa as estatísticas do ANALYZE em vez de ler a tabela.
+    """
+
+    def __init__(self, connect, max_connections=4, sample_percent=None, use_stats=False):
+        self.connect = connect
+        self.max_connections = max(1, int(max_connections))
+        self.sample_percent = sample_percent
+        self.use_stats = use_stats
+        self._pool = queue.LifoQueue()
+
+    # ---------------- Conexões ----------------
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self.connect()
+
+    def _release(self, conn):
+        self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    # ---------------- Consultas ----------------
+
+    def build_query(self, schema, table, columns):
+        """
+        Consulta agregada (uma varredura) com as métricas de todas as colunas.
+        """
+        select = ["count(*) AS row_count"]
+        for i, col in enumerate(columns):
+            name = quote_ident(col["column_name"])
+            select.append(f"count({name}) AS c{i}_count")
+            if col["category"] in _DISTINCT_CATEGORIES or col["type_name"] in _DISTINCT_TYPES:
+                select.append(f"count(DISTINCT {name}) AS c{i}_distinct")
+            if col["category"] in _ORDERED_CATEGORIES:
+                select.append(f"min({name})::text AS c{i}_min")
+                select.append(f"max({name})::text AS c{i}_max")
+
+        source = f"{quote_ident(schema)}.{quote_ident(table)}"
+        if self.sample_percent:
+            source += f" TABLESAMPLE SYSTEM ({float(self.sample_percent)})"
+        return f"SELECT {', '.join(select)} FROM {source}"
+
+    def _scan(self, conn, schema, table, columns):
+        row = conn.query(self.build_query(schema, table, columns))[0]
+
+        # Com amostragem, contagens são extrapoladas; distintos e min/max valem para a amostra
+        scale = 100.0 / float(self.sample_percent) if self.sample_percent else 1
+        row_count = round(row["row_count"] * scale)
+        profiled = []
+        for i, col in enumerate(columns):
+            profiled.append({
+                "column_name": col["column_name"],
+                "data_type": col["data_type"],
+                "null_count": round((row["row_count"] - row[f"c{i}_count"]) * scale),
+                "distinct_count": row.get(f"c{i}_distinct"),
+                "min": row.get(f"c{i}_min"),
+                "max": row.get(f"c{i}_max"),
+            })
+        return row_count, profiled
+
+    def _stats(self, conn, schema, table, columns):
+        params = {"schema": schema, "table": table}
+        reltuples = conn.query(_RELTUPLES_SQL, params)[0]["reltuples"]
+        if reltuples is None or reltuples < 0:
+            return None  # tabela ainda sem ANALYZE
+
+        stats = {row["attname"]: row for row in conn.query(_STATS_SQL, params)}
+        profiled = []
+        for col in columns:
+            stat = stats.get(col["column_name"]) or {}
+            n_distinct = stat.get("n_distinct")
+            if n_distinct is not None and n_distinct < 0:
+                n_distinct = -n_distinct * reltuples  # fração das linhas
+            bounds = stat.get("bounds") or []
+            profiled.append({
+                "column_name": col["column_name"],
+                "data_type": col["data_type"],
+                "null_count": round(stat["null_frac"] * reltuples) if stat.get("null_frac") is not None else None,
+                "distinct_count": round(n_distinct) if n_distinct is not None else None,
+                "min": bounds[0] if bounds else None,
+                "max": bounds[-1] if bounds else None,
+            })
+        return round(reltuples), profiled
+
+    def profile_table(self, schema, table):
+        conn = self._acquire()
+        try:
+            columns = conn.query(_COLUMNS_SQL, {"schema": schema, "table": table})
+
+            result = self._stats(conn, schema, table, columns) if self.use_stats else None
+            if result is not None:
+                method = "stats"
+            else:
+                method = "sample" if self.sample_percent else "scan"
+                result = self._scan(conn, schema, table, columns)
+
+            row_count, profiled = result
+            return {
+                "table_schema": schema,
+                "table_name": table,
+                "method": method,
+                "row_count": row_count,
+                "columns": profiled,
+            }
+        except Exception as e:
+            # Uma tabela com erro não interrompe as demais
+            if hasattr(conn, "rollback"):
+                conn.rollback()
+            return {"table_schema": schema, "table_name": table, "error": str(e)}
+        finally:
+            self._release(conn)
+
+    def run(self, tables):
+        """
+        Perfila as tabelas informadas (pares schema/tabela ou dicts com table_schema/table_name).
+        """
+        tables = [
+            (t["table_schema"], t["table_name"]) if isinstance(t, dict) else tuple(t)
+            for t in tables
+        ]
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+                return list(executor.map(lambda t: self.profile_table(*t), tables))
+        finally:
+            self.close()
@@ -0,0 +1,297 @@
+# ------------------------------------------------------------
+# Cache colunar (Arrow IPC) das origens carregadas
+# ------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+from py_processor.utils.memory import parse_size
+from py_processor.utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+# Indica se o pyarrow está instalado; sem ele o cache fica desabilitado
+ARROW_AVAILABLE = pa is not None
+
+DEFAULT_CACHE_DIR = "data/cache"
+DEFAULT_MAX_SIZE = "5GB"
+INDEX_FILE = "index.json"
+CACHE_EXTENSION = ".arrow"
+
+
+def _digest(payload: dict) -> str:
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_cache_key(file_path: Path, source_cfg: dict) -> str:
+    """
+    Chave de cache de um arquivo: caminho, tamanho, data de modificação e opções de leitura.
+    """
+    stat = Path(file_path).stat()
+    return _digest({
+          "path": str(Path(file_path).resolve())
+        , "size": stat.st_size
+        , "mtime": stat.st_mtime_ns
+        , "options": source_cfg
+    })
+
+
+def query_cache_key(source_cfg: dict, query: str) -> str:
+    """
+    Chave de cache de uma consulta: destino da conexão, query e cláusula WHERE.
+    """
+    return _digest({
+          "db_type": source_cfg.get("db_type")
+        , "host": source_cfg.get("host")
+        , "port": source_cfg.get("port")
+        , "database": source_cfg.get("database")
+        , "username": source_cfg.get("username")
+        , "query": query
+        , "where": source_cfg.get("where")
+    })
+
+
+class SourceCache:
+    """
+    Cache em disco de DataFrames normalizados, no formato Arrow IPC (sem compressão).
+
+    As leituras usam memory-map, evitando copiar o arquivo para a memória antes da
+    conversão para pandas. O tamanho total é limitado por `max_size`: ao gravar uma
+    nova entrada, as entradas acessadas há mais tempo são removidas (LRU).
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = parse_size(max_size)
+        self._lock = threading.Lock()
+
+    # ---------------- Índice (tamanho e último acesso de cada entrada) ----------------
+
+    def _index_path(self) -> Path:
+        return self.directory / INDEX_FILE
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self, index: dict) -> None:
+        tmp_path = self._index_path().with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self._index_path())
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{CACHE_EXTENSION}"
+
+    # ---------------- Leitura ----------------
+
+    def _open(self, key: str, ttl: int = None):
+        """
+        Abre a entrada via memory-map e atualiza o último acesso.
+
+        Retorna None se a entrada não existir ou tiver mais de `ttl` segundos.
+        """
+        path = self.path(key)
+        with self._lock:
+            index = self._read_index()
+            entry = index.get(key)
+            if entry is None or not path.exists():
+                return None
+
+            if ttl and time.time() - entry["created"] > ttl:
+                self._remove(index, key)
+                self._write_index(index)
+                return None
+
+            entry["last_access"] = time.time()
+            self._write_index(index)
+
+        return ipc.open_file(pa.memory_map(str(path), "r"))
+
+    def get(self, key: str, ttl: int = None) -> pd.DataFrame:
+        """
+        Lê uma entrada do cache. Retorna None quando a entrada não existe (ou expirou).
+        """
+        reader = self._open(key, ttl)
+        if reader is None:
+            return None
+        return reader.read_all().to_pandas()
+
+    def iter_chunks(self, key: str, chunk_size: int, ttl: int = None) -> Iterator[pd.DataFrame]:
+        """
+        Lê uma entrada do cache em blocos de até `chunk_size` linhas. Não produz nada se a entrada não existir.
+        """
+        reader = self._open(key, ttl)
+        if reader is None:
+            return
+        for batch in reader.read_all().to_batches(max_chunksize=chunk_size):
+            yield batch.to_pandas()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._read_index() and self.path(key).exists()
+
+    # ---------------- Escrita ----------------
+
+    def put(self, key: str, df: pd.DataFrame, description: str = "") -> bool:
+        """
+        Grava um DataFrame no cache e aplica a remoção LRU caso o limite de tamanho seja excedido.
+
+        Falhas na gravação (ex: tipos sem representação em Arrow) não interrompem o
+        processo: a entrada simplesmente não é criada.
+        """
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with self.writer(key, table.schema, description) as writer:
+                writer.write_table(table)
+            return True
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar a entrada de cache ({description}): {e}")
+            return False
+
+    def writer(self, key: str, schema, description: str = "") -> "CacheWriter":
+        """
+        Abre um gravador incremental (por blocos) para uma nova entrada do cache.
+        """
+        return CacheWriter(self, key, schema, description)
+
+    def _commit(self, key: str, tmp_path: Path, description: str) -> None:
+        os.replace(tmp_path, self.path(key))
+        now = time.time()
+        with self._lock:
+            index = self._read_index()
+            index[key] = {
+                  "size": self.path(key).stat().st_size
+                , "created": now
+                , "last_access": now
+                , "description": description
+            }
+            self._evict(index, keep=key)
+            self._write_index(index)
+
+    # ---------------- Remoção ----------------
+
+    def _remove(self, index: dict, key: str) -> None:
+        try:
+            self.path(key).unlink(missing_ok=True)
+        except OSError as e:
+            # No Windows um arquivo ainda mapeado em memória não pode ser removido
+            logger.warning(f"Não foi possível remover a entrada de cache {key}: {e}")
+            return
+        index.pop(key, None)
+
+    def _evict(self, index: dict, keep: str = None) -> None:
+        total = sum(entry["size"] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]["last_access"]):
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            size = index[key]["size"]
+            self._remove(index, key)
+            if key not in index:
+                total -= size
+                logger.info(f"Entrada de cache removida (LRU): {key}")
+
+    def invalidate(self, key: str) -> None:
+        """
+        Remove uma entrada específica do cache.
+        """
+        with self._lock:
+            index = self._read_index()
+            self._remove(index, key)
+            self._write_index(index)
+
+    def clear(self) -> None:
+        """
+        Remove todas as entradas do cache.
+        """
+        with self._lock:
+            index = self._read_index()
+            for key in list(index):
+                self._remove(index, key)
+            self._write_index(index)
+
+
+def string_schema(columns) -> "pa.Schema":
+    """
+    Schema Arrow com todas as colunas como texto (leituras com dtype=str).
+    """
+    return pa.schema([(str(col), pa.string()) for col in columns])
+
+
+class CacheWriter:
+    """
+    Grava uma entrada do cache em blocos. A entrada só passa a valer quando o bloco `with`
+    termina sem erros; em caso de falha, o arquivo temporário é descartado.
+    """
+
+    def __init__(self, cache: SourceCache, key: str, schema, description: str = ""):
+        self.cache = cache
+        self.key = key
+        self.schema = schema
+        self.description = description
+        self.tmp_path = cache.path(key).with_suffix(f".{threading.get_ident()}.tmp")
+        self._writer = None
+
+    def __enter__(self):
+        self._writer = ipc.new_file(str(self.tmp_path), self.schema)
+        return self
+
+    def write(self, df: pd.DataFrame) -> None:
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+
+    def write_table(self, table) -> None:
+        self._writer.write_table(table)
+
+    def __exit__(self, exc_type, exc, tb):
+        self._writer.close()
+        if exc_type is None:
+            self.cache._commit(self.key, self.tmp_path, self.description)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+        return False
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_source_cache(config: dict):
+    """
+    Retorna o cache configurado na seção 'cache' do config.yaml, ou None se estiver desabilitado.
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+
+    Returns:
+        SourceCache | None: Instância compartilhada por diretório de cache.
+    """
+    cache_cfg = config.get("cache") or {}
+    if not cache_cfg.get("enabled", False):
+        return None
+
+    if not ARROW_AVAILABLE:
+        logger.warning("Cache de origens desabilitado: instale o pacote 'pyarrow'.")
+        return None
+
+    base_path = Path(__file__).parents[2].resolve()
+    directory = (base_path / cache_cfg.get("directory", DEFAULT_CACHE_DIR)).resolve()
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = SourceCache(directory, max_size=cache_cfg.get("max_size", DEFAULT_MAX_SIZE))
+        return _caches[directory]
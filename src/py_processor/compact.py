@@ -0,0 +1,269 @@
+# ------------------------------------------------------------
+# Representação compacta das origens (category / string[pyarrow])
+# ------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+from py_processor.loader import iter_source, get_chunk_size
+from py_processor.utils.tratamentos import normalize_column_names_list, normalize_values
+from py_processor.utils.logger import logger
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# Texto em buffers Arrow quando o pyarrow está instalado (senão, StringDtype do pandas)
+STRING_DTYPE = "string[pyarrow]" if pyarrow is not None else "string"
+
+# Coluna vira category quando (distintos na amostra / linhas da amostra) <= este valor
+DEFAULT_CATEGORY_RATIO = 0.05
+
+# Linhas amostradas de cada origem para estimar a cardinalidade
+DEFAULT_SAMPLE_ROWS = 100000
+
+COMPACT_DTYPES = ("category", "string")
+
+
+def _text_columns(frames) -> list:
+    columns = []
+    for df in frames:
+        for col in df.columns:
+            dtype = df[col].dtype
+            is_text = dtype == object or pd.api.types.is_string_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype)
+            if col not in columns and is_text:
+                columns.append(col)
+    return columns
+
+
+def choose_dtypes(frames, declared: dict = None, category_ratio: float = DEFAULT_CATEGORY_RATIO,
+                  sample_rows: int = DEFAULT_SAMPLE_ROWS) -> dict:
+    """
+    Escolhe o dtype compacto de cada coluna de texto: 'category' ou 'string'.
+
+    Dtypes declarados têm prioridade; as demais colunas são decididas pela cardinalidade
+    de uma amostra aleatória das origens.
+
+    Args:
+        frames (list): DataFrames das origens (ex: [origem A, origem B]).
+        declared (dict): {coluna: 'category' | 'string'} definidos no config.yaml.
+        category_ratio (float): Proporção máxima de distintos para usar 'category'.
+        sample_rows (int): Linhas amostradas de cada origem.
+
+    Returns:
+        dict: {coluna: 'category' | 'string'}.
+    """
+    declared = _validate_declared(declared)
+    samples = [df.sample(n=sample_rows, random_state=0) if len(df) > sample_rows else df for df in frames]
+    dtypes = {}
+    for col in _text_columns(frames):
+        if col in declared:
+            dtypes[col] = declared[col]
+            continue
+        if any(col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames):
+            # Já compactada em outra origem: mantém category para compartilhar o dicionário
+            dtypes[col] = "category"
+            continue
+        values = pd.concat([sample[col] for sample in samples if col in sample.columns], ignore_index=True)
+        distinct = values.nunique(dropna=True)
+        dtypes[col] = "category" if len(values) and distinct / len(values) <= category_ratio else "string"
+    return dtypes
+
+
+def compact_frames(frames, dtypes: dict) -> list:
+    """
+    Converte as colunas para os dtypes compactos.
+
+    Colunas 'category' recebem o mesmo dicionário (categorias) em todas as origens, de
+    modo que os códigos são diretamente comparáveis entre elas. Origens já compactadas
+    (ex: origem A, convertida logo após a carga) apenas têm o dicionário ampliado.
+    Texto vazio vira nulo nessas colunas, o que não altera a comparação (ver normalize_values).
+
+    As colunas convertidas substituem as originais em cópias rasas (as demais colunas não
+    são copiadas); os DataFrames recebidos, que podem estar compartilhados, não são alterados.
+
+    Returns:
+        list: Novos DataFrames, na ordem recebida.
+    """
+    frames = [df.copy(deep=False) for df in frames]
+    for col, dtype in dtypes.items():
+        present = [df for df in frames if col in df.columns]
+        if dtype == "category":
+            # Valores em texto (mesma regra da comparação); "" não entra no dicionário e vira nulo.
+            # Origens já compactadas contribuem só com o dicionário e são recodificadas.
+            texts = [
+                None if isinstance(df[col].dtype, pd.CategoricalDtype) else normalize_values(df[col])
+                for df in present
+            ]
+            categories = pd.unique(np.concatenate([
+                df[col].cat.categories.astype(str).to_numpy(dtype=object) if text is None else text
+                for df, text in zip(present, texts)
+            ]))
+            categories = categories[categories != ""]
+            for df, text in zip(present, texts):
+                if text is None:
+                    df[col] = df[col].cat.set_categories(categories)
+                else:
+                    df[col] = pd.Categorical(text, categories=categories)
+        else:
+            for df in present:
+                df[col] = df[col].astype(STRING_DTYPE)
+    return frames
+
+
+def compact_sources(frames, declared: dict = None, category_ratio: float = DEFAULT_CATEGORY_RATIO,
+                    sample_rows: int = DEFAULT_SAMPLE_ROWS) -> list:
+    """
+    Escolhe os dtypes compactos (choose_dtypes) e converte as origens (compact_frames).
+    """
+    declared = _validate_declared(declared)
+    dtypes = choose_dtypes(frames, declared, category_ratio, sample_rows)
+
+    before = sum(int(df.memory_usage(deep=True).sum()) for df in frames)
+    frames = compact_frames(frames, dtypes)
+    after = sum(int(df.memory_usage(deep=True).sum()) for df in frames)
+
+    categories = [col for col, dtype in dtypes.items() if dtype == "category"]
+    logger.info(
+        f"Carga compacta: {len(categories)} colunas category {categories}, "
+        f"{len(dtypes) - len(categories)} colunas {STRING_DTYPE}. "
+        f"Memória: {before / 2**20:.1f} MB -> {after / 2**20:.1f} MB"
+    )
+    return frames
+
+
+def _validate_declared(declared: dict) -> dict:
+    declared = {normalize_column_names_list([col])[0]: dtype for col, dtype in (declared or {}).items()}
+    for col, dtype in declared.items():
+        if dtype not in COMPACT_DTYPES:
+            raise ValueError(f"dtype '{dtype}' da coluna {col} não suportado. Use: {', '.join(COMPACT_DTYPES)}.")
+    return declared
+
+
+def _is_text(series: pd.Series) -> bool:
+    return series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+
+
+def _as_strings(codes: np.ndarray, categories: pd.Index):
+    # Códigos de um bloco category de volta para texto (string[pyarrow]); -1 vira nulo
+    values = np.append(categories.to_numpy(dtype=object), None)[codes]
+    return pd.array(values, dtype=STRING_DTYPE)
+
+
+def _demote(kinds: dict, parts: dict, dictionaries: dict, declared: dict, limit: float) -> None:
+    # Colunas category (não declaradas) com mais de `limit` distintos passam a string
+    for col, kind in kinds.items():
+        if kind == "category" and col not in declared and len(dictionaries.get(col, ())) > limit:
+            index = dictionaries.pop(col)
+            parts[col] = [_as_strings(codes, index) for codes in parts[col]]
+            kinds[col] = "string"
+
+
+def load_compact(config: dict, source_key: str, declared: dict = None, category_ratio: float = DEFAULT_CATEGORY_RATIO,
+                 sample_rows: int = DEFAULT_SAMPLE_ROWS, reference: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Carrega uma fonte em blocos (iter_source) já na representação compacta, sem montar a
+    origem inteira em strings Python: cada bloco de texto é convertido e descartado.
+
+    Colunas 'category' guardam só os códigos de cada bloco, com o dicionário ampliado a cada
+    bloco (valores novos entram no fim, mantendo os códigos anteriores). Toda coluna de texto
+    começa como 'category'; depois de `sample_rows` linhas, as que passam de `category_ratio`
+    distintos por linha (e não foram declaradas) viram 'string' (string[pyarrow]).
+
+    Com `reference` (outra origem já carregada por load_compact, ex: origem A), as colunas
+    seguem os dtypes dela e os dicionários são compartilhados: a referência tem as categorias
+    ampliadas no próprio DataFrame, sem recodificação (os códigos dela continuam válidos).
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        source_key (str): Nome da fonte no config.yaml.
+        declared (dict): {coluna: 'category' | 'string'} definidos no config.yaml.
+        category_ratio (float): Proporção máxima de distintos para manter 'category'.
+        sample_rows (int): Linhas lidas antes de decidir a cardinalidade.
+        reference (pd.DataFrame): Origem compacta com a qual os dicionários são compartilhados.
+
+    Returns:
+        pd.DataFrame: Origem com colunas category, string[pyarrow] e as demais como lidas.
+    """
+    declared = _validate_declared(declared)
+    dictionaries = {}
+    if reference is not None:
+        for col in reference.columns:
+            if isinstance(reference[col].dtype, pd.CategoricalDtype):
+                declared[col] = "category"
+                dictionaries[col] = pd.Index(reference[col].cat.categories.astype(str), dtype=object)
+            elif pd.api.types.is_string_dtype(reference[col].dtype) and col not in declared:
+                declared[col] = "string"
+
+    columns, kinds, parts = None, {}, {}
+    rows = 0
+    for chunk in iter_source(config, source_key, get_chunk_size(config)):
+        if columns is None:
+            columns = list(chunk.columns)
+            for col in columns:
+                kinds[col] = declared.get(col) or ("category" if _is_text(chunk[col]) else None)
+                parts[col] = []
+
+        for col in columns:
+            values = chunk[col]
+            if kinds[col] == "category":
+                # Mesma regra de texto da comparação; "" não entra no dicionário (código -1)
+                text = normalize_values(values)
+                index = dictionaries.get(col, pd.Index([], dtype=object))
+                codes = index.get_indexer(text)
+                missing = (codes < 0) & (text != "")
+                if missing.any():
+                    index = index.append(pd.Index(pd.unique(text[missing]), dtype=object))
+                    dictionaries[col] = index
+                    codes[missing] = index.get_indexer(text[missing])
+                parts[col].append(codes.astype(np.int32))
+            elif kinds[col] == "string":
+                parts[col].append(values.astype(STRING_DTYPE).array)
+            else:
+                parts[col].append(values.reset_index(drop=True))
+        rows += len(chunk)
+        del chunk
+
+        if rows >= sample_rows:
+            _demote(kinds, parts, dictionaries, declared, category_ratio * rows)
+
+    if columns is None:
+        return pd.DataFrame()
+    # Origem menor que sample_rows: decidida com todas as linhas
+    _demote(kinds, parts, dictionaries, declared, category_ratio * rows)
+
+    data = {}
+    for col in columns:
+        col_parts = parts.pop(col)
+        if kinds[col] == "category":
+            categories = dictionaries.get(col, pd.Index([], dtype=object))
+            data[col] = pd.Categorical.from_codes(np.concatenate(col_parts), categories=categories)
+        elif kinds[col] == "string":
+            data[col] = pd.concat([pd.Series(part, copy=False) for part in col_parts], ignore_index=True).array
+        else:
+            data[col] = pd.concat(col_parts, ignore_index=True)
+        del col_parts
+    df = pd.DataFrame(data, copy=False)
+
+    if reference is not None:
+        for col, index in dictionaries.items():
+            if col in reference.columns and isinstance(reference[col].dtype, pd.CategoricalDtype):
+                reference[col] = reference[col].cat.set_categories(index)
+
+    categories = [col for col in columns if kinds[col] == "category"]
+    strings = [col for col in columns if kinds[col] == "string"]
+    logger.info(
+        f"{source_key} carregada compacta: {len(categories)} colunas category {categories}, "
+        f"{len(strings)} colunas {STRING_DTYPE}. Memória: {df.memory_usage(deep=True).sum() / 2**20:.1f} MB"
+    )
+    return df
+
+
+def shared_categories(*series: pd.Series) -> bool:
+    """
+    Indica se as séries são categóricas com o mesmo dicionário (códigos comparáveis entre si).
+    """
+    if not all(isinstance(s.dtype, pd.CategoricalDtype) for s in series):
+        return False
+    first = series[0].cat.categories
+    return all(s.cat.categories.equals(first) for s in series[1:])
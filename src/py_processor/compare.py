@@ -0,0 +1,188 @@
+# ------------------------------------------------------------
+# Motor de comparação colunar (pandas/NumPy)
+# ------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+from py_processor.utils.tratamentos import normalize_column_names_list, normalize_column_names_df, normalize_values
+from py_processor.fingerprint import row_fingerprints, fingerprints_for
+from py_processor.key_index import KeyIndex
+from py_processor.compact import shared_categories
+import py_processor.rust_bridge as rust_bridge
+
+# Colunas do DataFrame de diferenças (formato longo: uma linha por coluna divergente)
+DIFF_COLUMN = "COLUNA"
+DIFF_VALUE_A = "VALOR_ORIGEM_A"
+DIFF_VALUE_B = "VALOR_ORIGEM_B"
+
+COMPARE_ENGINES = ("auto", "rust", "pandas")
+
+
+def validate_key_columns(df: pd.DataFrame, key_columns: list, source: str) -> None:
+    """
+    Garante que todas as colunas-chave existem no DataFrame informado.
+    """
+    if not key_columns:
+        raise ValueError("Nenhuma coluna-chave definida para a comparação.")
+
+    missing = [col for col in key_columns if col not in df.columns]
+    if missing:
+        raise KeyError(f"Colunas-chave ausentes na {source}: {missing}")
+
+
+def comparable_columns(df_origemA: pd.DataFrame, df_origemB: pd.DataFrame, key_columns: list) -> list:
+    """
+    Colunas comparadas entre as origens: presentes nas duas, exceto as chaves (na ordem da origem A).
+    """
+    return [col for col in df_origemA.columns if col in df_origemB.columns and col not in key_columns]
+
+
+def diff_columns(df_origemA: pd.DataFrame, df_origemB: pd.DataFrame, rows_a: np.ndarray,
+                 rows_b: np.ndarray, key_columns: list) -> pd.DataFrame:
+    """
+    Compara, coluna a coluna, os pares de linhas (rows_a[i], rows_b[i]) das duas origens.
+
+    Apenas as colunas presentes nas duas origens (exceto as chaves) são comparadas.
+
+    Returns:
+        pd.DataFrame: Chaves + COLUNA, VALOR_ORIGEM_A e VALOR_ORIGEM_B para cada divergência.
+    """
+    value_columns = comparable_columns(df_origemA, df_origemB, key_columns)
+    result_columns = list(key_columns) + [DIFF_COLUMN, DIFF_VALUE_A, DIFF_VALUE_B]
+
+    keys_a = df_origemA[key_columns].take(rows_a).reset_index(drop=True)
+    pieces = []
+    for col in value_columns:
+        column_a = df_origemA[col].take(rows_a)
+        column_b = df_origemB[col].take(rows_b)
+        if shared_categories(column_a, column_b):
+            # Mesmo dicionário nas duas origens: compara os códigos e converte só as divergências
+            diff_idx = np.flatnonzero(column_a.cat.codes.to_numpy() != column_b.cat.codes.to_numpy())
+            values_a = normalize_values(column_a.iloc[diff_idx])
+            values_b = normalize_values(column_b.iloc[diff_idx])
+        else:
+            values_a = normalize_values(column_a)
+            values_b = normalize_values(column_b)
+            diff_idx = np.flatnonzero(values_a != values_b)
+            values_a = values_a[diff_idx]
+            values_b = values_b[diff_idx]
+        if len(diff_idx) == 0:
+            continue
+
+        piece = keys_a.take(diff_idx).reset_index(drop=True)
+        piece[DIFF_COLUMN] = col
+        piece[DIFF_VALUE_A] = values_a
+        piece[DIFF_VALUE_B] = values_b
+        pieces.append(piece)
+
+    if not pieces:
+        return pd.DataFrame(columns=result_columns)
+    return pd.concat(pieces, ignore_index=True)[result_columns]
+
+
+def compare_columnar(df_origemA: pd.DataFrame, df_origemB: pd.DataFrame, key_columns: list,
+                     fingerprints_a: pd.DataFrame = None, fingerprints_b: pd.DataFrame = None,
+                     key_index: KeyIndex = None):
+    """
+    Compara duas origens diretamente sobre os DataFrames, sem converter para listas de dicionários.
+
+    As chaves são fatoradas em códigos inteiros compartilhados, o join é feito por
+    endereçamento direto (hash join sobre os códigos) e as colunas não-chave são
+    comparadas de forma vetorizada. Quando uma chave se repete em uma origem, vale a
+    última ocorrência no pareamento (mesmo comportamento de um dicionário por chave).
+
+    Antes da comparação coluna a coluna, os pares são filtrados pelo fingerprint da
+    linha: chaves com o mesmo hash nas duas origens são descartadas e só as demais
+    seguem para o diff completo.
+
+    Args:
+        df_origemA (pd.DataFrame): Dados da origem A.
+        df_origemB (pd.DataFrame): Dados da origem B.
+        key_columns (list): Colunas que compõem a chave.
+        fingerprints_a (pd.DataFrame): Fingerprints já calculados da origem A (opcional).
+        fingerprints_b (pd.DataFrame): Fingerprints já calculados da origem B (opcional).
+        key_index (KeyIndex): Índice das chaves já construído para (origem A, origem B), p.ex. na
+            verificação de duplicidade. Quando não corresponde às origens, é reconstruído.
+
+    Returns:
+        tuple: (somente na origem A, somente na origem B, diferenças), todos pd.DataFrame.
+    """
+    df_origemA = normalize_column_names_df(df_origemA)
+    df_origemB = normalize_column_names_df(df_origemB)
+    key_columns = normalize_column_names_list(key_columns)
+
+    validate_key_columns(df_origemA, key_columns, "origem A")
+    validate_key_columns(df_origemB, key_columns, "origem B")
+
+    if key_index is None or not key_index.matches(key_columns, df_origemA, df_origemB):
+        key_index = KeyIndex.build(key_columns, df_origemA, df_origemB)
+    codes_a, codes_b = key_index.codes
+    positions_a = key_index.positions(0)
+    positions_b = key_index.positions(1)
+
+    only_in_origemA = df_origemA.iloc[np.flatnonzero(positions_b[codes_a] < 0)].reset_index(drop=True)
+    only_in_origemB = df_origemB.iloc[np.flatnonzero(positions_a[codes_b] < 0)].reset_index(drop=True)
+
+    matched = np.flatnonzero((positions_a >= 0) & (positions_b >= 0))
+    rows_a = positions_a[matched]
+    rows_b = positions_b[matched]
+
+    # Fingerprints: pares com o mesmo hash não precisam do diff coluna a coluna
+    value_columns = comparable_columns(df_origemA, df_origemB, key_columns)
+    hashes_a = fingerprints_for(fingerprints_a, df_origemA, value_columns)
+    hashes_b = fingerprints_for(fingerprints_b, df_origemB, value_columns)
+    hashes_a = row_fingerprints(df_origemA.take(rows_a), value_columns) if hashes_a is None else hashes_a[rows_a]
+    hashes_b = row_fingerprints(df_origemB.take(rows_b), value_columns) if hashes_b is None else hashes_b[rows_b]
+    changed = np.flatnonzero(hashes_a != hashes_b)
+
+    differences = diff_columns(
+          df_origemA
+        , df_origemB
+        , rows_a[changed]
+        , rows_b[changed]
+        , key_columns
+    )
+
+    return only_in_origemA, only_in_origemB, differences
+
+
+def resolve_engine(engine: str = "auto") -> str:
+    """
+    Resolve o motor de comparação. 'auto' usa o Rust quando `rust_core` está disponível.
+    """
+    engine = (engine or "auto").lower()
+    if engine not in COMPARE_ENGINES:
+        raise ValueError(f"Motor de comparação '{engine}' não suportado. Use um de: {COMPARE_ENGINES}")
+
+    if engine == "auto":
+        return "rust" if rust_bridge.RUST_AVAILABLE else "pandas"
+    return engine
+
+
+def compare_sources(df_origemA: pd.DataFrame, df_origemB: pd.DataFrame, key_columns: list, engine: str = "auto",
+                    fingerprints_a: pd.DataFrame = None, fingerprints_b: pd.DataFrame = None,
+                    key_index: KeyIndex = None):
+    """
+    Compara as origens A e B com o motor configurado em `comparison.engine`.
+
+    Args:
+        df_origemA (pd.DataFrame): Dados da origem A.
+        df_origemB (pd.DataFrame): Dados da origem B.
+        key_columns (list): Colunas que compõem a chave.
+        engine (str): 'auto', 'rust' ou 'pandas'.
+        fingerprints_a (pd.DataFrame): Fingerprints já calculados da origem A (só no motor 'pandas').
+        fingerprints_b (pd.DataFrame): Fingerprints já calculados da origem B (só no motor 'pandas').
+        key_index (KeyIndex): Índice das chaves de (origem A, origem B) já construído (só no motor 'pandas').
+
+    Returns:
+        tuple: (somente na origem A, somente na origem B, diferenças), todos pd.DataFrame.
+    """
+    engine = resolve_engine(engine)
+
+    if engine == "rust":
+        only_in_origemA, only_in_origemB, differences = rust_bridge.compare_with_rust(
+            df_origemA, df_origemB, key_columns
+        )
+        return pd.DataFrame(only_in_origemA), pd.DataFrame(only_in_origemB), pd.DataFrame(differences)
+
+    return compare_columnar(df_origemA, df_origemB, key_columns, fingerprints_a, fingerprints_b, key_index)
@@ -0,0 +1,103 @@
+# ------------------------------------------------------------
+# Leitura de planilhas Excel em blocos (openpyxl em modo somente leitura)
+# ------------------------------------------------------------
+
+import datetime
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+from py_processor.utils.tratamentos import normalize_column_names_list
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Extensões lidas linha a linha pelo openpyxl; '.xls' (formato binário antigo) passa pelo pandas/xlrd
+STREAMING_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+def _cell_text(value):
+    # Mesmo texto de pd.read_excel(dtype=str): inteiros sem '.0', vazios como nulo
+    if value is None or isinstance(value, str):
+        return value or None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime.datetime):
+        return str(pd.Timestamp(value))
+    return str(value)
+
+
+def _header(row) -> list:
+    return [str(value) if value is not None else f"Unnamed: {i}" for i, value in enumerate(row)]
+
+
+def _select(header: list, columns: list, source: str) -> list:
+    # Posições das colunas pedidas em 'columns' (nomes comparados já normalizados)
+    names = normalize_column_names_list(header)
+    if not columns:
+        return list(range(len(names)))
+    wanted = normalize_column_names_list(columns)
+    missing = [col for col in wanted if col not in names]
+    if missing:
+        raise KeyError(f"Colunas ausentes na planilha {source}: {missing}")
+    return [i for i, name in enumerate(names) if name in wanted]
+
+
+def iter_excel(file_path: Path, source_cfg: dict, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Lê uma planilha em blocos de até `chunk_size` linhas, sem montar a pasta de trabalho
+    inteira em memória (openpyxl read_only).
+
+    Opções da fonte: 'sheet' (nome ou posição, padrão: primeira aba) e 'columns' (apenas
+    as colunas informadas são convertidas). A primeira linha é o cabeçalho e linhas
+    totalmente vazias são ignoradas. Os valores seguem o texto de pd.read_excel(dtype=str).
+
+    Yields:
+        pd.DataFrame: Blocos com os nomes de colunas normalizados e valores em texto.
+    """
+    file_path = Path(file_path)
+    sheet = source_cfg.get("sheet", 0)
+    columns = source_cfg.get("columns") or []
+
+    if file_path.suffix.lower() not in STREAMING_EXTENSIONS:
+        # .xls: sem leitura em streaming; carrega a aba e entrega fatiada
+        df = pd.read_excel(file_path, sheet_name=sheet, dtype=str)
+        df = df.iloc[:, _select(list(df.columns), columns, str(file_path))]
+        df.columns = normalize_column_names_list(list(df.columns))
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size].reset_index(drop=True)
+        return
+
+    if openpyxl is None:
+        raise ImportError("A leitura de planilhas .xlsx requer o pacote 'openpyxl'.")
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        # Sem a dimensão gravada no arquivo, cada linha vem com as células que tiver: a largura
+        # passa a ser a do cabeçalho (colunas sem título além dele são ignoradas)
+        if worksheet.max_column is None or worksheet.max_row is None:
+            worksheet.reset_dimensions()
+        rows = worksheet.iter_rows(values_only=True)
+
+        first = next(rows, None)
+        if first is None:
+            return
+        header = _header(first)
+        positions = _select(header, columns, str(file_path))
+        names = normalize_column_names_list([header[i] for i in positions])
+
+        block = []
+        for row in rows:
+            if all(value is None or value == "" for value in row):
+                continue
+            block.append([_cell_text(row[i]) if i < len(row) else None for i in positions])
+            if len(block) >= chunk_size:
+                yield pd.DataFrame(block, columns=names, dtype=object)
+                block = []
+        if block:
+            yield pd.DataFrame(block, columns=names, dtype=object)
+    finally:
+        workbook.close()
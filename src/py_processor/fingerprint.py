@@ -0,0 +1,134 @@
+# ------------------------------------------------------------
+# Fingerprints de linhas (hash de 64 bits das colunas não-chave)
+# ------------------------------------------------------------
+
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from py_processor.utils.tratamentos import normalize_column_names_list, normalize_values
+
+# Nome da coluna com o hash da linha no DataFrame de fingerprints
+FINGERPRINT_COLUMN = "FINGERPRINT"
+
+
+def row_fingerprints(df: pd.DataFrame, value_columns: list) -> np.ndarray:
+    """
+    Calcula um hash de 64 bits por linha a partir das colunas informadas.
+
+    Os valores passam pela mesma normalização da comparação (texto, nulos como ""),
+    portanto linhas iguais na comparação coluna a coluna têm o mesmo fingerprint,
+    mesmo quando as origens têm dtypes diferentes. A ordem das colunas faz parte do hash.
+
+    Args:
+        df (pd.DataFrame): Dados da origem.
+        value_columns (list): Colunas que entram no hash, na ordem desejada.
+
+    Returns:
+        np.ndarray: Array uint64 com um fingerprint por linha.
+    """
+    if not value_columns:
+        return np.zeros(len(df), dtype=np.uint64)
+
+    # Uma coluna em texto por vez (não o DataFrame inteiro), combinadas como em
+    # pd.util.hash_pandas_object: o resultado é o mesmo de um DataFrame normalizado
+    out = np.full(len(df), 0x345678, dtype=np.uint64)
+    mult = np.uint64(1000003)
+    for i, col in enumerate(value_columns):
+        out ^= column_hashes(df[col])
+        out *= mult
+        mult += np.uint64(82520 + 2 * (len(value_columns) - i))
+    out += np.uint64(97531)
+    return out
+
+
+def column_hashes(series: pd.Series) -> np.ndarray:
+    """
+    Hash de 64 bits dos valores normalizados (normalize_values) de uma coluna. Colunas
+    category calculam o hash apenas do dicionário.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(str).to_numpy(dtype=object)
+        return pd.util.hash_array(np.append(categories, ""))[series.cat.codes.to_numpy()]
+    return pd.util.hash_array(normalize_values(series))
+
+
+def compute_fingerprints(df: pd.DataFrame, key_columns: list, value_columns: list = None) -> pd.DataFrame:
+    """
+    Monta o DataFrame de fingerprints de uma origem: colunas-chave + FINGERPRINT.
+
+    As colunas usadas no hash ficam registradas em `attrs["value_columns"]`, permitindo
+    verificar se fingerprints calculados antes podem ser reaproveitados.
+
+    Args:
+        df (pd.DataFrame): Dados da origem (colunas já normalizadas).
+        key_columns (list): Colunas que compõem a chave.
+        value_columns (list): Colunas do hash. Padrão: todas as colunas não-chave.
+
+    Returns:
+        pd.DataFrame: Uma linha por registro, na mesma ordem do DataFrame de entrada.
+    """
+    key_columns = normalize_column_names_list(key_columns)
+    if value_columns is None:
+        value_columns = [col for col in df.columns if col not in key_columns]
+
+    fingerprints = df[key_columns].reset_index(drop=True)
+    fingerprints[FINGERPRINT_COLUMN] = row_fingerprints(df, value_columns)
+    fingerprints.attrs["value_columns"] = list(value_columns)
+    return fingerprints
+
+
+def fingerprints_for(fingerprints: pd.DataFrame, df: pd.DataFrame, value_columns: list) -> np.ndarray:
+    """
+    Reaproveita fingerprints já calculados quando eles correspondem ao DataFrame e às colunas informadas.
+
+    Returns:
+        np.ndarray | None: Os fingerprints, ou None quando precisam ser recalculados.
+    """
+    if fingerprints is None or len(fingerprints) != len(df):
+        return None
+    if fingerprints.attrs.get("value_columns") != list(value_columns):
+        return None
+    return fingerprints[FINGERPRINT_COLUMN].to_numpy()
+
+
+def save_fingerprints(fingerprints: pd.DataFrame, path, cache_key: str = None) -> Path:
+    """
+    Grava o DataFrame de fingerprints (e as colunas usadas no hash) em disco.
+
+    `cache_key` identifica a versão da origem (ver source_cache_key) para que uma execução
+    seguinte só reaproveite os fingerprints se a origem não mudou.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(
+            {"cache_key": cache_key, "value_columns": fingerprints.attrs.get("value_columns"), "fingerprints": fingerprints}
+            , f
+            , protocol=pickle.HIGHEST_PROTOCOL
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_fingerprints(path, cache_key: str = None) -> pd.DataFrame:
+    """
+    Lê um DataFrame de fingerprints gravado por save_fingerprints.
+
+    Returns:
+        pd.DataFrame | None: Os fingerprints, ou None se o arquivo não existe, não pode ser
+                             lido ou foi gravado para outra versão da origem (`cache_key`).
+    """
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    if cache_key is not None and data.get("cache_key") != cache_key:
+        return None
+    fingerprints = data["fingerprints"]
+    fingerprints.attrs["value_columns"] = data["value_columns"]
+    return fingerprints
@@ -0,0 +1,218 @@
+# ------------------------------------------------------------
+# Reconciliação incremental a partir de snapshots chave → hash
+# ------------------------------------------------------------
+
+import hashlib
+import json
+import pickle
+from pathlib import Path
+
+import pandas as pd
+from py_processor.compare import compare_sources
+from py_processor.key_index import KeyIndex
+from py_processor.loader import resolve_path
+from py_processor.pushdown import HASH_COLUMN, WATERMARK_COLUMN, PushdownSource, changed_keys
+from py_processor.utils.tratamentos import normalize_column_names_list, normalize_values
+from py_processor.utils.logger import logger
+
+DEFAULT_SNAPSHOT_DIR = "data/snapshots"
+RESULTS_FILE = "results.pkl"
+RESULT_NAMES = ("only_in_origemA", "only_in_origemB", "differences")
+
+
+def source_signature(source_cfg: dict) -> str:
+    """
+    Identifica a definição de uma origem: o snapshot só é reaproveitado enquanto ela não mudar.
+    """
+    payload = {key: value for key, value in source_cfg.items() if key != "password"}
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SnapshotStore:
+    """
+    Snapshots da última execução: chaves + hash (+ watermark) de cada origem e os resultados da comparação.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}_snapshot.pkl"
+
+    def _load(self, path: Path):
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save(self, path: Path, data) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+
+    def load_snapshot(self, source: str, meta: dict) -> pd.DataFrame:
+        """
+        Retorna o snapshot da origem, ou None se não existir ou tiver sido gerado com outra configuração.
+        """
+        data = self._load(self._path(source))
+        if data is None or data["meta"] != meta:
+            return None
+        snapshot = data["snapshot"]
+        snapshot.attrs["watermark_max"] = data.get("watermark_max")
+        return snapshot
+
+    def save_snapshot(self, source: str, meta: dict, snapshot: pd.DataFrame) -> None:
+        watermark_max = None
+        if WATERMARK_COLUMN in snapshot and snapshot[WATERMARK_COLUMN].notna().any():
+            watermark_max = snapshot[WATERMARK_COLUMN].dropna().max()
+        self._save(self._path(source), {"meta": meta, "snapshot": snapshot, "watermark_max": watermark_max})
+
+    def load_results(self, meta: dict):
+        data = self._load(self.directory / RESULTS_FILE)
+        if data is None or data["meta"] != meta:
+            return None
+        return data["results"]
+
+    def save_results(self, meta: dict, results: tuple) -> None:
+        self._save(self.directory / RESULTS_FILE, {"meta": meta, "results": dict(zip(RESULT_NAMES, results))})
+
+
+def _key_tuples(df: pd.DataFrame, key_columns: list) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([normalize_values(df[col]) for col in key_columns])
+
+
+def touched_keys(previous: pd.DataFrame, current: pd.DataFrame, key_columns: list) -> pd.DataFrame:
+    """
+    Chaves inseridas, removidas ou alteradas entre dois snapshots da mesma origem.
+
+    Uma chave é considerada tocada quando o conjunto de pares (chave, hash) difere
+    entre os snapshots, o que também cobre chaves duplicadas.
+    """
+    index = KeyIndex.build(list(key_columns) + [HASH_COLUMN], previous, current)
+    changed = index.counts(0) != index.counts(1)
+    rows = pd.concat([
+          previous.loc[changed[index.codes[0]], key_columns]
+        , current.loc[changed[index.codes[1]], key_columns]
+    ], ignore_index=True)
+    return rows.drop_duplicates(ignore_index=True)
+
+
+def extract_snapshot(source: PushdownSource, key_columns: list, value_columns: list, previous: pd.DataFrame,
+                     watermark: str = None) -> pd.DataFrame:
+    """
+    Snapshot atual da origem (chaves + hash).
+
+    Com watermark e snapshot anterior, apenas as linhas com watermark >= ao maior valor
+    anterior são extraídas; as demais são mantidas do snapshot anterior, exceto chaves
+    que voltaram na extração. Exclusões abaixo do watermark não são detectadas.
+    """
+    since = previous.attrs.get("watermark_max") if previous is not None and watermark else None
+    current = source.key_hashes(key_columns, value_columns, watermark=watermark, since=since)
+    if since is None or not source.is_database:
+        return current
+
+    kept = previous[previous[WATERMARK_COLUMN] < since]
+    kept = kept[~_key_tuples(kept, key_columns).isin(_key_tuples(current, key_columns))]
+    logger.info(f"{source.source_key}: {len(current)} linhas extraídas a partir do watermark {since}")
+    return pd.concat([kept, current], ignore_index=True)
+
+
+def incremental_compare(sources: dict, key_columns: list, value_columns: list, store: SnapshotStore,
+                        watermarks: dict = None, engine: str = "auto"):
+    """
+    Compara as origens reaproveitando os snapshots e resultados da execução anterior.
+
+    Somente as chaves inseridas, removidas ou alteradas em qualquer uma das origens desde
+    a última execução têm as linhas completas buscadas e comparadas; os resultados das
+    demais chaves vêm da execução anterior. Sem estado anterior compatível, a comparação
+    é feita em duas fases (pushdown) sobre todas as chaves: as ausentes em uma das
+    origens ou com hash diferente são buscadas nas duas (ver changed_keys).
+
+    Args:
+        sources (dict): {'origemA': PushdownSource, 'origemB': PushdownSource}.
+        key_columns (list): Colunas que compõem a chave (normalizadas).
+        value_columns (list): Colunas comparadas (ver resolve_value_columns).
+        store (SnapshotStore): Local dos snapshots.
+        watermarks (dict): Coluna de watermark de cada origem (opcional).
+        engine (str): 'auto', 'rust' ou 'pandas'.
+
+    Returns:
+        tuple: (snapshots atuais por origem, (somente na origem A, somente na origem B, diferenças)).
+    """
+    watermarks = watermarks or {}
+    metas, snapshots, touched = {}, {}, []
+
+    for name, source in sources.items():
+        watermark = watermarks.get(name)
+        metas[name] = {
+              "source": source_signature(source.source_cfg)
+            , "key_columns": list(key_columns)
+            , "value_columns": list(value_columns)
+            , "watermark": watermark
+        }
+        previous = store.load_snapshot(name, metas[name])
+        snapshots[name] = extract_snapshot(source, key_columns, value_columns, previous, watermark)
+
+        if previous is None:
+            logger.info(f"{name}: nenhum snapshot compatível encontrado; comparação completa.")
+            touched = None
+        elif touched is not None:
+            keys = touched_keys(previous, snapshots[name], key_columns)
+            logger.info(f"{name}: {len(keys)} chaves inseridas, removidas ou alteradas desde a última execução")
+            touched.append(keys)
+
+    previous_results = store.load_results(metas) if touched is not None else None
+
+    names = list(sources)
+    if previous_results is None:
+        keys = changed_keys(snapshots[names[0]], snapshots[names[1]], key_columns)
+    else:
+        keys = pd.concat(touched, ignore_index=True).drop_duplicates(ignore_index=True)
+    rows = [sources[name].fetch_rows(keys, key_columns) for name in names]
+    changed = compare_sources(rows[0], rows[1], key_columns, engine=engine)
+
+    if previous_results is None:
+        results = changed
+    else:
+        # Resultados anteriores das chaves não tocadas + comparação das chaves tocadas.
+        # As chaves das linhas buscadas entram no filtro com a mesma representação dos resultados.
+        wanted = _key_tuples(keys, key_columns)
+        for frame in rows:
+            wanted = wanted.union(_key_tuples(frame, key_columns))
+        results = []
+        for name, part in zip(RESULT_NAMES, changed):
+            kept = previous_results[name]
+            if not kept.empty:
+                kept = kept[~_key_tuples(kept, key_columns).isin(wanted)]
+            frames = [frame for frame in (kept, part) if frame is not None and not frame.empty]
+            results.append(pd.concat(frames, ignore_index=True) if frames else part)
+        results = tuple(results)
+
+    for name in names:
+        store.save_snapshot(name, metas[name], snapshots[name])
+    store.save_results(metas, results)
+    return snapshots, results
+
+
+def get_snapshot_store(config: dict) -> SnapshotStore:
+    """
+    Snapshots no diretório 'incremental.snapshot_dir' do config.yaml.
+    """
+    incremental_cfg = config.get("incremental") or {}
+    return SnapshotStore(resolve_path(incremental_cfg.get("snapshot_dir", DEFAULT_SNAPSHOT_DIR)))
+
+
+def get_watermarks(config: dict, source_keys) -> dict:
+    """
+    Coluna de watermark de cada origem ('watermark' na configuração da fonte), normalizada.
+    """
+    watermarks = {}
+    for source in source_keys:
+        watermark = config["sources"][source].get("watermark")
+        if watermark:
+            watermarks[source] = normalize_column_names_list([watermark])[0]
+    return watermarks
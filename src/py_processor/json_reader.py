@@ -0,0 +1,132 @@
+# ------------------------------------------------------------
+# Leitura de JSON Lines e de arrays JSON grandes em blocos
+# ------------------------------------------------------------
+
+import json
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+from py_processor.utils.tratamentos import normalize_column_names_list
+from py_processor.utils.logger import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Extensões lidas linha a linha (um objeto JSON por linha)
+LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+# Caracteres lidos por vez do arquivo de array JSON
+BLOCK_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def is_json_array(file_path: Path, encoding: str = "utf-8") -> bool:
+    """
+    Indica se o arquivo .json é um array de objetos (o primeiro caractere útil é '[').
+    """
+    with open(file_path, "r", encoding=encoding) as f:
+        while block := f.read(4096):
+            stripped = block.lstrip("\ufeff \t\r\n")
+            if stripped:
+                return stripped[0] == "["
+    return False
+
+
+def _text(value):
+    # Valores em texto, como nas leituras com dtype=str; objetos e listas aninhados viram JSON
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _lines(f) -> Iterator[dict]:
+    for line in f:
+        if line.strip():
+            yield _loads(line)
+
+
+def _array(f) -> Iterator[dict]:
+    # Decodifica um elemento por vez (raw_decode, em C); o buffer guarda só o trecho ainda não lido
+    buffer = f.read(BLOCK_SIZE).lstrip("\ufeff \t\r\n")
+    if not buffer.startswith("["):
+        raise ValueError("O arquivo JSON não é um array de objetos.")
+    pos, eof = 1, False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            record, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            block = f.read(BLOCK_SIZE)
+            eof = not block
+            buffer = buffer[pos:] + block
+            pos = 0
+            continue
+        yield record
+        pos = end
+
+
+def iter_json(file_path: Path, source_cfg: dict, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Lê um arquivo JSON Lines (.jsonl/.ndjson) ou um array JSON de objetos em blocos de
+    `chunk_size` linhas, sem carregar o texto inteiro. Linhas JSONL usam o orjson, quando
+    instalado.
+
+    As colunas são as de 'columns' da fonte (projeção) ou, sem ela, os campos presentes no
+    primeiro bloco; campos que só aparecem depois são ignorados (com aviso), para que todos
+    os blocos tenham as mesmas colunas. Os valores chegam como texto.
+
+    Yields:
+        pd.DataFrame: Blocos com os nomes de colunas normalizados.
+    """
+    file_path = Path(file_path)
+    columns = normalize_column_names_list(source_cfg.get("columns") or []) or None
+    projected = columns is not None
+    names = {}
+    ignored = set()
+
+    def normalized(key):
+        if key not in names:
+            names[key] = normalize_column_names_list([str(key)])[0]
+        return names[key]
+
+    def frame(block):
+        nonlocal columns
+        # dtype object: inteiros com ausências não viram float ('1' e não '1.0')
+        df = pd.DataFrame(block, dtype=object)
+        df.columns = [normalized(key) for key in df.columns]
+        df = df.loc[:, ~df.columns.duplicated()]
+        if columns is None:
+            columns = list(df.columns)
+        for name in df.columns.difference(columns):
+            if not projected and name not in ignored:
+                ignored.add(name)
+                logger.warning(f"Campo '{name}' ausente no primeiro bloco de {file_path.name}: ignorado")
+        df = df.reindex(columns=columns)
+        for col in columns:
+            df[col] = df[col].map(_text, na_action="ignore")
+        return df.where(df.notna(), None)
+
+    with open(file_path, "r", encoding=source_cfg.get("encoding", "utf-8")) as f:
+        records = _lines(f) if file_path.suffix.lower() in LINES_EXTENSIONS else _array(f)
+        block = []
+        for record in records:
+            if not isinstance(record, dict):
+                raise ValueError(f"Registro JSON não é um objeto em {file_path}: {str(record)[:100]}")
+            block.append(record)
+            if len(block) >= chunk_size:
+                yield frame(block)
+                block = []
+        if block:
+            yield frame(block)
@@ -0,0 +1,112 @@
+# ------------------------------------------------------------
+# Índice de chaves compostas compartilhado entre duplicidade e comparação
+# ------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+from py_processor.compact import shared_categories
+from py_processor.utils.tratamentos import normalize_column_names_list, normalize_values
+
+
+def hash_keys(df: pd.DataFrame, key_columns: list) -> np.ndarray:
+    """
+    Hash de 64 bits da chave composta de cada linha (valores normalizados para texto).
+
+    Usado quando as origens chegam em blocos e não é possível fatorar todas as chaves de
+    uma vez (particionamento e duplicidade em streaming).
+    """
+    keys = pd.DataFrame({col: normalize_values(df[col]) for col in key_columns})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _column_codes(columns: list):
+    """
+    Códigos de uma coluna-chave sobre a concatenação das origens e a quantidade de códigos.
+
+    Colunas categóricas com o mesmo dicionário em todas as origens (carga compacta) usam
+    os próprios códigos, sem converter os valores para texto; os nulos recebem um código extra.
+    """
+    if shared_categories(*columns):
+        n_categories = len(columns[0].cat.categories)
+        codes = np.concatenate([col.cat.codes.to_numpy().astype(np.int64) for col in columns])
+        codes[codes < 0] = n_categories
+        return codes, n_categories + 1
+
+    codes, uniques = pd.factorize(np.concatenate([normalize_values(col) for col in columns]))
+    return codes.astype(np.int64), len(uniques)
+
+
+def positions_by_code(codes: np.ndarray, n_keys: int) -> np.ndarray:
+    """
+    Tabela de endereçamento direto: posição da (última) linha de cada chave, -1 se ausente.
+    """
+    positions = np.full(n_keys, -1, dtype=np.int64)
+    positions[codes] = np.arange(len(codes), dtype=np.int64)
+    return positions
+
+
+class KeyIndex:
+    """
+    Códigos inteiros das chaves compostas de uma ou mais origens.
+
+    Cada coluna-chave é fatorada sobre a concatenação das origens e os códigos são
+    combinados coluna a coluna, sendo refatorados a cada passo para manter a faixa
+    densa (0..n_keys-1) e evitar estouro de inteiros. Como os códigos são
+    compartilhados, o mesmo índice serve para encontrar duplicados em cada origem e
+    para parear as origens na comparação, sem refazer a fatoração.
+    """
+
+    def __init__(self, codes: list, n_keys: int, key_columns: list):
+        self.codes = codes
+        self.n_keys = n_keys
+        self.key_columns = key_columns
+
+    @classmethod
+    def build(cls, key_columns: list, *frames: pd.DataFrame) -> "KeyIndex":
+        """
+        Constrói o índice a partir das colunas-chave dos DataFrames informados.
+
+        Args:
+            key_columns (list): Colunas que compõem a chave.
+            *frames (pd.DataFrame): Origens indexadas (ex: origem A e origem B).
+
+        Returns:
+            KeyIndex: Índice com um array de códigos por origem, na ordem informada.
+        """
+        key_columns = normalize_column_names_list(key_columns)
+        sizes = [len(df) for df in frames]
+        codes = None
+
+        for col in key_columns:
+            col_codes, n_uniques = _column_codes([df[col] for df in frames])
+            if codes is None:
+                codes = col_codes.astype(np.int64)
+            else:
+                codes, _ = pd.factorize(codes * n_uniques + col_codes)
+
+        if codes is None:
+            codes = np.zeros(sum(sizes), dtype=np.int64)
+        n_keys = int(codes.max()) + 1 if len(codes) else 0
+        bounds = np.cumsum([0] + sizes)
+        return cls([codes[bounds[i]:bounds[i + 1]] for i in range(len(frames))], n_keys, key_columns)
+
+    def matches(self, key_columns: list, *frames: pd.DataFrame) -> bool:
+        """
+        Indica se o índice foi construído com estas chaves e com origens deste tamanho.
+        """
+        return (
+            normalize_column_names_list(key_columns) == self.key_columns
+            and [len(df) for df in frames] == [len(codes) for codes in self.codes]
+        )
+
+    def counts(self, side: int = 0) -> np.ndarray:
+        """
+        Quantidade de linhas de cada chave na origem `side`.
+        """
+        return np.bincount(self.codes[side], minlength=self.n_keys)
+
+    def positions(self, side: int = 0) -> np.ndarray:
+        """
+        Posição da (última) linha de cada chave na origem `side`, -1 se ausente.
+        """
+        return positions_by_code(self.codes[side], self.n_keys)
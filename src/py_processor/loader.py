@@ -1,9 +1,36 @@
 import pandas as pd
 from pathlib import Path
 import yaml
-from sqlalchemy import create_engine
+from connectors.registry import get_registry
 from py_processor.utils.tratamentos import normalize_column_names_list , normalize_column_names_df
+from py_processor.cache import get_source_cache, file_cache_key, query_cache_key, string_schema, DEFAULT_CACHE_DIR
+from py_processor.type_inference import infer_source_types, apply_types, DEFAULT_SAMPLE_SIZE
+from py_processor.utils.tratamentos import TYPE_THRESHOLD
+from py_processor.excel import iter_excel
+from py_processor.json_reader import iter_json, is_json_array, LINES_EXTENSIONS
+from py_processor.utils.memory import DEFAULT_CHUNK_SIZE, get_governor
+from py_processor.utils.logger import logger
 import re
+import os
+import codecs
+import itertools
+import threading
+from typing import Iterator
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+# Marcador de NULL no CSV do COPY TO STDOUT (distingue nulos de textos vazios)
+COPY_NULL = "\\N"
+
+# Bytes por leitura/escrita no pipe do COPY (o leitor Arrow monta um lote por bloco)
+COPY_BLOCK_SIZE = 1 << 20
+
+# Subpasta do diretório de 'cache' com os tipos inferidos das fontes com 'infer_types'
+TYPES_DIRECTORY = "types"
 
 def load_config(config_path: str = "config/config.yaml") -> dict:
     """
@@ -28,6 +55,12 @@ def load_file(config: dict, source_key: str) -> pd.DataFrame:
     """
     Carrega um arquivo local (CSV, TXT, Excel, JSON) com base nas configurações fornecidas no arquivo YAML.
 
+    Com a seção 'cache' habilitada, o DataFrame normalizado é guardado em cache colunar,
+    identificado pelo caminho, tamanho e data de modificação do arquivo. Enquanto o
+    arquivo não mudar, as próximas cargas leem o cache em vez de refazer o parse.
+
+    Com 'infer_types' na fonte, as colunas são convertidas com os tipos inferidos (ver source_types).
+
     Args:
         config (dict): Configuração geral carregada via load_config.
         source_key (str): Nome da chave da fonte (ex: 'origemA') a ser lida.
@@ -38,13 +71,33 @@ def load_file(config: dict, source_key: str) -> pd.DataFrame:
     if source_key not in config.get("sources", {}):
         raise KeyError(f"Fonte '{source_key}' não encontrada no config.yaml")
 
+    df = _load_text(config, source_key)
+    if config["sources"][source_key].get("infer_types"):
+        df = apply_types(df, source_types(config, source_key, [df]))
+    return df
+
+def _load_text(config: dict, source_key: str) -> pd.DataFrame:
     source = config["sources"][source_key]
-    base_path = Path(__file__).parents[2].resolve()
-    file_path = (base_path / source["file_path"]).resolve()
+    file_path = resolve_path(source["file_path"])
 
     if not file_path.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
 
+    cache = get_source_cache(config)
+    if cache is not None:
+        cache_key = file_cache_key(file_path, source)
+        df = cache.get(cache_key)
+        if df is not None:
+            logger.info(f"Fonte '{source_key}' carregada do cache")
+            return df
+
+    df = _read_file(file_path, source)
+
+    if cache is not None:
+        cache.put(cache_key, df, description=f"{source_key}: {file_path}")
+    return df
+
+def _read_file(file_path: Path, source: dict) -> pd.DataFrame:
     # Obtém a extensão do arquivo (.csv, .xlsx, etc.)
     ext = file_path.suffix.lower()
 
@@ -58,12 +111,20 @@ def load_file(config: dict, source_key: str) -> pd.DataFrame:
     ]
 
     try:
-        # Leitura para arquivos Excel
-        if ext in [".xlsx", ".xls"]:
-            df = pd.read_excel(file_path, dtype=str)
-            df = normalize_column_names_df(df)
-            return df
+        # Leitura para arquivos Excel, em blocos (ver py_processor.excel)
+        if ext in [".xlsx", ".xlsm", ".xls"]:
+            chunks = list(iter_excel(file_path, source, DEFAULT_CHUNK_SIZE))
+            if not chunks:
+                return pd.DataFrame()
+            return pd.concat(chunks, ignore_index=True)
         
+        # JSON Lines e arrays JSON de objetos: em blocos (ver py_processor.json_reader)
+        elif _is_json_stream(file_path, source):
+            chunks = list(iter_json(file_path, source, DEFAULT_CHUNK_SIZE))
+            if not chunks:
+                return pd.DataFrame()
+            return pd.concat(chunks, ignore_index=True)
+
         # Leitura para arquivos JSON
         elif ext == ".json":
             df = pd.read_json(file_path, encoding=source.get("encoding", "utf-8"))
@@ -90,87 +151,576 @@ def load_file(config: dict, source_key: str) -> pd.DataFrame:
     except Exception as e:
         raise RuntimeError(f"Erro ao carregar arquivo '{file_path}': {e}")
 
-def load_database(config: dict, source: str) -> pd.DataFrame:
+def _is_json_stream(file_path: Path, source: dict) -> bool:
+    # JSON Lines sempre; .json apenas quando for um array (os demais formatos seguem o pd.read_json)
+    ext = file_path.suffix.lower()
+    if ext in LINES_EXTENSIONS:
+        return True
+    return ext == ".json" and is_json_array(file_path, source.get("encoding", "utf-8"))
+
+def load_database(config: dict, source: str, chunksize: int = None):
 # def load_database(config: dict, source: str, keys: list[str]) -> pd.DataFrame:
     """
     Conecta a um banco de dados relacional e executa uma query para retornar os dados como DataFrame.
     
     A query pode ser definida diretamente ou construída com base na tabela e cláusula WHERE definidas.
 
+    Com `chunksize`, retorna um iterador de DataFrames lido via cursor do lado do servidor
+    (ver iter_database). Com `stream: true` na fonte, o DataFrame completo é montado a
+    partir desse mesmo iterador, evitando que o driver guarde todo o resultado em memória
+    antes da cópia para o pandas.
+
     Args:
         config (dict): Dicionário de configuração carregado via load_config.
         source (str): Nome da fonte no config.yaml.
+        chunksize (int): Linhas por bloco no modo iterador (opcional).
+
+    Returns:
+        pd.DataFrame | Iterator[pd.DataFrame]: Dados extraídos do banco de dados.
+    """
+    if chunksize:
+        return iter_database(config, source, chunksize)
+
+    source_cfg = _get_database_source(config, source)
+    query = build_query(source_cfg, source)
+    url = build_connection_url(source_cfg)
+    db_type = source_cfg.get("db_type")
+
+    # Consulta já executada (mesmo destino, query e WHERE) é lida do cache, se habilitado para bancos
+    cache = get_source_cache(config) if (config.get("cache") or {}).get("databases", False) else None
+    if cache is not None:
+        cache_key = query_cache_key(source_cfg, query)
+        df = cache.get(cache_key, ttl=(config.get("cache") or {}).get("database_ttl"))
+        if df is not None:
+            logger.info(f"Fonte '{source}' carregada do cache")
+            return df
+
+    # Executa a consulta e retorna os dados
+    copy = source_cfg.get("extraction") == "copy"
+    try:
+        if source_cfg.get("stream", False) or copy:
+            # COPY: os blocos já são gravados no cache durante a extração
+            chunks = list(iter_database(config, source))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        else:
+            # Engine com pool compartilhado por destino (ver connectors.registry)
+            engine = get_registry(config).engine(url)
+            with engine.connect() as conn:
+                df = pd.read_sql(query, conn)
+
+    except Exception as e:
+        raise RuntimeError(f"Erro ao conectar e carregar dados do banco '{db_type}': {e}")
+
+    if cache is not None and not copy:
+        cache.put(cache_key, df, description=f"{source}: {db_type}://{source_cfg.get('host')}/{source_cfg.get('database')}")
+    return df
+
+def invalidate_cache(config: dict, source_key: str = None) -> None:
+    """
+    Invalida o cache de uma fonte (ou de todas, quando `source_key` não é informado).
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        source_key (str): Nome da fonte no config.yaml. Padrão: limpa o cache inteiro.
+    """
+    cache = get_source_cache(config)
+    if cache is None:
+        return
+
+    if source_key is None:
+        cache.clear()
+        return
+
+    source = config["sources"][source_key]
+    if source.get("type") == "database":
+        cache.invalidate(query_cache_key(source, build_query(source, source_key)))
+    else:
+        file_path = resolve_path(source["file_path"])
+        if file_path.exists():
+            cache.invalidate(file_cache_key(file_path, source))
+
+def source_cache_key(config: dict, source_key: str) -> str:
+    """
+    Chave de cache de uma fonte do config.yaml: file_cache_key para arquivos, query_cache_key para bancos.
+    """
+    source = config["sources"][source_key]
+    if source.get("type") == "database":
+        return query_cache_key(source, build_query(source, source_key))
+    return file_cache_key(resolve_path(source["file_path"]), source)
+
+def resolve_path(path: str) -> Path:
+    """
+    Resolve um caminho do config.yaml relativo à raiz do projeto.
+    """
+    base_path = Path(__file__).parents[2].resolve()
+    return (base_path / path).resolve()
+
+def get_chunk_size(config: dict) -> int:
+    """
+    Retorna o tamanho de bloco de 'processing.chunk_size', reduzido pelo governador de
+    memória quando as origens já medidas ou o uso atual não cabem em 'processing.memory_limit'.
+    """
+    return get_governor(config).chunk_size()
+
+def sample_file(config: dict, source_key: str, rows: int):
+    """
+    Primeiras `rows` linhas de uma fonte CSV/TXT, sem a detecção de encoding do arquivo
+    inteiro (usado para estimar a memória da origem). None nos demais formatos.
+    """
+    source = config["sources"][source_key]
+    file_path = resolve_path(source["file_path"])
+    if file_path.suffix.lower() not in [".csv", ".txt"]:
+        return None
+    df = pd.read_csv(
+          file_path
+        , sep=source.get("separator", ",")
+        , encoding=source.get("encoding", "utf-8")
+        , encoding_errors="replace"
+        , dtype=str
+        , nrows=rows
+    )
+    return normalize_column_names_df(df)
+
+def detect_encoding(file_path: Path, encodings: list[str], block_size: int = 1024 * 1024) -> str:
+    """
+    Identifica o primeiro encoding capaz de decodificar o arquivo inteiro.
+
+    A leitura em blocos acontece antes da leitura em chunks, pois um erro de decodificação
+    no meio do arquivo não pode ser tratado depois que parte dos dados já foi processada.
+
+    Args:
+        file_path (Path): Arquivo a ser verificado.
+        encodings (list[str]): Encodings a testar, em ordem de preferência.
+        block_size (int): Tamanho dos blocos lidos do disco.
+
+    Returns:
+        str: Encoding que decodificou o arquivo sem erros.
+    """
+    for enc in encodings:
+        decoder = codecs.getincrementaldecoder(enc)()
+        try:
+            with open(file_path, "rb") as f:
+                while block := f.read(block_size):
+                    decoder.decode(block)
+                decoder.decode(b"", final=True)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(
+        f"Não foi possível decodificar o arquivo '{file_path}' com os encodings testados: {encodings}"
+    )
+
+def iter_file(config: dict, source_key: str, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê um arquivo local em blocos de até `chunk_size` linhas.
+
+    Arquivos CSV/TXT, planilhas Excel, JSON Lines e arrays JSON são lidos em streaming;
+    os demais formatos são carregados via load_file e entregues fatiados, mantendo a
+    mesma interface. Com o cache habilitado, os blocos lidos em streaming são gravados
+    no cache durante a leitura, e as próximas execuções não refazem o parse do arquivo.
+
+    O governador de memória (utils.memory) mede a origem no primeiro bloco e reduz os
+    blocos seguintes quando não cabem em 'processing.memory_limit'; nos CSV a redução vale
+    já na leitura.
+
+    Com 'infer_types' na fonte, cada bloco é convertido com os tipos inferidos (ver source_types).
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        source_key (str): Nome da chave da fonte (ex: 'origemA') a ser lida.
+        chunk_size (int): Linhas por bloco. Padrão: 'processing.chunk_size'.
+
+    Yields:
+        pd.DataFrame: Blocos com os nomes de colunas normalizados.
+    """
+    if source_key not in config.get("sources", {}):
+        raise KeyError(f"Fonte '{source_key}' não encontrada no config.yaml")
+
+    governor = get_governor(config)
+    chunk_size = chunk_size or governor.base_chunk_size
+    source = config["sources"][source_key]
+    file_path = resolve_path(source["file_path"])
+
+    if not file_path.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+    chunks = _govern(_iter_file(config, source_key, chunk_size, file_path, governor), str(file_path), chunk_size, governor)
+    if source.get("infer_types"):
+        types = source_types(config, source_key)
+        chunks = (apply_types(chunk, types) for chunk in chunks)
+    yield from chunks
+
+def source_types(config: dict, source_key: str, chunks=None) -> dict:
+    """
+    Tipos das colunas de uma fonte arquivo com 'infer_types' (true, ou {sample_size, threshold}),
+    inferidos de uma amostra (reservoir) de todo o arquivo e guardados em
+    '<cache.directory>/types' enquanto o arquivo não mudar (ver source_cache_key).
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        source_key (str): Nome da fonte no config.yaml.
+        chunks (Iterable[pd.DataFrame]): Dados já lidos em texto. Padrão: uma nova leitura do arquivo.
 
     Returns:
-        pd.DataFrame: Dados extraídos do banco de dados.
+        dict: {coluna: {'type', 'format', 'confidence', 'null_fraction'}}.
+    """
+    source = config["sources"][source_key]
+    options = source.get("infer_types") if isinstance(source.get("infer_types"), dict) else {}
+    if chunks is None:
+        governor = get_governor(config)
+        file_path = resolve_path(source["file_path"])
+        chunk_size = get_chunk_size(config)
+        chunks = _govern(_iter_file(config, source_key, chunk_size, file_path, governor), str(file_path), chunk_size, governor)
+
+    directory = resolve_path((config.get("cache") or {}).get("directory", DEFAULT_CACHE_DIR)) / TYPES_DIRECTORY
+    return infer_source_types(
+          directory
+        , source_cache_key(config, source_key)
+        , chunks
+        , sample_size=int(options.get("sample_size", DEFAULT_SAMPLE_SIZE))
+        , threshold=float(options.get("threshold", TYPE_THRESHOLD))
+    )
+
+def _iter_file(config: dict, source_key: str, chunk_size: int, file_path: Path, governor) -> Iterator[pd.DataFrame]:
+    source = config["sources"][source_key]
+    # Leitores de tamanho fixo começam no tamanho atual do governador (origem já medida ou sob pressão)
+    size = min(chunk_size, governor.chunk_size(str(file_path)))
+    cache = get_source_cache(config)
+    if cache is not None:
+        cache_key = file_cache_key(file_path, source)
+        if cache_key in cache:
+            logger.info(f"Fonte '{source_key}' carregada do cache")
+            yield from cache.iter_chunks(cache_key, size)
+            return
+
+    description = f"{source_key}: {file_path}"
+    ext = file_path.suffix.lower()
+    if ext in [".xlsx", ".xlsm", ".xls"]:
+        yield from _write_through(iter_excel(file_path, source, size), cache,
+                                  cache_key if cache is not None else None, description)
+        return
+
+    if _is_json_stream(file_path, source):
+        yield from _write_through(iter_json(file_path, source, size), cache,
+                                  cache_key if cache is not None else None, description)
+        return
+
+    if ext not in [".csv", ".txt"]:
+        df = _load_text(config, source_key)
+        for start in range(0, len(df), size):
+            yield df.iloc[start:start + size]
+        return
+
+    encodings_to_try = [
+        source.get("encoding", "utf-8")
+        , "utf-8-sig"
+        , "latin1"
+        , "ISO-8859-1"
+        , "cp1252"
+    ]
+    encoding = detect_encoding(file_path, encodings_to_try)
+    reader = pd.read_csv(
+          file_path
+        , sep=source.get("separator", ",")
+        , encoding=encoding
+        , dtype=str
+        , iterator=True
+    )
+    with reader:
+        chunks = (normalize_column_names_df(chunk) for chunk in _read_chunks(reader, str(file_path), chunk_size, governor))
+        yield from _write_through(chunks, cache, cache_key if cache is not None else None, description)
+
+def _read_chunks(reader, key: str, chunk_size: int, governor) -> Iterator[pd.DataFrame]:
+    # Cada bloco do CSV com o tamanho atual do governador (menor sob pressão de memória)
+    while True:
+        try:
+            yield reader.get_chunk(min(chunk_size, governor.chunk_size(key)))
+        except StopIteration:
+            return
+
+def _govern(chunks: Iterator[pd.DataFrame], key: str, chunk_size: int, governor) -> Iterator[pd.DataFrame]:
+    # Mede a origem no primeiro bloco e fatia os blocos maiores que o tamanho atual do governador
+    for chunk in chunks:
+        governor.observe(key, chunk)
+        size = min(chunk_size, governor.chunk_size(key))
+        if len(chunk) <= size:
+            yield chunk
+            continue
+        for start in range(0, len(chunk), size):
+            yield chunk.iloc[start:start + size]
+
+def _write_through(chunks: Iterator[pd.DataFrame], cache, cache_key: str, description: str) -> Iterator[pd.DataFrame]:
+    first = next(chunks, None)
+    if first is None:
+        return
+    if cache is None:
+        yield first
+        yield from chunks
+        return
+
+    # Grava o cache enquanto os blocos são entregues; só vale se a leitura chegar ao fim
+    with cache.writer(cache_key, string_schema(first.columns), description) as writer:
+        for chunk in itertools.chain([first], chunks):
+            writer.write(chunk)
+            yield chunk
+
+def iter_database(config: dict, source: str, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Executa a query da fonte e entrega o resultado em blocos de até `chunk_size` linhas.
+
+    A consulta usa cursor do lado do servidor (`stream_results`): no PostgreSQL um cursor
+    nomeado, no MySQL um SSCursor; nos demais bancos o driver busca o resultado em lotes.
+    Assim o cliente mantém no máximo um bloco em memória, nunca a tabela inteira. O
+    tamanho dos blocos segue o governador de memória (ver iter_file).
+
+    Args:
+        config (dict): Dicionário de configuração carregado via load_config.
+        source (str): Nome da fonte no config.yaml.
+        chunk_size (int): Linhas por bloco. Padrão: 'processing.chunk_size'.
+
+    Yields:
+        pd.DataFrame: Blocos com os nomes de colunas normalizados.
+    """
+    governor = get_governor(config)
+    chunk_size = chunk_size or governor.base_chunk_size
+    source_cfg = _get_database_source(config, source)
+    key = query_cache_key(source_cfg, build_query(source_cfg, source))
+    chunks = _iter_database(config, source, min(chunk_size, governor.chunk_size(key)))
+    yield from _govern(chunks, key, chunk_size, governor)
+
+def _iter_database(config: dict, source: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    source_cfg = _get_database_source(config, source)
+    query = build_query(source_cfg, source)
+    url = build_connection_url(source_cfg)
+
+    db_type = source_cfg.get("db_type")
+
+    cache = get_source_cache(config) if (config.get("cache") or {}).get("databases", False) else None
+    if cache is not None:
+        cache_key = query_cache_key(source_cfg, query)
+        if cache_key in cache:
+            logger.info(f"Fonte '{source}' carregada do cache")
+            for chunk in cache.iter_chunks(cache_key, chunk_size, ttl=(config.get("cache") or {}).get("database_ttl")):
+                yield normalize_column_names_df(chunk)
+            return
+
+    engine = get_registry(config).engine(url)
+    try:
+        if source_cfg.get("extraction") == "copy":
+            yield from iter_copy(config, source, chunk_size)
+            return
+
+        with engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size)
+            for chunk in pd.read_sql(query, conn, chunksize=chunk_size):
+                yield normalize_column_names_df(chunk)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao conectar e carregar dados do banco '{db_type}': {e}")
+
+def _copy_out(conn, sql: str, pipe, errors: list) -> None:
+    # Thread do COPY: o psycopg2 escreve a saída no pipe; o fim do pipe marca o fim dos dados
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.copy_expert(sql, pipe, size=COPY_BLOCK_SIZE)
+        finally:
+            cursor.close()
+    except Exception as e:
+        errors.append(e)
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+def _copy_tables(pipe, columns: list, chunk_size: int) -> Iterator["pa.Table"]:
+    # CSV do COPY convertido em colunas Arrow (texto) pelo leitor em C++, em blocos de `chunk_size` linhas
+    stream = pa_csv.open_csv(
+          pipe
+        , read_options=pa_csv.ReadOptions(column_names=columns, block_size=COPY_BLOCK_SIZE)
+        , parse_options=pa_csv.ParseOptions(newlines_in_values=True)
+        , convert_options=pa_csv.ConvertOptions(
+              column_types={col: pa.string() for col in columns}
+            , null_values=[COPY_NULL]
+            , strings_can_be_null=True
+        )
+    )
+    pending, rows = [], 0
+    for batch in stream:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+def iter_copy(config: dict, source: str, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Extrai uma fonte PostgreSQL com COPY (query) TO STDOUT (CSV), sem montar tuplas Python.
+
+    Uma thread grava a saída do COPY (copy_expert do psycopg2) em um pipe, lido em blocos
+    pelo leitor CSV do pyarrow (ou do pandas, sem pyarrow), que monta as colunas direto
+    do texto. Todas as colunas chegam como texto, com NULL como nulo. Com o cache
+    habilitado para bancos, os blocos Arrow são gravados no cache durante a extração.
+
+    Usado por load_database/iter_database quando a fonte tem 'extraction: copy'.
+
+    Args:
+        config (dict): Dicionário de configuração carregado via load_config.
+        source (str): Nome da fonte no config.yaml.
+        chunk_size (int): Linhas por bloco. Padrão: 'processing.chunk_size'.
+
+    Yields:
+        pd.DataFrame: Blocos com os nomes de colunas normalizados.
     """
+    chunk_size = chunk_size or get_chunk_size(config)
+    source_cfg = _get_database_source(config, source)
+    if source_cfg.get("db_type") != "postgresql":
+        raise ValueError(f"'extraction: copy' está disponível apenas para fontes PostgreSQL (fonte '{source}').")
+    query = build_query(source_cfg, source)
+
+    cache = get_source_cache(config) if (config.get("cache") or {}).get("databases", False) else None
+    cache_key = query_cache_key(source_cfg, query) if cache is not None else None
 
+    conn = get_registry(config).raw_connection(build_connection_url(source_cfg))
+    finished = False
+    try:
+        # Nomes das colunas antes do COPY: o CSV vem sem cabeçalho e todas as colunas são lidas como texto
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM ({query}) q WHERE 1 = 0")
+            columns = [desc[0] for desc in cursor.description]
+        finally:
+            cursor.close()
+        names = normalize_column_names_list(columns)
+        encoding = conn.encoding
+        conn.set_client_encoding("UTF8")
+
+        read_fd, write_fd = os.pipe()
+        reader, writer = os.fdopen(read_fd, "rb"), os.fdopen(write_fd, "wb")
+        errors = []
+        sql = f"COPY ({query}) TO STDOUT WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        thread = threading.Thread(target=_copy_out, args=(conn, sql, writer, errors), daemon=True)
+        thread.start()
+        try:
+            if pa is not None:
+                tables = (table.rename_columns(names) for table in _copy_tables(reader, columns, chunk_size))
+                if cache is None:
+                    for table in tables:
+                        yield table.to_pandas()
+                else:
+                    with cache.writer(cache_key, string_schema(names), f"{source}: postgresql://{source_cfg.get('host')}/{source_cfg.get('database')}") as cache_writer:
+                        for table in tables:
+                            cache_writer.write_table(table)
+                            yield table.to_pandas()
+            else:
+                for chunk in pd.read_csv(reader, header=None, names=names, dtype=str, keep_default_na=False,
+                                         na_values=[COPY_NULL], encoding="utf-8", chunksize=chunk_size):
+                    yield chunk
+            thread.join()
+            if errors:
+                raise errors[0]
+            finished = True
+        finally:
+            if thread.is_alive():
+                # Leitura interrompida: cancela o COPY no servidor e libera a thread
+                conn.cancel()
+            reader.close()
+            thread.join()
+    finally:
+        if finished:
+            conn.rollback()
+            conn.set_client_encoding(encoding)
+            conn.close()
+        else:
+            # Conexão interrompida no meio do COPY não volta para o pool
+            conn.invalidate()
+
+def iter_source(config: dict, source_key: str, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê uma fonte do config.yaml em blocos, seja ela arquivo ou banco de dados.
+    """
+    source_type = config.get("sources", {}).get(source_key, {}).get("type")
+    if source_type == "file":
+        return iter_file(config, source_key, chunk_size)
+    elif source_type == "database":
+        return iter_database(config, source_key, chunk_size)
+    raise ValueError(f"Tipo da fonte '{source_key}' não identificado. Use 'file' ou 'database'.")
+
+def _get_database_source(config: dict, source: str) -> dict:
     if source not in config.get("sources", {}):
         raise KeyError(f"Fonte '{source}' não encontrada no config.yaml")
 
-    source = config["sources"][source]
+    source_cfg = config["sources"][source]
 
-    if source.get("type") != "database":
+    if source_cfg.get("type") != "database":
         raise ValueError(f"Fonte '{source}' não é do tipo 'database'.")
 
-    # Parâmetros da conexão
-    db_type = source.get("db_type")
-    user = source.get("username")
-    password = source.get("password")
-    host = source.get("host")
-    port = source.get("port")
-    database = source.get("database")
-
-    # Lista de colunas opcionais
-    columns = source.get("columns", [])
-    columns = normalize_column_names_list(columns)
-    # keys = normalize_column_names_list(keys)
-    # columns = ', '.join(columns)
-
-    # Monta a query a partir do config
-    query = source.get("query")
-    if not query:
-        table = source.get("table")
-        if not table:
-            raise ValueError(f"Você deve informar 'query' ou 'table' para a fonte '{source}'.")
-
-        where_clause = source.get("where")
-
-        # Valida se a cláusula WHERE contém comandos perigosos
-        if where_clause:
-            if re.search(r";|--|drop|delete|insert|update", where_clause, re.IGNORECASE):
-                raise ValueError(f"Cláusula WHERE potencialmente insegura detectada para a fonte '{source}'.")
-
-        query = f"SELECT * FROM {table}"
-        if where_clause:
-            query += f" WHERE {where_clause}"
-
-    # Monta a string de conexão conforme o tipo de banco
+    return source_cfg
+
+def build_query(source_cfg: dict, source: str = "") -> str:
+    """
+    Monta a query da fonte a partir de 'query' ou de 'table' + 'where'.
+
+    Args:
+        source_cfg (dict): Configuração da fonte (config["sources"][source]).
+        source (str): Nome da fonte, usado nas mensagens de erro.
+
+    Returns:
+        str: Query SQL a ser executada.
+    """
+    query = source_cfg.get("query")
+    if query:
+        return query
+
+    table = source_cfg.get("table")
+    if not table:
+        raise ValueError(f"Você deve informar 'query' ou 'table' para a fonte '{source}'.")
+
+    where_clause = check_where(source_cfg.get("where"), source)
+
+    query = f"SELECT * FROM {table}"
+    if where_clause:
+        query += f" WHERE {where_clause}"
+    return query
+
+def check_where(where_clause: str, source: str = "") -> str:
+    """
+    Valida se a cláusula WHERE contém comandos perigosos e a devolve sem alterações.
+    """
+    if where_clause:
+        if re.search(r";|--|drop|delete|insert|update", where_clause, re.IGNORECASE):
+            raise ValueError(f"Cláusula WHERE potencialmente insegura detectada para a fonte '{source}'.")
+    return where_clause
+
+def build_connection_url(source_cfg: dict) -> str:
+    """
+    Monta a string de conexão SQLAlchemy conforme o 'db_type' da fonte.
+    """
+    db_type = source_cfg.get("db_type")
+    user = source_cfg.get("username")
+    password = source_cfg.get("password")
+    host = source_cfg.get("host")
+    port = source_cfg.get("port")
+    database = source_cfg.get("database")
+
     if db_type == "postgresql":
-        url = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}"
+        return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}"
 
     elif db_type == "mysql":
-        url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
+        return f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
 
     elif db_type == "sqlserver":
-        driver = source.get("driver", "ODBC Driver 17 for SQL Server")
-        url = f"mssql+pyodbc://{user}:{password}@{host}:{port}/{database}?driver={driver.replace(' ', '+')}"
+        driver = source_cfg.get("driver", "ODBC Driver 17 for SQL Server")
+        return f"mssql+pyodbc://{user}:{password}@{host}:{port}/{database}?driver={driver.replace(' ', '+')}"
 
     elif db_type == "oracle":
-        service_name = source.get("service_name")
+        service_name = source_cfg.get("service_name")
         if not service_name or not re.match(r"^[a-zA-Z0-9_.-]+$", service_name):
             raise ValueError(f"'service_name' inválido ou não informado para conexões Oracle.")
-        url = f"oracle+cx_oracle://{user}:{password}@{host}:{port}/?service_name={service_name}"
-
-    else:
-        raise ValueError(f"Tipo de banco '{db_type}' não suportado.")
+        return f"oracle+cx_oracle://{user}:{password}@{host}:{port}/?service_name={service_name}"
 
-    # Executa a consulta e retorna os dados
-    try:
-        engine = create_engine(url)
-        with engine.connect() as conn:
-            df = pd.read_sql(query, conn)
-        return df
-
-    except Exception as e:
-        raise RuntimeError(f"Erro ao conectar e carregar dados do banco '{db_type}': {e}")
+    raise ValueError(f"Tipo de banco '{db_type}' não suportado.")
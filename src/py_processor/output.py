@@ -0,0 +1,250 @@
+# ------------------------------------------------------------
+# Gravação dos resultados (CSV, JSON Lines, Parquet) em segundo plano
+# ------------------------------------------------------------
+
+import gzip
+import io
+import queue
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+from py_processor.loader import resolve_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_OUTPUT_DIR = "data/output"
+DEFAULT_FORMATS = ["csv", "jsonl"]
+DEFAULT_QUEUE_SIZE = 8
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet")
+COMPRESSIONS = (None, "gzip", "zstd")
+
+# 'json' (formato antigo, array indentado) passa a ser gravado como JSON Lines
+FORMAT_ALIASES = {"json": "jsonl", "ndjson": "jsonl"}
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _open_text(path: Path, compression: str, encoding: str):
+    """
+    Abre um arquivo texto para escrita, com compressão opcional (gzip | zstd).
+    """
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding=encoding, newline="")
+    if compression == "zstd":
+        raw = open(path, "wb")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), encoding=encoding, newline="")
+    return open(path, "w", encoding=encoding, newline="")
+
+
+class CsvSink:
+    """
+    CSV gravado em blocos: o cabeçalho sai apenas no primeiro bloco.
+    """
+
+    def __init__(self, path: Path, options: dict, compression: str = None):
+        self.separator = options.get("separator", ";")
+        self._file = _open_text(path, compression, options.get("encoding", "utf-8"))
+        self._header = True
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self._file, sep=self.separator, index=False, header=self._header)
+        self._header = False
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonLinesSink:
+    """
+    JSON Lines (um registro por linha), que pode ser gravado e lido em blocos.
+    """
+
+    def __init__(self, path: Path, options: dict, compression: str = None):
+        self.force_ascii = options.get("ensure_ascii", False)
+        self._file = _open_text(path, compression, options.get("encoding", "utf-8"))
+
+    def write(self, df: pd.DataFrame) -> None:
+        text = df.to_json(orient="records", lines=True, force_ascii=self.force_ascii)
+        if text and not text.endswith("\n"):
+            text += "\n"
+        self._file.write(text)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink:
+    """
+    Parquet gravado em row groups. O schema é definido pelo primeiro bloco; colunas
+    totalmente nulas nesse bloco são gravadas como texto.
+    """
+
+    def __init__(self, path: Path, options: dict, compression: str = None):
+        self.path = path
+        self.compression = compression or options.get("compression", "snappy")
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ]).remove_metadata()
+            self._writer = pq.ParquetWriter(str(self.path), self._schema, compression=self.compression)
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+SINKS = {"csv": CsvSink, "jsonl": JsonLinesSink, "parquet": ParquetSink}
+
+
+class ResultWriter:
+    """
+    Grava os resultados em uma thread separada, a partir de blocos de DataFrames.
+
+    Cada resultado (ex: 'differences') gera um arquivo por formato configurado, criado
+    no primeiro bloco não vazio e fechado em `close()`. A fila é limitada: se a gravação
+    ficar para trás, `write()` aguarda, mantendo o uso de memória sob controle. Erros na
+    thread de gravação são repassados na próxima chamada a `write()` ou em `close()`.
+    """
+
+    _STOP = object()
+
+    def __init__(self, directory, formats=None, compression: str = None, options: dict = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.directory = Path(directory)
+        self.formats = [FORMAT_ALIASES.get(fmt, fmt) for fmt in (formats or DEFAULT_FORMATS)]
+        self.compression = compression
+        self.options = options or {}
+
+        for fmt in self.formats:
+            if fmt not in OUTPUT_FORMATS:
+                raise ValueError(f"Formato de saída não suportado: {fmt}. Use: {', '.join(OUTPUT_FORMATS)}.")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Compressão não suportada: {compression}. Use: gzip ou zstd.")
+        if "parquet" in self.formats and pa is None:
+            raise ImportError("O formato parquet requer o pacote 'pyarrow'.")
+        if compression == "zstd" and zstandard is None and self.formats != ["parquet"]:
+            raise ImportError("A compressão zstd em CSV/JSON Lines requer o pacote 'zstandard'.")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.rows = {}
+        self.seconds = 0.0  # tempo gasto na gravação (thread de gravação)
+        self._sinks = {}
+        self._error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def path(self, name: str, fmt: str) -> Path:
+        suffix = EXTENSIONS[fmt]
+        if self.compression and fmt != "parquet":
+            suffix += COMPRESSION_EXTENSIONS[self.compression]
+        return self.directory / f"{name}{suffix}"
+
+    # ---------------- Thread de gravação ----------------
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                if self._error is None:
+                    start = time.perf_counter()
+                    self._write(*item)
+                    self.seconds += time.perf_counter() - start
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name: str, df: pd.DataFrame) -> None:
+        if name not in self._sinks:
+            self._sinks[name] = [
+                SINKS[fmt](self.path(name, fmt), self.options.get(fmt, {}), self.compression)
+                for fmt in self.formats
+            ]
+        for sink in self._sinks[name]:
+            sink.write(df)
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Erro ao gravar resultados: {error}") from error
+
+    # ---------------- Interface ----------------
+
+    def write(self, name: str, df: pd.DataFrame) -> None:
+        """
+        Enfileira um bloco do resultado `name`. Blocos vazios são ignorados.
+        """
+        self._raise_error()
+        if df is None or df.empty:
+            return
+        self.rows[name] = self.rows.get(name, 0) + len(df)
+        self._queue.put((name, df))
+
+    def close(self) -> None:
+        """
+        Aguarda a gravação dos blocos pendentes e fecha todos os arquivos.
+        """
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+        for sinks in self._sinks.values():
+            for sink in sinks:
+                try:
+                    sink.close()
+                except Exception as e:
+                    self._error = self._error or e
+        self._sinks = {}
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def open_output(config: dict) -> ResultWriter:
+    """
+    Cria o gravador de resultados a partir da seção 'output' do config.yaml.
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+
+    Returns:
+        ResultWriter: Gravador em segundo plano (use com `with` para garantir o fechamento).
+    """
+    output_cfg = config.get("output") or {}
+    options = {fmt: output_cfg.get(fmt) or {} for fmt in OUTPUT_FORMATS}
+    # Opções da seção 'json' (formato antigo) valem para o JSON Lines
+    options["jsonl"] = {**(output_cfg.get("json") or {}), **options["jsonl"]}
+
+    return ResultWriter(
+          resolve_path(output_cfg.get("directory", DEFAULT_OUTPUT_DIR))
+        , formats=output_cfg.get("formats", DEFAULT_FORMATS)
+        , compression=output_cfg.get("compression")
+        , options=options
+        , queue_size=output_cfg.get("queue_size", DEFAULT_QUEUE_SIZE)
+    )
@@ -0,0 +1,228 @@
+# ------------------------------------------------------------
+# Comparação particionada em vários processos (partições em memória compartilhada)
+# ------------------------------------------------------------
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator
+
+import pandas as pd
+from py_processor.loader import iter_source, get_chunk_size
+from py_processor.partitioning import partition_ids
+from py_processor.compare import compare_sources
+from py_processor.key_index import KeyIndex
+from py_processor.utils.tratamentos import normalize_column_names_list
+from py_processor.utils.logger import logger
+from quality.duplicates import partition_duplicates
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Partições por processo quando 'processing.partitions' não é informado (balanceia a carga)
+PARTITIONS_PER_WORKER = 4
+
+
+def resolve_workers(config: dict) -> int:
+    """
+    Processos da comparação a partir de 'processing.parallel_processing'
+    (false = 1, true = núcleos da máquina, ou um número).
+    """
+    value = (config.get("processing") or {}).get("parallel_processing", False)
+    if value is True:
+        return os.cpu_count() or 1
+    if not value:
+        return 1
+    return max(1, int(value))
+
+
+def _attach(name: str) -> SharedMemory:
+    # Só o processo que criou o bloco o remove. No Python < 3.13 (sem 'track') os processos
+    # do pool compartilham o resource_tracker do principal, e registrar o mesmo nome de novo não tem efeito.
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        return SharedMemory(name=name)
+
+
+class SharedPartition:
+    """
+    Partição de uma origem gravada como stream Arrow IPC em um bloco de memória compartilhada.
+
+    Os processos de comparação abrem o bloco pelo nome e leem a tabela Arrow diretamente
+    dos buffers compartilhados, sem cópia nem serialização pelo pool.
+    """
+
+    def __init__(self, tables: list, columns: list):
+        if tables:
+            table = pa.concat_tables(tables, promote_options="default")
+        else:
+            table = pa.table({col: pa.array([], pa.string()) for col in columns})
+        self.rows = table.num_rows
+
+        # Tamanho do stream calculado antes, para gravar direto no bloco compartilhado
+        sink = pa.MockOutputStream()
+        self._write(sink, table)
+        self.size = sink.size()
+
+        self.shm = SharedMemory(create=True, size=max(1, self.size))
+        self.name = self.shm.name
+        try:
+            self._write(pa.FixedSizeBufferWriter(pa.py_buffer(self.shm.buf)), table)
+        except Exception:
+            self.release()
+            raise
+
+    @staticmethod
+    def _write(sink, table) -> None:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    def release(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+def read_shared(name: str, size: int):
+    """
+    Abre uma partição compartilhada. Retorna (bloco, DataFrame); feche o bloco só depois
+    de descartar o DataFrame, que pode referenciar os buffers compartilhados.
+    """
+    shm = _attach(name)
+    table = pa.ipc.open_stream(pa.py_buffer(shm.buf)[:size]).read_all()
+    return shm, table.to_pandas()
+
+
+def compare_partition(task: tuple) -> tuple:
+    """
+    Duplicidade das duas origens e comparação de um par de partições (executado no pool).
+    Os duplicados trazem LINHA_ORIGEM na origem inteira e grupos numerados na partição.
+
+    Returns:
+        tuple: (partição, duplicados A, duplicados B, somente em A, somente em B, diferenças).
+    """
+    partition, (name_a, size_a), (name_b, size_b), key_columns, engine, kind = task
+    shm_a, df_origemA = read_shared(name_a, size_a)
+    shm_b, df_origemB = read_shared(name_b, size_b)
+    key_index = None
+    try:
+        key_index = KeyIndex.build(key_columns, df_origemA, df_origemB)
+        duplicates = [
+            partition_duplicates(df, key_columns, key_index=key_index, side=side, kind=kind)
+            for side, df in enumerate((df_origemA, df_origemB))
+        ]
+        for df in (df_origemA, df_origemB):
+            df.index = pd.RangeIndex(len(df))
+        results = compare_sources(df_origemA, df_origemB, key_columns, engine=engine, key_index=key_index)
+        return (partition, *duplicates, *results)
+    finally:
+        del df_origemA, df_origemB, key_index
+        shm_a.close()
+        shm_b.close()
+
+
+def share_partitions(config: dict, source: str, key_columns: list, n_partitions: int) -> list:
+    """
+    Lê a origem em blocos, distribui as linhas pelo hash das chaves e grava cada partição
+    em memória compartilhada (Arrow). O texto em Arrow ocupa bem menos que strings Python.
+    """
+    tables = [[] for _ in range(n_partitions)]
+    columns = None
+    rows = 0
+    for chunk in iter_source(config, source, get_chunk_size(config)):
+        columns = columns or list(chunk.columns)
+        # Posição de cada linha na origem, guardada como índice da partição
+        chunk.index = pd.RangeIndex(rows, rows + len(chunk))
+        rows += len(chunk)
+        ids = partition_ids(chunk, key_columns, n_partitions)
+        for partition, part in chunk.groupby(ids, sort=False):
+            tables[partition].append(pa.Table.from_pandas(part, preserve_index=True))
+
+    shared = []
+    try:
+        for partition in range(n_partitions):
+            shared.append(SharedPartition(tables[partition], columns or []))
+            tables[partition] = None
+    except Exception:
+        for part in shared:
+            part.release()
+        raise
+    logger.info(f"{source} particionada em {n_partitions} partições (memória compartilhada) "
+                f"com {sum(part.rows for part in shared)} registros")
+    return shared
+
+
+def parallel_compare(config: dict, source_a: str, source_b: str, key_columns: list, workers: int = None,
+                     n_partitions: int = None, engine: str = "pandas", kind: bool = True) -> Iterator[tuple]:
+    """
+    Compara as origens em paralelo: particiona as duas pelo hash das chaves, publica as
+    partições em memória compartilhada e compara os pares em um pool de `workers` processos.
+
+    Como a mesma chave cai sempre na mesma partição, o conjunto dos resultados é o mesmo
+    da comparação completa. Os pares são entregues na ordem das partições e cada bloco
+    compartilhado é liberado assim que seu par termina.
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        source_a (str): Nome da origem A no config.yaml.
+        source_b (str): Nome da origem B no config.yaml.
+        key_columns (list): Colunas que compõem a chave.
+        workers (int): Processos. Padrão: 'processing.parallel_processing'.
+        n_partitions (int): Partições. Padrão: 'processing.partitions' ou workers * PARTITIONS_PER_WORKER.
+        engine (str): Motor de comparação de cada par (ver compare_sources).
+        kind (bool): Indica nos duplicados se o grupo é 'EXATA' ou 'DIVERGENTE' (DUPLICIDADE).
+
+    Yields:
+        tuple: (partição, duplicados A, duplicados B, somente em A, somente em B, diferenças).
+    """
+    if pa is None:
+        raise ImportError("O modo parallel requer o pacote 'pyarrow'.")
+
+    key_columns = normalize_column_names_list(key_columns)
+    workers = workers or resolve_workers(config)
+    n_partitions = n_partitions or int((config.get("processing") or {}).get("partitions") or workers * PARTITIONS_PER_WORKER)
+
+    shared = {}
+    try:
+        for source in (source_a, source_b):
+            shared[source] = share_partitions(config, source, key_columns, n_partitions)
+
+        tasks = [
+            (
+                partition
+                , (shared[source_a][partition].name, shared[source_a][partition].size)
+                , (shared[source_b][partition].name, shared[source_b][partition].size)
+                , key_columns
+                , engine
+                , kind
+            )
+            for partition in range(n_partitions)
+        ]
+
+        logger.info(f"Comparando {n_partitions} pares de partições com {workers} processos")
+        if workers == 1:
+            results = map(compare_partition, tasks)
+            yield from _released(results, shared, source_a, source_b)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(compare_partition, tasks)
+                yield from _released(results, shared, source_a, source_b)
+    finally:
+        for parts in shared.values():
+            for part in parts:
+                if part.shm is not None:
+                    part.release()
+                    part.shm = None
+
+
+def _released(results, shared: dict, source_a: str, source_b: str) -> Iterator[tuple]:
+    # Libera os blocos do par assim que o resultado chega
+    for result in results:
+        partition = result[0]
+        for source in (source_a, source_b):
+            part = shared[source][partition]
+            part.release()
+            part.shm = None
+        yield result
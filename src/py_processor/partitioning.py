@@ -0,0 +1,227 @@
+# ------------------------------------------------------------
+# Comparação fora da memória (out-of-core) por particionamento das chaves
+# ------------------------------------------------------------
+
+import math
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from py_processor.loader import iter_source, get_chunk_size, resolve_path, sample_file
+from py_processor.utils.memory import parse_size, get_governor, DEFAULT_MEMORY_LIMIT, SAMPLE_ROWS
+from py_processor.key_index import hash_keys
+from py_processor.utils.tratamentos import normalize_column_names_list
+from py_processor.utils.logger import logger
+
+# Quantidade de partições usada quando o tamanho de uma origem não é conhecido (banco de dados)
+DEFAULT_PARTITIONS = 16
+
+# Memória do modo memory em relação às origens carregadas (índice de chaves, fingerprints e resultados)
+MEMORY_MODE_FACTOR = 2
+
+
+def partition_ids(df: pd.DataFrame, key_columns: list, n_partitions: int) -> np.ndarray:
+    """
+    Calcula a partição de cada linha a partir de um hash das colunas-chave.
+
+    As chaves são normalizadas para texto antes do hash, de modo que a mesma chave caia
+    na mesma partição mesmo quando as origens têm tipos diferentes (ex: CSV x banco).
+
+    Args:
+        df (pd.DataFrame): Bloco de dados.
+        key_columns (list): Colunas que compõem a chave (já normalizadas).
+        n_partitions (int): Quantidade de partições.
+
+    Returns:
+        np.ndarray: Número da partição (0..n_partitions-1) de cada linha.
+    """
+    return (hash_keys(df, key_columns) % np.uint64(n_partitions)).astype(np.int64)
+
+
+class PartitionSpill:
+    """
+    Conjunto de partições em disco de uma origem.
+
+    Cada partição é um arquivo com blocos pickle gravados em sequência (append),
+    preservando os dtypes do DataFrame sem dependências adicionais.
+    """
+
+    def __init__(self, directory: Path, name: str, n_partitions: int):
+        self.directory = Path(directory)
+        self.name = name
+        self.n_partitions = n_partitions
+        self.rows = [0] * n_partitions
+        self.seen = 0
+        self.columns = None
+        self._files = {}
+
+    def path(self, partition: int) -> Path:
+        return self.directory / f"{self.name}_{partition:04d}.pkl"
+
+    def write(self, chunk: pd.DataFrame, key_columns: list) -> None:
+        """
+        Distribui as linhas do bloco entre as partições e grava cada fatia no disco, com a
+        posição de cada linha na origem como índice.
+        """
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        if chunk.empty:
+            return
+        chunk.index = pd.RangeIndex(self.seen, self.seen + len(chunk))
+        self.seen += len(chunk)
+
+        ids = partition_ids(chunk, key_columns, self.n_partitions)
+        order = np.argsort(ids, kind="stable")
+        bounds = np.searchsorted(ids[order], np.arange(self.n_partitions + 1))
+
+        for partition in np.flatnonzero(np.diff(bounds)):
+            part = chunk.iloc[order[bounds[partition]:bounds[partition + 1]]]
+            f = self._files.get(partition)
+            if f is None:
+                f = self._files[partition] = open(self.path(partition), "ab")
+            pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self.rows[partition] += len(part)
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def read(self, partition: int) -> pd.DataFrame:
+        """
+        Lê uma partição inteira do disco, com a posição de cada linha na origem como índice
+        (crescente). Partições vazias retornam um DataFrame sem linhas.
+        """
+        path = self.path(partition)
+        if not path.exists():
+            return pd.DataFrame(columns=self.columns or [])
+
+        frames = []
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    frames.append(pickle.load(f))
+                except EOFError:
+                    break
+        return pd.concat(frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def estimate_memory(config: dict, source_keys: list):
+    """
+    Memória estimada para carregar as origens inteiras: tamanho de cada arquivo vezes a razão
+    entre memória e texto medida pelo governador nas primeiras linhas (SAMPLE_ROWS) da origem.
+
+    Returns:
+        int | None: Bytes estimados, ou None se alguma origem for de banco (tamanho desconhecido).
+    """
+    governor = get_governor(config)
+    total = 0
+    for source_key in source_keys:
+        source = config["sources"][source_key]
+        if source.get("type") != "file":
+            return None
+        file_path = resolve_path(source["file_path"])
+        if str(file_path) not in governor.expansion:
+            governor.observe(str(file_path), sample_file(config, source_key, SAMPLE_ROWS))
+        total += governor.estimate(str(file_path), file_path.stat().st_size)
+    return total
+
+
+def fits_in_memory(config: dict, source_keys: list) -> bool:
+    """
+    Indica se a comparação em memória das origens cabe em 'processing.memory_limit'
+    (sempre verdadeiro sem limite, com 'processing.spill: false' ou com origens de banco).
+    """
+    if not (config.get("processing") or {}).get("spill", True):
+        return True
+    needed = estimate_memory(config, source_keys)
+    return needed is None or get_governor(config).fits(needed * MEMORY_MODE_FACTOR)
+
+
+def estimate_partitions(config: dict, source_keys: list) -> int:
+    """
+    Define a quantidade de partições para que um par de partições caiba em 'processing.memory_limit'.
+
+    Usa 'processing.partitions' quando informado. Caso contrário, estima a partir do
+    tamanho dos arquivos (ver estimate_memory), reservando metade do limite para a
+    própria comparação.
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        source_keys (list): Fontes que serão particionadas.
+
+    Returns:
+        int: Quantidade de partições.
+    """
+    processing = config.get("processing") or {}
+    if processing.get("partitions"):
+        return int(processing["partitions"])
+
+    budget = parse_size(processing.get("memory_limit") or DEFAULT_MEMORY_LIMIT)
+    files = [key for key in source_keys if config["sources"][key].get("type") == "file"]
+    total_bytes = estimate_memory(config, files)
+
+    n_partitions = max(1, math.ceil(total_bytes / (budget / 2)))
+    if len(files) < len(source_keys):
+        n_partitions = max(n_partitions, DEFAULT_PARTITIONS)
+    return n_partitions
+
+
+def iter_partition_pairs(config: dict, source_a: str, source_b: str, key_columns: list,
+                         n_partitions: int = None) -> Iterator[tuple]:
+    """
+    Particiona as duas origens em disco e entrega um par de partições por vez.
+
+    As origens são lidas em blocos de 'processing.chunk_size' linhas e cada linha é
+    roteada pelo hash das chaves. Como a mesma chave sempre cai na mesma partição,
+    comparar partição a partição equivale a comparar as origens inteiras, com pico de
+    memória proporcional a uma partição. Os arquivos temporários ficam em
+    'processing.spill_directory' (ou no diretório temporário do sistema) e são
+    removidos ao final.
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        source_a (str): Nome da origem A no config.yaml.
+        source_b (str): Nome da origem B no config.yaml.
+        key_columns (list): Colunas que compõem a chave.
+        n_partitions (int): Quantidade de partições. Padrão: estimate_partitions.
+
+    Yields:
+        tuple: (número da partição, partição da origem A, partição da origem B), com a
+               posição de cada linha na sua origem como índice.
+    """
+    processing = config.get("processing") or {}
+    key_columns = normalize_column_names_list(key_columns)
+    n_partitions = n_partitions or estimate_partitions(config, [source_a, source_b])
+    chunk_size = get_chunk_size(config)
+
+    spill_root = processing.get("spill_directory")
+    if spill_root:
+        spill_root = resolve_path(spill_root)
+        spill_root.mkdir(parents=True, exist_ok=True)
+    spill_dir = Path(tempfile.mkdtemp(prefix="datalyzer_", dir=spill_root))
+
+    try:
+        spills = {}
+        for source in (source_a, source_b):
+            with PartitionSpill(spill_dir, source, n_partitions) as spill:
+                for chunk in iter_source(config, source, chunk_size):
+                    spill.write(chunk, key_columns)
+            spills[source] = spill
+            logger.info(f"{source} particionada em {n_partitions} partições com {sum(spill.rows)} registros")
+
+        for partition in range(n_partitions):
+            yield partition, spills[source_a].read(partition), spills[source_b].read(partition)
+
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
@@ -0,0 +1,344 @@
+# ------------------------------------------------------------
+# Comparação em duas fases com hash calculado no banco (pushdown)
+# ------------------------------------------------------------
+
+import hashlib
+import re
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from connectors.registry import get_registry
+from py_processor.loader import load_file, build_query, build_connection_url, get_chunk_size
+from py_processor.compare import compare_sources
+from py_processor.key_index import KeyIndex
+from py_processor.utils.tratamentos import normalize_column_names_list, normalize_column_names_df, normalize_values
+from py_processor.utils.logger import logger
+from quality.duplicates import analyze_duplicates, GROUP_COLUMN, COUNT_COLUMN
+
+# Coluna com o hash (64 bits) das colunas comparadas no DataFrame de chaves
+HASH_COLUMN = "ROW_HASH"
+
+# Coluna com o valor do watermark (modo incremental) no DataFrame de chaves
+WATERMARK_COLUMN = "WATERMARK"
+
+# Separador usado na concatenação das colunas antes do md5 (no banco e no Python)
+HASH_SEPARATOR = "|"
+
+# Tipo texto usado nos CASTs de cada banco
+TEXT_TYPES = {
+      "postgresql": "text"
+    , "mysql": "CHAR"
+    , "sqlserver": "NVARCHAR(4000)"
+    , "oracle": "VARCHAR2(4000)"
+}
+
+# Limite de parâmetros por consulta na fase 2 (o SQL Server aceita no máximo 2100)
+MAX_BIND_PARAMS = 2000
+
+# Chaves por consulta na fase 2 do PostgreSQL (enviadas como arrays)
+PG_KEYS_PER_QUERY = 50000
+
+
+def _identifier(column: str) -> str:
+    # Colunas entram no SQL sem aspas; aceita apenas identificadores simples
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", column):
+        raise ValueError(f"Coluna '{column}' não pode ser usada no modo pushdown (use apenas letras, números e _).")
+    return column
+
+
+def hash_expression(db_type: str, columns: list) -> str:
+    """
+    Monta a expressão SQL do md5 (hexadecimal) das colunas concatenadas com '|', nulos como ''.
+
+    Args:
+        db_type (str): Tipo do banco ('postgresql', 'mysql', 'sqlserver' ou 'oracle').
+        columns (list): Colunas que entram no hash, na ordem desejada.
+
+    Returns:
+        str: Expressão SQL que retorna o md5 em hexadecimal.
+    """
+    text_type = TEXT_TYPES.get(db_type)
+    if text_type is None:
+        raise ValueError(f"Tipo de banco '{db_type}' não suportado no modo pushdown.")
+    if not columns:
+        return "''"
+
+    values = [f"COALESCE(CAST({_identifier(col)} AS {text_type}), '')" for col in columns]
+
+    if db_type == "postgresql":
+        return f"md5(concat_ws('{HASH_SEPARATOR}', {', '.join(values)}))"
+    elif db_type == "mysql":
+        return f"MD5(CONCAT_WS('{HASH_SEPARATOR}', {', '.join(values)}))"
+    elif db_type == "sqlserver":
+        return f"CONVERT(VARCHAR(32), HASHBYTES('MD5', CONCAT_WS('{HASH_SEPARATOR}', {', '.join(values)})), 2)"
+    # Oracle: '||' trata NULL como texto vazio
+    concatenated = f" || '{HASH_SEPARATOR}' || ".join(values)
+    return f"RAWTOHEX(STANDARD_HASH({concatenated}, 'MD5'))"
+
+
+def _hex_to_uint64(hex_values) -> np.ndarray:
+    # Os primeiros 64 bits do md5 bastam para a comparação e ocupam 8 bytes por linha
+    return np.fromiter((int(h[:16], 16) if h else 0 for h in hex_values), dtype=np.uint64, count=len(hex_values))
+
+
+def python_row_hashes(df: pd.DataFrame, columns: list) -> np.ndarray:
+    """
+    Calcula no Python o mesmo hash da expressão SQL (md5 dos valores em texto unidos por '|').
+
+    A representação em texto do banco nem sempre coincide com a do arquivo (ex: números);
+    nesse caso o hash difere e a chave apenas segue para a fase 2, sem afetar o resultado.
+    """
+    if not columns:
+        return np.zeros(len(df), dtype=np.uint64)
+
+    joined = pd.Series(normalize_values(df[columns[0]]), dtype=object)
+    for col in columns[1:]:
+        joined = joined + HASH_SEPARATOR + normalize_values(df[col])
+    digests = [hashlib.md5(value.encode("utf-8")).hexdigest() for value in joined]
+    return _hex_to_uint64(digests)
+
+
+class PushdownSource:
+    """
+    Origem participante da comparação em duas fases.
+
+    Para bancos de dados, a fase 1 busca apenas as chaves e o hash calculado no próprio
+    banco, e a fase 2 busca as linhas completas somente das chaves informadas. Arquivos
+    são carregados uma única vez (load_file) e têm o hash calculado no Python.
+    """
+
+    def __init__(self, config: dict, source_key: str):
+        if source_key not in config.get("sources", {}):
+            raise KeyError(f"Fonte '{source_key}' não encontrada no config.yaml")
+
+        self.config = config
+        self.source_key = source_key
+        self.source_cfg = config["sources"][source_key]
+        self.is_database = self.source_cfg.get("type") == "database"
+        self.db_type = self.source_cfg.get("db_type")
+        self.chunk_size = get_chunk_size(config)
+        self._frame = None
+        self._engine = None
+        if self.is_database:
+            self.query = build_query(self.source_cfg, source_key)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = load_file(self.config, self.source_key)
+        return self._frame
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = get_registry(self.config).engine(build_connection_url(self.source_cfg))
+        return self._engine
+
+    def close(self) -> None:
+        # O engine é compartilhado pelo registro de conexões: apenas solta a referência
+        self._engine = None
+
+    def _read_sql(self, sql: str, params: dict = None):
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=self.chunk_size)
+            for chunk in pd.read_sql(text(sql), conn, params=params, chunksize=self.chunk_size):
+                yield normalize_column_names_df(chunk)
+
+    def columns(self) -> list:
+        """
+        Colunas da origem: 'columns' do config.yaml (bancos), ou as colunas retornadas pela query/arquivo.
+        """
+        if not self.is_database:
+            return list(self.frame.columns)
+
+        configured = normalize_column_names_list(self.source_cfg.get("columns") or [])
+        if configured:
+            return configured
+
+        with self.engine.connect() as conn:
+            result = conn.execute(text(f"SELECT * FROM ({self.query}) q WHERE 1 = 0"))
+            return normalize_column_names_list(list(result.keys()))
+
+    def _projection(self, alias: str = "q") -> str:
+        # Projeção da fase 2: apenas as colunas de 'columns', quando informadas
+        configured = normalize_column_names_list(self.source_cfg.get("columns") or [])
+        if not configured:
+            return f"{alias}.*"
+        return ", ".join(f"{alias}.{_identifier(col)}" for col in configured)
+
+    def key_hashes(self, key_columns: list, value_columns: list, watermark: str = None, since=None) -> pd.DataFrame:
+        """
+        Fase 1: chaves (em texto) + hash de 64 bits das colunas comparadas, uma linha por registro.
+
+        Com `watermark`, o valor dessa coluna (no tipo original) acompanha cada chave na
+        coluna WATERMARK. Em origens database, `since` restringe a extração às linhas com
+        watermark >= since; arquivos são sempre lidos por completo.
+        """
+        if not self.is_database:
+            hashes = pd.DataFrame({col: normalize_values(self.frame[col]) for col in key_columns})
+            hashes[HASH_COLUMN] = python_row_hashes(self.frame, value_columns)
+            if watermark:
+                hashes[WATERMARK_COLUMN] = self.frame[watermark].to_numpy()
+            return hashes
+
+        text_type = TEXT_TYPES.get(self.db_type)
+        keys_sql = ", ".join(f"CAST({_identifier(col)} AS {text_type}) AS {col}" for col in key_columns)
+        sql = f"SELECT {keys_sql}, {hash_expression(self.db_type, value_columns)} AS {HASH_COLUMN}"
+        params = None
+        if watermark:
+            sql += f", {_identifier(watermark)} AS {WATERMARK_COLUMN}"
+        sql += f" FROM ({self.query}) q"
+        if watermark and since is not None:
+            sql += f" WHERE {_identifier(watermark)} >= :since"
+            params = {"since": since}
+
+        frames = []
+        for chunk in self._read_sql(sql, params):
+            chunk[HASH_COLUMN] = _hex_to_uint64(chunk[HASH_COLUMN].str.lower().to_numpy())
+            frames.append(chunk)
+        if not frames:
+            columns = list(key_columns) + [HASH_COLUMN] + ([WATERMARK_COLUMN] if watermark else [])
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def fetch_rows(self, keys: pd.DataFrame, key_columns: list) -> pd.DataFrame:
+        """
+        Fase 2: linhas completas apenas das chaves informadas.
+
+        As chaves são comparadas em texto, com nulos como '' (como na fase 1), e cada chave
+        é buscada uma única vez, mesmo que repetida em `keys`.
+        """
+        keys = pd.DataFrame({col: normalize_values(keys[col]) for col in key_columns}).drop_duplicates(ignore_index=True)
+        if not self.is_database:
+            frame_keys = pd.MultiIndex.from_arrays([normalize_values(self.frame[col]) for col in key_columns])
+            wanted = pd.MultiIndex.from_arrays([normalize_values(keys[col]) for col in key_columns])
+            return self.frame[frame_keys.isin(wanted)].reset_index(drop=True)
+
+        if keys.empty:
+            return pd.DataFrame(columns=self.columns())
+
+        text_type = TEXT_TYPES.get(self.db_type)
+        key_values = [keys[col].tolist() for col in key_columns]
+        frames = []
+
+        if self.db_type == "postgresql":
+            # Chaves enviadas como arrays e desaninhadas em uma tabela derivada (uma consulta por lote)
+            arrays = ", ".join(f"CAST(:k{i} AS text[])" for i in range(len(key_columns)))
+            aliases = ", ".join(f"k{i}" for i in range(len(key_columns)))
+            join = " AND ".join(f"coalesce(CAST(q.{_identifier(col)} AS text), '') = f.k{i}" for i, col in enumerate(key_columns))
+            sql = (
+                f"SELECT {self._projection()} FROM ({self.query}) q "
+                f"JOIN unnest({arrays}) AS f({aliases}) ON {join}"
+            )
+            for start in range(0, len(keys), PG_KEYS_PER_QUERY):
+                params = {f"k{i}": values[start:start + PG_KEYS_PER_QUERY] for i, values in enumerate(key_values)}
+                frames.extend(self._read_sql(sql, params))
+        else:
+            batch_size = max(1, MAX_BIND_PARAMS // len(key_columns))
+            for start in range(0, len(keys), batch_size):
+                conditions = []
+                params = {}
+                for row in range(start, min(start + batch_size, len(keys))):
+                    terms = []
+                    for i, col in enumerate(key_columns):
+                        params[f"p{row}_{i}"] = key_values[i][row]
+                        terms.append(f"COALESCE(CAST({_identifier(col)} AS {text_type}), '') = :p{row}_{i}")
+                    conditions.append(f"({' AND '.join(terms)})")
+                sql = f"SELECT {self._projection()} FROM ({self.query}) q WHERE {' OR '.join(conditions)}"
+                frames.extend(self._read_sql(sql, params))
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=self.columns())
+        return pd.concat(frames, ignore_index=True)
+
+
+def resolve_value_columns(source_a: PushdownSource, source_b: PushdownSource, key_columns: list) -> list:
+    """
+    Colunas que entram no hash: presentes nas duas origens, exceto as chaves (na ordem da origem A).
+    """
+    columns_b = set(source_b.columns())
+    return [col for col in source_a.columns() if col in columns_b and col not in key_columns]
+
+
+def changed_keys(hashes_a: pd.DataFrame, hashes_b: pd.DataFrame, key_columns: list) -> pd.DataFrame:
+    """
+    Compara as chaves + hashes da fase 1 das duas origens.
+
+    Uma chave segue para a fase 2 quando falta em uma das origens ou quando suas linhas
+    (contando as repetidas, nas duas origens) não têm todas o mesmo hash. O mesmo conjunto
+    de chaves é buscado nas duas origens, para que uma chave presente em ambas nunca
+    apareça como exclusiva de uma delas.
+
+    Returns:
+        pd.DataFrame: Chaves (em texto, nulos como '') distintas que seguem para a fase 2.
+    """
+    index = KeyIndex.build(key_columns, hashes_a, hashes_b)
+    codes_a, codes_b = index.codes
+    present_a = np.bincount(codes_a, minlength=index.n_keys) > 0
+    present_b = np.bincount(codes_b, minlength=index.n_keys) > 0
+
+    pairs = pd.DataFrame({
+          "code": np.concatenate([codes_a, codes_b])
+        , "hash": np.concatenate([hashes_a[HASH_COLUMN].to_numpy(np.uint64), hashes_b[HASH_COLUMN].to_numpy(np.uint64)])
+    }).drop_duplicates()
+    n_hashes = np.bincount(pairs["code"].to_numpy(), minlength=index.n_keys)
+    changed = ~(present_a & present_b) | (n_hashes > 1)
+
+    keys = pd.concat([
+          hashes_a.loc[changed[codes_a], key_columns]
+        , hashes_b.loc[changed[codes_b], key_columns]
+    ], ignore_index=True)
+    return pd.DataFrame({col: normalize_values(keys[col]) for col in key_columns}).drop_duplicates(ignore_index=True)
+
+
+def duplicate_rows(source: PushdownSource, hashes: pd.DataFrame, key_columns: list) -> pd.DataFrame:
+    """
+    Registros completos das chaves repetidas na fase 1, com GRUPO_DUPLICIDADE e QTD_DUPLICADOS.
+
+    Os grupos são numerados pela primeira ocorrência na fase 1 e apenas as linhas dessas
+    chaves são buscadas na origem (fetch_rows).
+    """
+    groups = analyze_duplicates(hashes[key_columns], key_columns)
+    if groups.empty:
+        return pd.DataFrame(columns=source.columns() + [GROUP_COLUMN, COUNT_COLUMN])
+
+    groups = groups.drop_duplicates(GROUP_COLUMN)
+    keys = pd.DataFrame({col: normalize_values(groups[col]) for col in key_columns})
+    keys[GROUP_COLUMN] = groups[GROUP_COLUMN].to_numpy()
+    keys[COUNT_COLUMN] = groups[COUNT_COLUMN].to_numpy()
+
+    rows = source.fetch_rows(keys, key_columns)
+    matched = pd.DataFrame({col: normalize_values(rows[col]) for col in key_columns}).merge(keys, how="left", on=key_columns)
+    rows[GROUP_COLUMN] = matched[GROUP_COLUMN].to_numpy()
+    rows[COUNT_COLUMN] = matched[COUNT_COLUMN].to_numpy()
+    return rows.sort_values(GROUP_COLUMN, kind="stable").reset_index(drop=True)
+
+
+def pushdown_compare(source_a: PushdownSource, source_b: PushdownSource, key_columns: list,
+                     hashes_a: pd.DataFrame, hashes_b: pd.DataFrame, engine: str = "auto"):
+    """
+    Fase 2 da comparação: busca as linhas completas apenas das chaves ausentes ou com hash diferente
+    (as mesmas chaves nas duas origens, ver changed_keys) e as compara com o motor configurado.
+
+    Args:
+        source_a (PushdownSource): Origem A.
+        source_b (PushdownSource): Origem B.
+        key_columns (list): Colunas que compõem a chave (normalizadas).
+        hashes_a (pd.DataFrame): Resultado de source_a.key_hashes (fase 1).
+        hashes_b (pd.DataFrame): Resultado de source_b.key_hashes (fase 1).
+        engine (str): 'auto', 'rust' ou 'pandas'.
+
+    Returns:
+        tuple: (somente na origem A, somente na origem B, diferenças), todos pd.DataFrame.
+    """
+    keys = changed_keys(hashes_a, hashes_b, key_columns)
+    logger.info(
+        f"Pushdown: {len(keys)} chaves ({len(hashes_a)} linhas na {source_a.source_key} e "
+        f"{len(hashes_b)} na {source_b.source_key}) seguem para a comparação completa"
+    )
+
+    rows_a = source_a.fetch_rows(keys, key_columns)
+    rows_b = source_b.fetch_rows(keys, key_columns)
+    return compare_sources(rows_a, rows_b, key_columns, engine=engine)
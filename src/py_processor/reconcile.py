@@ -0,0 +1,270 @@
+# ------------------------------------------------------------
+# Reconciliação no banco: arquivo copiado (COPY) para uma tabela temporária e comparado em SQL
+# ------------------------------------------------------------
+
+import io
+from typing import Iterator
+
+import pandas as pd
+from connectors.registry import get_registry
+from py_processor.loader import iter_source, build_query, build_connection_url, get_chunk_size
+from py_processor.pushdown import _identifier
+from py_processor.compare import DIFF_COLUMN, DIFF_VALUE_A, DIFF_VALUE_B
+from py_processor.utils.tratamentos import normalize_column_names_list, normalize_column_names_df
+from py_processor.utils.logger import logger
+from quality.duplicates import GROUP_COLUMN, COUNT_COLUMN
+
+# Posição da linha na origem (define a "última ocorrência" de cada chave, como no pandas)
+ROW = "__row"
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class _Side:
+    """
+    Uma origem vista pelo SQL: tabela ou subconsulta com as colunas (nomes normalizados), a posição
+    da linha (__row) e as chaves em texto (__k0, __k1, ...), nulos como '' — a mesma
+    normalização da comparação no pandas.
+    """
+
+    def __init__(self, source: str, relation: str, columns: list, cast: bool):
+        self.source = source
+        self.relation = relation
+        self.columns = columns
+        self.cast = cast
+
+    def value(self, alias: str, column: str) -> str:
+        # Colunas da tabela temporária já são texto sem nulos; as do banco são convertidas
+        if self.cast:
+            return f"coalesce(CAST({alias}.{column} AS text), '')"
+        return f"{alias}.{column}"
+
+
+class SqlReconciliation:
+    """
+    Compara uma origem arquivo com uma origem PostgreSQL sem trazer a tabela para o Python.
+
+    O arquivo é lido em blocos (iter_source) e enviado com COPY FROM STDIN para uma tabela
+    temporária indexada pelas chaves; duplicidade, somente em A, somente em B e diferenças
+    são calculados no banco e apenas as linhas de resultado voltam, em blocos, por cursor
+    do lado do servidor. A tabela temporária é descartada ao fim da transação.
+
+    As chaves e os valores do banco são comparados em texto (CAST AS text); como no modo
+    pushdown, números e datas precisam ter a mesma representação do arquivo. A consulta do
+    banco é lida uma única vez para outra tabela temporária, e a posição das suas linhas é a
+    ordem em que ela as devolveu nessa leitura.
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        source_a (str): Nome da origem A no config.yaml.
+        source_b (str): Nome da origem B no config.yaml.
+        key_columns (list): Colunas que compõem a chave.
+    """
+
+    def __init__(self, config: dict, source_a: str, source_b: str, key_columns: list):
+        sources = config.get("sources", {})
+        for source in (source_a, source_b):
+            if source not in sources:
+                raise KeyError(f"Fonte '{source}' não encontrada no config.yaml")
+
+        types = {source: sources[source].get("type") for source in (source_a, source_b)}
+        databases = [source for source, source_type in types.items() if source_type == "database"]
+        files = [source for source, source_type in types.items() if source_type == "file"]
+        if len(databases) != 1 or len(files) != 1:
+            raise ValueError("O modo database compara uma origem 'file' com uma origem 'database'.")
+        self.db_source, self.file_source = databases[0], files[0]
+        self.db_cfg = sources[self.db_source]
+        if self.db_cfg.get("db_type") != "postgresql":
+            raise ValueError(f"O modo database requer uma origem PostgreSQL (fonte '{self.db_source}').")
+
+        self.config = config
+        self.source_a = source_a
+        self.source_b = source_b
+        self.key_columns = [_identifier(col) for col in normalize_column_names_list(key_columns)]
+        if not self.key_columns:
+            raise ValueError("Nenhuma coluna-chave definida para a comparação.")
+        self.chunk_size = get_chunk_size(config)
+        self.table = _identifier(f"datalyzer_{self.file_source}")
+        self.sides = {}
+        self._conn = None
+        self._transaction = None
+
+    # ---------------- Sessão ----------------
+
+    def __enter__(self):
+        engine = get_registry(self.config).engine(build_connection_url(self.db_cfg))
+        self._conn = engine.connect()
+        self._transaction = self._conn.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # ON COMMIT DROP: a tabela temporária some no commit (ou no rollback, em caso de erro)
+        try:
+            if exc_type is None:
+                self._transaction.commit()
+            else:
+                self._transaction.rollback()
+        finally:
+            self._conn.close()
+        return False
+
+    def _execute(self, sql: str) -> None:
+        self._conn.exec_driver_sql(sql)
+
+    def _stream(self, sql: str) -> Iterator[pd.DataFrame]:
+        # Cursor nomeado: o cliente recebe no máximo `chunk_size` linhas por vez
+        conn = self._conn.execution_options(stream_results=True, max_row_buffer=self.chunk_size)
+        for chunk in pd.read_sql(sql, conn, chunksize=self.chunk_size):
+            yield normalize_column_names_df(chunk)
+
+    # ---------------- Carga ----------------
+
+    def _database_side(self) -> _Side:
+        query = build_query(self.db_cfg, self.db_source)
+        result = self._conn.exec_driver_sql(f"SELECT * FROM ({query}) q WHERE 1 = 0")
+        raw = list(result.keys())
+        result.close()
+
+        names = [_identifier(col) for col in normalize_column_names_list(raw)]
+        wanted = normalize_column_names_list(self.db_cfg.get("columns") or [])
+        projection = [(col, name) for col, name in zip(raw, names) if not wanted or name in wanted]
+        missing = [col for col in self.key_columns if col not in names]
+        if missing:
+            raise KeyError(f"Colunas-chave ausentes na origem {self.db_source}: {missing}")
+
+        # Materializada uma única vez: a posição (row_number) fica fixa em todas as consultas da sessão
+        table = _identifier(f"datalyzer_{self.db_source}")
+        select = ", ".join(f"q.{_quote(col)} AS {name}" for col, name in projection)
+        keys = ", ".join(f"coalesce(CAST(q.{_quote(raw[names.index(col)])} AS text), '') AS __k{i}"
+                         for i, col in enumerate(self.key_columns))
+        self._execute(
+            f"CREATE TEMPORARY TABLE {table} ON COMMIT DROP AS "
+            f"SELECT {select}, row_number() OVER () - 1 AS {ROW}, {keys} FROM ({query}) q"
+        )
+        self._execute(f"CREATE INDEX ON {table} ({', '.join(f'__k{i}' for i in range(len(self.key_columns)))})")
+        self._execute(f"ANALYZE {table}")
+        logger.info(f"{self.db_source} materializada na tabela temporária {table}")
+        return _Side(self.db_source, table, [name for _, name in projection], cast=True)
+
+    def load(self) -> int:
+        """
+        Copia a origem arquivo para a tabela temporária (COPY FROM STDIN, um bloco por vez),
+        cria o índice das chaves e atualiza as estatísticas da tabela.
+
+        Returns:
+            int: Linhas copiadas.
+        """
+        cursor = self._conn.connection.cursor()
+        columns = None
+        rows = 0
+        try:
+            for chunk in iter_source(self.config, self.file_source, self.chunk_size):
+                if columns is None:
+                    columns = [_identifier(col) for col in chunk.columns]
+                    missing = [col for col in self.key_columns if col not in columns]
+                    if missing:
+                        raise KeyError(f"Colunas-chave ausentes na origem {self.file_source}: {missing}")
+                    definition = ", ".join([f"{ROW} bigint"] + [f"{col} text" for col in columns])
+                    self._execute(f"CREATE TEMPORARY TABLE {self.table} ({definition}) ON COMMIT DROP")
+                    copy = (
+                        f"COPY {self.table} ({ROW}, {', '.join(columns)}) FROM STDIN "
+                        f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(columns)}))"
+                    )
+
+                # Posição no arquivo como primeira coluna; vazios (e nulos) chegam como ''
+                buffer = io.StringIO()
+                chunk.set_axis(range(rows, rows + len(chunk))).to_csv(buffer, header=False)
+                buffer.seek(0)
+                cursor.copy_expert(copy, buffer)
+                rows += len(chunk)
+        finally:
+            cursor.close()
+
+        if columns is None:
+            raise ValueError(f"A origem {self.file_source} está vazia.")
+
+        self._execute(f"CREATE INDEX ON {self.table} ({', '.join(self.key_columns)})")
+        self._execute(f"ANALYZE {self.table}")
+        logger.info(f"{self.file_source} copiada para a tabela temporária {self.table} com {rows} registros")
+
+        keys = ", ".join(f"t.{col} AS __k{i}" for i, col in enumerate(self.key_columns))
+        self.sides[self.file_source] = _Side(
+            self.file_source, f"(SELECT t.*, {keys} FROM {self.table} t)", columns, cast=False
+        )
+        self.sides[self.db_source] = self._database_side()
+        return rows
+
+    # ---------------- Resultados ----------------
+
+    def _keys(self, left: str, right: str) -> str:
+        return " AND ".join(f"{left}.__k{i} = {right}.__k{i}" for i in range(len(self.key_columns)))
+
+    def duplicates(self, source: str) -> Iterator[pd.DataFrame]:
+        """
+        Registros com chave repetida na origem, com GRUPO_DUPLICIDADE e QTD_DUPLICADOS
+        (as mesmas colunas do modo partitioned).
+        """
+        side = self.sides[source]
+        keys = ", ".join(f"__k{i}" for i in range(len(self.key_columns)))
+        sql = f"""
+            WITH d AS (
+                SELECT {keys}, count(*) AS __count, min({ROW}) AS __first
+                FROM {side.relation} s
+                GROUP BY {keys}
+                HAVING count(*) > 1
+            )
+            SELECT {", ".join(f"s.{col}" for col in side.columns)},
+                   dense_rank() OVER (ORDER BY d.__first) AS {GROUP_COLUMN},
+                   d.__count AS {COUNT_COLUMN}
+            FROM {side.relation} s
+            JOIN d ON {self._keys("s", "d")}
+            ORDER BY {GROUP_COLUMN}, s.{ROW}
+        """
+        return self._stream(sql)
+
+    def only_in(self, source: str) -> Iterator[pd.DataFrame]:
+        """
+        Registros de `source` cuja chave não existe na outra origem.
+        """
+        side = self.sides[source]
+        other = self.sides[self.source_b if source == self.source_a else self.source_a]
+        sql = f"""
+            SELECT {", ".join(f"s.{col}" for col in side.columns)}
+            FROM {side.relation} s
+            WHERE NOT EXISTS (SELECT 1 FROM {other.relation} o WHERE {self._keys("o", "s")})
+            ORDER BY s.{ROW}
+        """
+        return self._stream(sql)
+
+    def differences(self) -> Iterator[pd.DataFrame]:
+        """
+        Uma linha por (chave, coluna) com valor diferente entre as origens, comparando a última
+        ocorrência de cada chave em cada origem.
+        """
+        side_a, side_b = self.sides[self.source_a], self.sides[self.source_b]
+        columns_b = set(side_b.columns)
+        value_columns = [col for col in side_a.columns if col in columns_b and col not in self.key_columns]
+        if not value_columns:
+            return iter([pd.DataFrame(columns=self.key_columns + [DIFF_COLUMN, DIFF_VALUE_A, DIFF_VALUE_B])])
+
+        keys = ", ".join(f"__k{i}" for i in range(len(self.key_columns)))
+
+        def last(side):
+            return f"(SELECT DISTINCT ON ({keys}) * FROM {side.relation} s ORDER BY {keys}, {ROW} DESC)"
+
+        cells = ", ".join(
+            f"({i}, '{col}', {side_a.value('pa', col)}, {side_b.value('pb', col)})"
+            for i, col in enumerate(value_columns)
+        )
+        sql = f"""
+            SELECT {", ".join(f"pa.{col}" for col in self.key_columns)},
+                   v.col AS {DIFF_COLUMN}, v.va AS {DIFF_VALUE_A}, v.vb AS {DIFF_VALUE_B}
+            FROM {last(side_a)} pa
+            JOIN {last(side_b)} pb ON {self._keys("pa", "pb")}
+            CROSS JOIN LATERAL (VALUES {cells}) AS v(pos, col, va, vb)
+            WHERE v.va <> v.vb
+            ORDER BY v.pos, pa.{ROW}
+        """
+        return self._stream(sql)
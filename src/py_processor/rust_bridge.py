@@ -2,18 +2,30 @@
 # Bridge para comunicação com o módulo Rust
 # ------------------------------------------------------------
 
-import rust_core  # Esse é o módulo gerado pelo `maturin develop`
+try:
+    import rust_core  # Esse é o módulo gerado pelo `maturin develop`
+except ImportError:
+    rust_core = None
+
+# Indica se o módulo Rust foi compilado/instalado neste ambiente
+RUST_AVAILABLE = rust_core is not None
 
 import pandas as pd
 import os
 from py_processor.utils.tratamentos import normalize_column_names_list, normalize_column_names_df
 
+def _require_rust():
+    if not RUST_AVAILABLE:
+        raise RuntimeError("Módulo 'rust_core' não disponível. Execute `maturin develop` ou use o motor 'pandas'.")
+
 def process_with_rust(df):
+    _require_rust()
     # Transforma o DataFrame em lista de dicionários
     data = df.to_dict(orient="records")
     return rust_core.process_data(data)
 
 def check_duplicates(df, key_columns):
+    _require_rust()
     data = df.to_dict(orient="records")
     # Chama a função Rust para detectar índices de duplicados
     duplicates_indices = rust_core.check_duplicates_by_keys(data, key_columns)
@@ -30,6 +42,7 @@ def compare_with_rust(df_origemA: pd.DataFrame, df_origemB: pd.DataFrame, key_co
     origem_rows, destino_rows: list[dict]
     key_columns: list[str]
     """
+    _require_rust()
     
     # print(f'### Entrada 1 compare_with_rust: \n {df_origemA} \n {df_origemB} \n {key_columns}')
     # os.system("PAUSE")
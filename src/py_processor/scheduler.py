@@ -0,0 +1,275 @@
+# ------------------------------------------------------------
+# Várias comparações (jobs) com carga concorrente e compartilhada das origens
+# ------------------------------------------------------------
+
+import copy
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import pandas as pd
+from py_processor.loader import load_file, load_database, resolve_path
+from py_processor.incremental import DEFAULT_SNAPSHOT_DIR
+from py_processor.output import open_output, DEFAULT_OUTPUT_DIR
+from py_processor.partitioning import fits_in_memory, estimate_memory
+from py_processor.utils.memory import get_governor
+from py_processor.utils.metrics import metrics
+from py_processor.utils.logger import logger
+
+# Jobs executados ao mesmo tempo e origens carregadas ao mesmo tempo, quando não configurados
+DEFAULT_MAX_JOBS = 2
+DEFAULT_LOAD_WORKERS = 4
+
+# Modos em que o job recebe as origens já carregadas; nos demais, cada job lê as origens em blocos
+SHARED_MODES = ("memory",)
+
+# Opções de 'processing' do governador de memória, único no processo: valem para todos os jobs
+GLOBAL_PROCESSING = ("memory_limit", "chunk_size")
+
+# Contagens de cada resultado do job no relatório (nome do resultado -> coluna)
+RESULT_COLUMNS = {
+      "origemA_duplicados": "DUPLICADOS_A"
+    , "origemB_duplicados": "DUPLICADOS_B"
+    , "only_in_origemA": "SOMENTE_A"
+    , "only_in_origemB": "SOMENTE_B"
+    , "differences": "DIFERENCAS"
+}
+
+
+def get_jobs(config: dict) -> list:
+    """
+    Lista de jobs da seção 'jobs' do config.yaml, validada.
+
+    Cada job tem 'name', 'source_a' e 'source_b' (nomes em 'sources') e, opcionalmente,
+    'key_columns' e seções 'processing'/'comparison'/'validation' que sobrepõem as globais, exceto
+    'processing.memory_limit' e 'processing.chunk_size' (GLOBAL_PROCESSING), que não podem mudar por job.
+    """
+    jobs = config.get("jobs") or []
+    sources = config.get("sources") or {}
+    names = set()
+    for job in jobs:
+        name = job.get("name")
+        if not name:
+            raise ValueError("Todo job da seção 'jobs' precisa de 'name'.")
+        if name in names:
+            raise ValueError(f"Job '{name}' definido mais de uma vez.")
+        names.add(name)
+        for side in ("source_a", "source_b"):
+            if job.get(side) not in sources:
+                raise KeyError(f"Job '{name}': fonte '{job.get(side)}' ({side}) não encontrada em 'sources'.")
+        for option in GLOBAL_PROCESSING:
+            value = (job.get("processing") or {}).get(option)
+            if value is not None and value != (config.get("processing") or {}).get(option):
+                raise ValueError(
+                    f"Job '{name}': 'processing.{option}' vale para todos os jobs (governador de memória do processo); "
+                    f"defina-o na seção 'processing' global."
+                )
+    return jobs
+
+
+def job_config(config: dict, job: dict) -> dict:
+    """
+    Config de um job no formato de uma execução simples: as fontes do job viram 'origemA' e
+    'origemB', e os resultados, os snapshots do modo incremental e os fingerprints (se usados)
+    vão para uma pasta do job.
+    """
+    job_cfg = copy.deepcopy({key: value for key, value in config.items() if key not in ("jobs", "sources")})
+    sources = config["sources"]
+    job_cfg["sources"] = {
+          "origemA": copy.deepcopy(sources[job["source_a"]])
+        , "origemB": copy.deepcopy(sources[job["source_b"]])
+    }
+    if job.get("key_columns"):
+        for source in job_cfg["sources"].values():
+            source["key_columns"] = list(job["key_columns"])
+
+    for section in ("processing", "comparison", "validation"):
+        if job.get(section):
+            job_cfg[section] = {**(job_cfg.get(section) or {}), **job[section]}
+
+    output = job_cfg.setdefault("output", {})
+    output["directory"] = str(resolve_path(output.get("directory", DEFAULT_OUTPUT_DIR)) / job["name"])
+    if (job_cfg.get("comparison") or {}).get("fingerprint_dir"):
+        job_cfg["comparison"]["fingerprint_dir"] = str(resolve_path(job_cfg["comparison"]["fingerprint_dir"]) / job["name"])
+    # Snapshots sempre por job (também na pasta padrão): jobs não sobrescrevem os snapshots uns dos outros
+    incremental = job_cfg["incremental"] = dict(job_cfg.get("incremental") or {})
+    incremental["snapshot_dir"] = str(resolve_path(incremental.get("snapshot_dir") or DEFAULT_SNAPSHOT_DIR) / job["name"])
+    return job_cfg
+
+
+def job_mode(config: dict, job: dict) -> str:
+    return (job.get("processing") or {}).get("mode") or (config.get("processing") or {}).get("mode", "memory")
+
+
+def shares_sources(config: dict, job: dict) -> bool:
+    # Origens compartilhadas só nos modos em memória e quando cabem em 'processing.memory_limit'
+    if job_mode(config, job) not in SHARED_MODES:
+        return False
+    try:
+        return fits_in_memory(job_config(config, job), ["origemA", "origemB"])
+    except OSError:
+        return False  # arquivo inacessível: o erro aparece na execução do próprio job
+
+
+def load_source(config: dict, source: str) -> pd.DataFrame:
+    """
+    Carrega uma fonte inteira (arquivo ou banco), com os nomes de colunas em maiúsculas.
+    """
+    source_type = config["sources"][source].get("type")
+    if source_type == "file":
+        return load_file(config, source)
+    if source_type == "database":
+        df = load_database(config, source)
+        df.columns = [col.upper() for col in df.columns]
+        return df
+    raise ValueError(f"Tipo da fonte '{source}' não identificado. Use 'file' ou 'database'.")
+
+
+class SharedSources:
+    """
+    Origens em memória compartilhadas entre os jobs. Cada origem é carregada (em um pool de
+    threads) quando o primeiro job em execução que a usa pede por ela, e fica em memória
+    enquanto outros jobs ainda vão usá-la. A leitura de arquivos e bancos e os parsers em C
+    do pandas liberam o GIL, então as origens de um job carregam de fato ao mesmo tempo.
+
+    Se uma nova origem não couber em 'processing.memory_limit', as origens carregadas que
+    nenhum job em execução está usando são descartadas e recarregadas quando forem pedidas.
+    """
+
+    def __init__(self, config: dict, jobs: list, workers: int = DEFAULT_LOAD_WORKERS):
+        self.config = config
+        self.seconds = {}
+        self._lock = threading.Lock()
+        self._pending = Counter(job[side] for job in jobs for side in ("source_a", "source_b"))
+        self._in_use = Counter()
+        self._futures = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="carga")
+
+    def _load(self, source: str) -> pd.DataFrame:
+        start = time.perf_counter()
+        with metrics.stage("carga") as stage:
+            df = load_source(self.config, source)
+            stage.rows = len(df)
+        self.seconds[source] = time.perf_counter() - start
+        logger.info(f"{source} carregada com {len(df)} registros em {self.seconds[source]:.1f} s")
+        return df
+
+    def _make_room(self, source: str) -> None:
+        needed = estimate_memory(self.config, [source]) or 0
+        governor = get_governor(self.config)
+        idle = [name for name, future in self._futures.items() if not self._in_use[name] and future.done()]
+        for name in idle:
+            if governor.fits(needed):
+                return
+            del self._futures[name]
+            logger.info(f"{name} descartada da memória até o próximo job que a usar")
+
+    def acquire(self, *sources: str) -> list:
+        """
+        Origens pedidas por um job, carregadas se necessário (todas ao mesmo tempo).
+        """
+        with self._lock:
+            for source in sources:
+                if source not in self._futures:
+                    self._make_room(source)
+                    self._futures[source] = self._executor.submit(self._load, source)
+                self._in_use[source] += 1
+            futures = [self._futures[source] for source in sources]
+        try:
+            return [future.result() for future in futures]
+        except Exception:
+            self.release(*sources)
+            raise
+
+    def release(self, *sources: str) -> None:
+        with self._lock:
+            for source in sources:
+                self._in_use[source] -= 1
+                self._pending[source] -= 1
+                if self._pending[source] <= 0:
+                    self._futures.pop(source, None)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._futures = {}
+
+
+def _run_job(config: dict, job: dict, run_job: Callable, sources: SharedSources, shared: bool) -> dict:
+    name = job["name"]
+    result = {
+          "JOB": name
+        , "ORIGEM_A": job["source_a"]
+        , "ORIGEM_B": job["source_b"]
+        , "MODO": job_mode(config, job)
+        , "STATUS": "OK"
+        , "SEGUNDOS": None
+        , "ESPERA_CARGA_SEGUNDOS": None
+        , "LINHAS_A": None
+        , "LINHAS_B": None
+        , **{column: 0 for column in RESULT_COLUMNS.values()}
+        , "ERRO": None
+    }
+    start = time.perf_counter()
+    try:
+        job_cfg = job_config(config, job)
+        frames = None
+        if shared:
+            frames = dict(zip(("origemA", "origemB"), sources.acquire(job["source_a"], job["source_b"])))
+            result["ESPERA_CARGA_SEGUNDOS"] = time.perf_counter() - start
+            result["LINHAS_A"], result["LINHAS_B"] = len(frames["origemA"]), len(frames["origemB"])
+
+        logger.info(f"Job '{name}' iniciado ({job['source_a']} x {job['source_b']})")
+        with open_output(job_cfg) as output:
+            run_job(job_cfg, output, frames)
+        metrics.record("escrita", output.seconds, rows=sum(output.rows.values()))
+        for output_name, column in RESULT_COLUMNS.items():
+            result[column] = output.rows.get(output_name, 0)
+    except Exception as e:
+        logger.exception(f"Job '{name}' falhou: {e}")
+        result["STATUS"] = "ERRO"
+        result["ERRO"] = str(e)
+    finally:
+        if shared and frames is not None:
+            sources.release(job["source_a"], job["source_b"])
+        result["SEGUNDOS"] = time.perf_counter() - start
+
+    logger.info(f"Job '{name}' finalizado em {result['SEGUNDOS']:.1f} s ({result['STATUS']})")
+    return result
+
+
+def run_jobs(config: dict, run_job: Callable) -> pd.DataFrame:
+    """
+    Executa os jobs da seção 'jobs' em paralelo, até 'processing.max_jobs' ao mesmo tempo.
+
+    Nos modos com as origens em memória, cada origem é carregada (em até 'processing.load_workers'
+    threads) quando um job em execução precisa dela e compartilhada com os jobs seguintes que a
+    usam: ficam em memória as origens dos até 'processing.max_jobs' jobs em execução e as demais
+    já carregadas enquanto couberem em 'processing.memory_limit'.
+
+    A falha de um job não interrompe os demais.
+
+    Args:
+        config (dict): Configuração geral carregada via load_config.
+        run_job (Callable): Executa um job: run_job(config do job, gravador de resultados,
+            origens carregadas {'origemA': df, 'origemB': df} ou None).
+
+    Returns:
+        pd.DataFrame: Uma linha por job com status, tempos e contagens dos resultados.
+    """
+    jobs = get_jobs(config)
+    processing = config.get("processing") or {}
+    max_jobs = int(processing.get("max_jobs") or DEFAULT_MAX_JOBS)
+    load_workers = int(processing.get("load_workers") or DEFAULT_LOAD_WORKERS)
+
+    logger.info(f"\n\n####  {len(jobs)} jobs, até {max_jobs} em paralelo  ####")
+    shared = {job["name"]: shares_sources(config, job) for job in jobs}
+    sources = SharedSources(config, [job for job in jobs if shared[job["name"]]], load_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="job") as executor:
+            futures = [executor.submit(_run_job, config, job, run_job, sources, shared[job["name"]]) for job in jobs]
+            report = [future.result() for future in futures]
+    finally:
+        sources.close()
+    return pd.DataFrame(report)
@@ -0,0 +1,142 @@
+# ------------------------------------------------------------
+# Inferência de tipos por amostragem (reservoir) e classificação por regex
+# ------------------------------------------------------------
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from py_processor.utils.tratamentos import TYPE_THRESHOLD, classify_values
+from py_processor.utils.logger import logger
+
+DEFAULT_SAMPLE_SIZE = 10000
+
+
+class ReservoirSample:
+    """
+    Amostra aleatória uniforme de até `size` linhas de um fluxo de blocos (Algorithm R, vetorizado).
+
+    Diferente de `df.head()`, todas as linhas da origem têm a mesma chance de entrar na
+    amostra, inclusive em arquivos ordenados.
+    """
+
+    def __init__(self, size: int = DEFAULT_SAMPLE_SIZE, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self.sample = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk.reset_index(drop=True)
+        if self.sample is None:
+            self.sample = chunk.iloc[:0].astype(object)
+
+        # Preenche a amostra enquanto ela não atinge o tamanho
+        free = self.size - len(self.sample)
+        if free > 0:
+            self.sample = pd.concat([self.sample, chunk.iloc[:free].astype(object)], ignore_index=True)
+            self.seen += min(free, len(chunk))
+            chunk = chunk.iloc[free:].reset_index(drop=True)
+        if chunk.empty:
+            return
+
+        # A linha de posição global j substitui a posição r (uniforme em 0..j) quando r < size
+        positions = np.arange(self.seen, self.seen + len(chunk))
+        slots = (self._rng.random(len(chunk)) * (positions + 1)).astype(np.int64)
+        accepted = np.flatnonzero(slots < self.size)
+        self.seen += len(chunk)
+        if len(accepted) == 0:
+            return
+
+        # Substituições na ordem do fluxo: em um mesmo slot vale a última linha
+        slots = slots[accepted]
+        last = len(slots) - 1 - np.unique(slots[::-1], return_index=True)[1]
+        self.sample.iloc[slots[last]] = chunk.iloc[accepted[last]].astype(object).to_numpy()
+
+
+def infer_types(chunks: Iterable[pd.DataFrame], sample_size: int = DEFAULT_SAMPLE_SIZE,
+                threshold: float = TYPE_THRESHOLD, seed: int = 0) -> dict:
+    """
+    Infere o tipo de cada coluna a partir de uma amostra (reservoir) de todo o fluxo de blocos.
+
+    Returns:
+        dict: {coluna: resultado de classify_values}.
+    """
+    reservoir = ReservoirSample(sample_size, seed)
+    for chunk in chunks:
+        reservoir.update(chunk)
+    if reservoir.sample is None:
+        return {}
+    return {col: classify_values(reservoir.sample[col], threshold) for col in reservoir.sample.columns}
+
+
+def infer_source_types(directory, cache_key: str, chunks: Iterable[pd.DataFrame],
+                       sample_size: int = DEFAULT_SAMPLE_SIZE, threshold: float = TYPE_THRESHOLD) -> dict:
+    """
+    Tipos das colunas de uma fonte, guardados em cache pela chave da fonte (ver loader.source_cache_key).
+
+    Para arquivos a chave é o caminho + tamanho + data de modificação + opções de leitura;
+    enquanto ela não mudar, a inferência não é refeita e `chunks` (lido apenas quando
+    necessário) não é percorrido.
+
+    Args:
+        directory (str | Path): Diretório do cache de tipos (um JSON por versão da fonte).
+        cache_key (str): Chave da versão da fonte.
+        chunks (Iterable[pd.DataFrame]): Leitura da fonte em blocos, com os valores em texto.
+    """
+    path = Path(directory) / f"{cache_key}.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("sample_size") == sample_size and cached.get("threshold") == threshold:
+            return cached["types"]
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    types = infer_types(chunks, sample_size, threshold)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"sample_size": sample_size, "threshold": threshold, "types": types}, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info(f"Tipos inferidos salvos em: {path}")
+    return types
+
+
+def apply_types(df: pd.DataFrame, types: dict) -> pd.DataFrame:
+    """
+    Converte as colunas com os tipos e formatos já inferidos (formato explícito, sem adivinhação).
+
+    As colunas são substituídas no próprio DataFrame (sem cópia das demais). Valores
+    incompatíveis viram nulos e são contados no log; colunas 'string'/'unknown' não são alteradas.
+    """
+    for col, info in types.items():
+        if col not in df.columns:
+            continue
+        kind, fmt = info["type"], info.get("format")
+        values = df[col]
+        if kind in ("integer", "decimal"):
+            if kind == "decimal" and fmt == ",":
+                values = values.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+            elif kind == "decimal":
+                values = values.str.replace(",", "", regex=False)
+            numbers = pd.to_numeric(values, errors="coerce")
+            converted = numbers.astype("Int64") if kind == "integer" else numbers.astype("Float64")
+        elif kind == "datetime":
+            converted = pd.to_datetime(values, format=fmt, errors="coerce")
+        elif kind == "boolean":
+            lowered = values.str.strip().str.lower()
+            converted = lowered.map({"true": True, "verdadeiro": True, "sim": True,
+                                     "false": False, "falso": False, "nao": False, "não": False}).astype("boolean")
+        else:
+            continue
+
+        lost = int((converted.isna() & df[col].notna() & (df[col] != "")).sum())
+        if lost:
+            logger.warning(f"Coluna {col}: {lost} valores incompatíveis com o tipo {kind} ({fmt}) viraram nulos")
+        df[col] = converted
+    return df
@@ -2,8 +2,10 @@
 # Sistema de logging para o Datalyzer
 # ------------------------------------------------------------
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 # Caminho padrão para salvar logs
@@ -24,16 +26,20 @@ def setup_logger(name: str = "datalyzer") -> logging.Logger:
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(console_handler)
 
         # File handler com rotação (5 arquivos de até 5MB)
         file_handler = RotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=5, encoding="utf-8")
         file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(file_handler)
+
+        # O logger só enfileira os registros; console e arquivo são escritos por uma thread
+        # separada (QueueListener), sem bloquear os laços de processamento.
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)  # Grava os registros pendentes ao encerrar
 
     return logger
 
 # Instância padrão para reutilização fácil
 logger = setup_logger()
-
-
@@ -0,0 +1,185 @@
+# ------------------------------------------------------------
+# Utilitários de memória para o Datalyzer
+# ------------------------------------------------------------
+
+import re
+import threading
+
+import pandas as pd
+from py_processor.utils.metrics import current_rss
+from py_processor.utils.logger import logger
+
+# Multiplicadores aceitos em valores como "512MB" ou "2GB"
+SIZE_UNITS = {
+      "B": 1
+    , "KB": 1024
+    , "MB": 1024 ** 2
+    , "GB": 1024 ** 3
+    , "TB": 1024 ** 4
+}
+
+def parse_size(value) -> int:
+    """
+    Converte um tamanho em texto (ex: '2GB', '512 MB', '1024') para bytes.
+
+    Parâmetros:
+        value (str | int | float): Tamanho informado no config.yaml.
+
+    Retorno:
+        int: Tamanho em bytes.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?B)?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Tamanho inválido: '{value}'. Use por exemplo '512MB' ou '2GB'.")
+
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[(unit or "B").upper()])
+
+
+def format_size(nbytes: int) -> str:
+    """
+    Tamanho em bytes na maior unidade de SIZE_UNITS em que vale ao menos 1 (ex: '512.0 MB').
+    """
+    unit = max((unit for unit, factor in SIZE_UNITS.items() if nbytes >= factor), key=SIZE_UNITS.get, default="B")
+    return f"{nbytes / SIZE_UNITS[unit]:.1f} {unit}"
+
+
+# Limite usado nas estimativas quando 'processing.memory_limit' não é informado
+DEFAULT_MEMORY_LIMIT = "2GB"
+
+# Tamanho padrão dos blocos de leitura quando 'processing.chunk_size' não é informado
+DEFAULT_CHUNK_SIZE = 10000
+
+# Fator aproximado entre o tamanho em disco (CSV) e o tamanho em memória (strings Python),
+# usado enquanto a origem ainda não teve um bloco medido
+MEMORY_EXPANSION_FACTOR = 5
+
+# Parcela do limite para um bloco: leitor, cache, comparação e fila de gravação mantêm vários ao mesmo tempo
+CHUNK_SHARE = 0.02
+
+# Uso do limite (RSS) a partir do qual os blocos diminuem, e até onde uma carga completa é aceita
+SOFT_LIMIT = 0.7
+HARD_LIMIT = 0.9
+
+# Linhas do primeiro bloco usadas para medir uma origem
+SAMPLE_ROWS = 10000
+
+# Menor bloco entregue pelos leitores, mesmo sob pressão de memória
+MIN_CHUNK_SIZE = 500
+
+
+class MemoryGovernor:
+    """
+    Mantém a execução abaixo de 'processing.memory_limit'.
+
+    Os bytes por linha de cada origem são estimados pelo primeiro bloco lido (memory_usage
+    deep) e limitam o tamanho dos blocos a uma parcela do limite. O RSS do processo é lido a
+    cada bloco: acima de SOFT_LIMIT os blocos diminuem na proporção da folga restante.
+    Sem 'memory_limit', apenas devolve 'processing.chunk_size'.
+
+    Args:
+        memory_limit (str | int): Limite de memória (ex: '2GB').
+        chunk_size (int): Tamanho de bloco configurado (teto dos blocos).
+    """
+
+    def __init__(self, memory_limit=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.limit = parse_size(memory_limit) if memory_limit else None
+        self.base_chunk_size = int(chunk_size)
+        self.bytes_per_row = {}
+        self.expansion = {}
+        self._lock = threading.Lock()
+        self._warned = None
+
+    def observe(self, key: str, df: pd.DataFrame) -> float:
+        """
+        Mede os bytes por linha da origem `key` (caminho do arquivo ou query) no primeiro
+        bloco recebido e a razão entre o tamanho em memória e o texto CSV do bloco.
+        """
+        if key in self.bytes_per_row or df is None or df.empty:
+            return self.bytes_per_row.get(key)
+        df = df.iloc[:SAMPLE_ROWS]
+        memory = int(df.memory_usage(deep=True, index=False).sum())
+        text = len(df.to_csv(index=False, header=False).encode("utf-8"))
+        with self._lock:
+            self.bytes_per_row[key] = memory / len(df)
+            self.expansion[key] = memory / max(1, text)
+        logger.debug(f"Memória estimada de {key}: {self.bytes_per_row[key]:.0f} bytes por linha")
+        return self.bytes_per_row[key]
+
+    def usage(self):
+        """
+        RSS do processo como fração do limite (None sem limite ou sem leitura de RSS).
+        """
+        if self.limit is None:
+            return None
+        rss = current_rss()
+        return rss / self.limit if rss is not None else None
+
+    def chunk_size(self, key: str = None) -> int:
+        """
+        Linhas do próximo bloco da origem `key` (sem `key`, a origem mais pesada já medida).
+        """
+        size = self.base_chunk_size
+        if self.limit is None:
+            return size
+
+        bytes_per_row = self.bytes_per_row.get(key) if key else max(self.bytes_per_row.values(), default=None)
+        if bytes_per_row:
+            size = min(size, int(self.limit * CHUNK_SHARE / bytes_per_row))
+
+        usage = self.usage()
+        if usage is None or usage < SOFT_LIMIT:
+            self._warned = None
+            return max(min(MIN_CHUNK_SIZE, self.base_chunk_size), size)
+
+        # Reduz na proporção da folga que resta até o limite
+        size = int(size * max(0.0, (1 - usage) / (1 - SOFT_LIMIT)))
+        size = max(min(MIN_CHUNK_SIZE, self.base_chunk_size), size)
+        # Avisa ao entrar sob pressão e a cada vez que o bloco entregue cai à metade do último aviso
+        if self._warned is None or size <= self._warned // 2:
+            self._warned = size
+            logger.warning(f"Memória em {usage:.0%} de {format_size(self.limit)}: blocos reduzidos para {size} linhas")
+        return size
+
+    def estimate(self, key: str, disk_bytes: int) -> int:
+        """
+        Memória estimada de uma origem inteira a partir do tamanho em disco.
+        """
+        return int(disk_bytes * self.expansion.get(key, MEMORY_EXPANSION_FACTOR))
+
+    def fits(self, nbytes: int) -> bool:
+        """
+        Indica se `nbytes` a mais em memória mantêm o processo abaixo de HARD_LIMIT do limite.
+        """
+        if self.limit is None:
+            return True
+        return (current_rss() or 0) + nbytes <= self.limit * HARD_LIMIT
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor(config: dict = None) -> MemoryGovernor:
+    """
+    Governador de memória do processo, a partir de 'processing.memory_limit' e 'processing.chunk_size'.
+
+    Se essas opções mudarem, um novo governador é criado mantendo as medições das origens.
+    """
+    global _governor
+    processing = (config or {}).get("processing") or {}
+    memory_limit = processing.get("memory_limit")
+    chunk_size = int(processing.get("chunk_size") or DEFAULT_CHUNK_SIZE)
+    with _governor_lock:
+        if _governor is None or (config is not None and (
+                _governor.limit != (parse_size(memory_limit) if memory_limit else None)
+                or _governor.base_chunk_size != chunk_size)):
+            previous = _governor
+            _governor = MemoryGovernor(memory_limit, chunk_size)
+            if previous is not None:
+                _governor.bytes_per_row.update(previous.bytes_per_row)
+                _governor.expansion.update(previous.expansion)
+        return _governor
@@ -0,0 +1,246 @@
+# ------------------------------------------------------------
+# Métricas de desempenho por etapa (tempo, CPU, linhas/s, memória e cProfile)
+# ------------------------------------------------------------
+
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from py_processor.utils.logger import logger, LOG_DIR
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Diretório padrão dos arquivos de métricas (junto aos logs)
+DEFAULT_METRICS_DIR = LOG_DIR / "metrics"
+
+# Raiz do projeto: base de 'metrics.directory' no config.yaml
+ROOT_DIR = Path(__file__).resolve().parents[3]
+
+# Intervalo (segundos) entre as leituras de RSS durante uma etapa
+RSS_INTERVAL = 0.01
+
+
+def current_rss():
+    """
+    Memória residente do processo em bytes (psutil ou /proc), ou None se indisponível.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PeakRSS:
+    """
+    Mede o pico de RSS de um trecho com uma thread de amostragem.
+    """
+
+    def __init__(self, interval: float = RSS_INTERVAL):
+        self.interval = interval
+        self.start = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self.start = self.peak = current_rss()
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak = max(self.peak, current_rss())
+        return False
+
+
+class Stage:
+    """
+    Etapa em andamento; `rows` pode ser informado depois de iniciada (ex: após a carga).
+    """
+
+    def __init__(self, name: str, rows: int = None):
+        self.name = name
+        self.rows = rows
+
+
+class MetricsRecorder:
+    """
+    Registra tempo de parede, tempo de CPU, linhas/s e pico de memória de cada etapa.
+
+    Etapas com o mesmo nome (ex: uma por partição) são acumuladas: tempos e linhas somados,
+    pico de memória pelo maior valor. Com `profile`, as etapas indicadas (ou todas, com
+    True) também são executadas sob cProfile, com um arquivo .prof por etapa (acumulando
+    todas as chamadas da etapa).
+
+    O tempo de CPU é o do processo (todas as threads, incluindo a gravação de resultados).
+    """
+
+    def __init__(self, enabled: bool = True, directory=None, profile=False):
+        self._lock = threading.Lock()
+        self.reset(enabled, directory, profile)
+
+    def reset(self, enabled: bool = True, directory=None, profile=False) -> None:
+        """
+        Descarta as medições e inicia uma nova execução.
+        """
+        self.enabled = enabled
+        self.directory = Path(directory) if directory else None
+        self.profile = profile
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.stages = {}
+        self._profilers = {}
+        self._profiling = False
+
+    def _should_profile(self, name: str) -> bool:
+        if self._profiling or not self.profile:
+            return False  # um único cProfile ativo por vez (etapas aninhadas não são perfiladas)
+        return self.profile is True or name in self.profile
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        """
+        Mede o bloco `with` como a etapa `name`.
+        """
+        current = Stage(name, rows)
+        if not self.enabled:
+            yield current
+            return
+
+        profiler = None
+        if self._should_profile(name):
+            profiler = self._profilers.setdefault(name, cProfile.Profile())
+            self._profiling = True
+
+        with PeakRSS() as rss:
+            wall, cpu = time.perf_counter(), time.process_time()
+            if profiler is not None:
+                profiler.enable()
+            try:
+                yield current
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    self._profiling = False
+                wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+        peak = rss.peak / 2**20 if rss.peak is not None else None
+        self.record(name, wall, cpu, current.rows, peak)
+
+    def timed(self, name: str = None):
+        """
+        Decorador: mede cada chamada da função como a etapa `name` (padrão: nome da função).
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name: str, wall_seconds: float, cpu_seconds: float = None, rows: int = None,
+               peak_rss_mb: float = None) -> None:
+        """
+        Acumula uma medição na etapa `name` (usado também para tempos medidos fora de stage()).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stage = self.stages.setdefault(name, {
+                  "calls": 0
+                , "wall_seconds": 0.0
+                , "cpu_seconds": 0.0
+                , "rows": None
+                , "peak_rss_mb": None
+            })
+            stage["calls"] += 1
+            stage["wall_seconds"] += wall_seconds
+            stage["cpu_seconds"] += cpu_seconds or 0.0
+            if rows is not None:
+                stage["rows"] = (stage["rows"] or 0) + int(rows)
+            if peak_rss_mb is not None:
+                stage["peak_rss_mb"] = max(stage["peak_rss_mb"] or 0.0, peak_rss_mb)
+
+    def report(self) -> dict:
+        stages = []
+        for name, stage in self.stages.items():
+            rows, wall = stage["rows"], stage["wall_seconds"]
+            stages.append({
+                  "stage": name
+                , **stage
+                , "rows_per_second": rows / wall if rows and wall else None
+            })
+        return {
+              "run_id": self.run_id
+            , "started_at": self.started_at
+            , "finished_at": datetime.now().isoformat(timespec="seconds")
+            , "stages": stages
+        }
+
+    def summary(self) -> str:
+        parts = []
+        for stage in self.report()["stages"]:
+            text = f"{stage['stage']} {stage['wall_seconds']:.2f}s"
+            if stage["rows_per_second"]:
+                text += f" ({stage['rows_per_second']:,.0f} linhas/s)"
+            if stage["peak_rss_mb"] is not None:
+                text += f" pico {stage['peak_rss_mb']:.0f} MB"
+            parts.append(text)
+        return "; ".join(parts)
+
+    def save(self) -> Path:
+        """
+        Grava o relatório da execução (JSON) e registra o resumo no log.
+        """
+        if not self.enabled or not self.stages:
+            return None
+        logger.info(f"Métricas por etapa: {self.summary()}")
+        if self.directory is None:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self.run_id}_metrics.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        for name, profiler in self._profilers.items():
+            profiler.dump_stats(str(self.directory / f"{self.run_id}_{name.replace(' ', '_')}.prof"))
+        logger.info(f"Métricas salvas em: {path}")
+        return path
+
+
+# Instância compartilhada; desabilitada até start_metrics()
+metrics = MetricsRecorder(enabled=False)
+
+
+def start_metrics(config: dict) -> MetricsRecorder:
+    """
+    Inicia as métricas da execução conforme a seção 'metrics' do config.yaml.
+    """
+    metrics_cfg = config.get("metrics") or {}
+    directory = metrics_cfg.get("directory")
+    metrics.reset(
+          enabled=metrics_cfg.get("enabled", True)
+        , directory=(ROOT_DIR / directory).resolve() if directory else DEFAULT_METRICS_DIR
+        , profile=metrics_cfg.get("profile", False)
+    )
+    return metrics
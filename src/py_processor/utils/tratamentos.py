@@ -2,6 +2,7 @@
 # Módulo de tratamento e normalização de dados
 # ------------------------------------------------------------
 
+import numpy as np
 import pandas as pd
 import unicodedata
 import os
@@ -78,18 +79,84 @@ def datetime_series(series: pd.Series) -> bool:
         bool: True se a série puder ser convertida para datetime, False caso contrário.
     """
     for fmt in COMMON_DATE_FORMATS:
-        try:
-            pd.to_datetime(series, format=fmt, errors='raise')
+        if pd.to_datetime(series, format=fmt, errors="coerce").notna().all():
             return True
-        except Exception:
-            continue
     return False
 
+# Padrões avaliados na ordem: o primeiro com participação >= threshold define o tipo.
+# Números com zero à esquerda (CPF, NIS, códigos) são identificadores e ficam como texto.
+# Os decimais também aceitam inteiros: colunas que misturam '3' e '1.5' são decimais.
+TYPE_PATTERNS = [
+      ("integer", None, r"[+-]?(?:0|[1-9]\d*)")
+    , ("decimal", ".", r"[+-]?(?:0|[1-9]\d*)(?:\.\d+)?|[+-]?\.\d+|[+-]?[1-9]\d{0,2}(?:,\d{3})+(?:\.\d+)?")
+    , ("decimal", ",", r"[+-]?(?:0|[1-9]\d*)(?:,\d+)?|[+-]?,\d+|[+-]?[1-9]\d{0,2}(?:\.\d{3})+(?:,\d+)?")
+    , ("datetime", "%Y-%m-%d %H:%M:%S", r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+    , ("datetime", "%Y-%m-%dT%H:%M:%S", r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
+    , ("datetime", "%Y-%m-%d", r"\d{4}-\d{2}-\d{2}")
+    , ("datetime", "%d/%m/%Y %H:%M:%S", r"\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}")
+    , ("datetime", "%d/%m/%Y", r"\d{2}/\d{2}/\d{4}")
+    , ("datetime", "%Y/%m/%d", r"\d{4}/\d{2}/\d{2}")
+    , ("datetime", "%d-%m-%Y", r"\d{2}-\d{2}-\d{4}")
+    , ("boolean", None, r"(?i:true|false|verdadeiro|falso|sim|n[aã]o)")
+]
+
+# Fração mínima dos valores que precisa seguir um padrão para definir o tipo
+TYPE_THRESHOLD = 0.98
+
+# Tipos simplificados retornados por infer_column_types
+LEGACY_TYPES = {
+      "integer": "numeric"
+    , "decimal": "numeric"
+    , "datetime": "datetime"
+    , "boolean": "string"
+    , "string": "string"
+    , "unknown": "unknown"
+}
+
+def classify_values(values, threshold: float = TYPE_THRESHOLD) -> dict:
+    """
+    Classifica uma coluna a partir de valores amostrados, com regex vetorizado
+    (sem conversões que lancem exceções).
+
+    Parâmetros:
+        values: Valores da amostra (série ou array).
+        threshold (float): Fração mínima dos valores não nulos compatíveis com o tipo.
+
+    Retorno:
+        dict: {'type', 'format', 'confidence', 'null_fraction'}. 'confidence' é a fração dos
+              valores não nulos compatíveis com o tipo escolhido; 'format' traz o formato
+              de data ou o separador decimal.
+    """
+    text = pd.Series(normalize_values(pd.Series(values, dtype=object)), dtype=object).str.strip()
+    present = text[text != ""]
+    null_fraction = 1 - len(present) / len(text) if len(text) else 1.0
+    if present.empty:
+        return {"type": "unknown", "format": None, "confidence": 0.0, "null_fraction": null_fraction}
+
+    best_share = 0.0
+    for kind, fmt, pattern in TYPE_PATTERNS:
+        matches = present.str.fullmatch(pattern)
+        if kind == "datetime" and matches.any():
+            # O regex confirma o formato; a conversão (sem exceções) confirma dia/mês válidos
+            parsed = pd.to_datetime(present[matches], format=fmt, errors="coerce")
+            matches = matches.copy()
+            matches[matches] = parsed.notna().to_numpy()
+        share = float(matches.mean())
+        if share >= threshold:
+            return {"type": kind, "format": fmt, "confidence": share, "null_fraction": null_fraction}
+        best_share = max(best_share, share)
+
+    return {"type": "string", "format": None, "confidence": 1.0 - best_share, "null_fraction": null_fraction}
+
 # Identificar tipos de dados em um DataFrame e realizar verificações de datas.
 def infer_column_types(df: pd.DataFrame, sample_size: int = 100) -> dict:
     """
     Infere o tipo de dados de cada coluna de um DataFrame com base em uma amostra.
 
+    A amostra é aleatória sobre todas as linhas (não apenas as primeiras), e cada coluna
+    é classificada por classify_values. Para fontes lidas em blocos e com confiança por
+    coluna, use py_processor.type_inference.
+
     Tipos possíveis: 'numeric', 'datetime', 'string', 'unknown'.
 
     Parâmetros:
@@ -99,28 +166,32 @@ def infer_column_types(df: pd.DataFrame, sample_size: int = 100) -> dict:
     Retorno:
         dict: Dicionário com o nome da coluna como chave e tipo inferido como valor.
     """
-    inferred = {}
-    sample_df = df.head(sample_size)
-
-    for col in sample_df.columns:
-        series = sample_df[col].dropna()
-
-        if series.empty:
-            inferred[col] = "unknown"
-            continue
+    sample_df = df.sample(n=min(sample_size, len(df)), random_state=0) if len(df) > sample_size else df
+    return {col: LEGACY_TYPES[classify_values(sample_df[col])["type"]] for col in sample_df.columns}
+# MODULO 2 - FIM.
 
-        try:
-            pd.to_numeric(series)
-            inferred[col] = "numeric"
-            continue
-        except:
-            pass
+# MODULO 3 - INICIO.
+# Normalização de valores usada na comparação, no particionamento e nos fingerprints.
+def normalize_values(series: pd.Series) -> np.ndarray:
+    """
+    Converte uma série para um array de strings, trocando nulos por "".
 
-        if datetime_series(series):
-            inferred[col] = "datetime"
-            continue
+    Segue a mesma regra de `rust_bridge.convert_all_values_to_str`, mas de forma
+    vetorizada, para que os dois motores de comparação enxerguem os mesmos valores.
 
-        inferred[col] = "string"
+    Parâmetros:
+        series (pd.Series): Série a ser normalizada.
 
-    return inferred
-# MODULO 2 - FIM.
\ No newline at end of file
+    Retorno:
+        np.ndarray: Array (dtype object) com os valores em texto.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Converte apenas o dicionário; o código -1 (nulo) aponta para o "" acrescentado no final
+        categories = series.cat.categories.astype(str).to_numpy(dtype=object)
+        return np.append(categories, "")[series.cat.codes.to_numpy()]
+
+    mask = series.isna().to_numpy()
+    values = series.astype(str).to_numpy(dtype=object)
+    values[mask] = ""
+    return values
+# MODULO 3 - FIM.
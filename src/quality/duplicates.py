@@ -1,4 +1,131 @@
-from rust_core import find_duplicates
+# ------------------------------------------------------------
+# Motor de análise de duplicidade por chave composta
+# ------------------------------------------------------------
 
-def analyze_duplicates(df):
-    return find_duplicates(df)
\ No newline at end of file
+import numpy as np
+import pandas as pd
+from py_processor.fingerprint import FINGERPRINT_COLUMN, row_fingerprints
+from py_processor.key_index import KeyIndex
+from py_processor.utils.tratamentos import normalize_column_names_list
+
+# Colunas acrescentadas ao relatório de duplicados
+GROUP_COLUMN = "GRUPO_DUPLICIDADE"
+COUNT_COLUMN = "QTD_DUPLICADOS"
+ROW_COLUMN = "LINHA_ORIGEM"
+KIND_COLUMN = "DUPLICIDADE"
+
+
+def duplicate_groups(codes: np.ndarray, n_keys: int = None) -> pd.DataFrame:
+    """
+    Encontra os grupos de chaves repetidas a partir dos códigos das chaves.
+
+    Args:
+        codes (np.ndarray): Código da chave de cada linha (ver KeyIndex).
+        n_keys (int): Quantidade de códigos distintos. Padrão: calculado a partir de `codes`.
+
+    Returns:
+        pd.DataFrame: Uma linha por registro duplicado com LINHA_ORIGEM (posição na origem),
+                      GRUPO_DUPLICIDADE (1..n, na ordem da primeira linha de cada chave) e
+                      QTD_DUPLICADOS, ordenado por grupo e linha.
+    """
+    if n_keys is None:
+        n_keys = int(codes.max()) + 1 if len(codes) else 0
+
+    counts = np.bincount(codes, minlength=n_keys)
+    rows = np.flatnonzero(counts[codes] > 1)
+    # Grupos numerados pela primeira linha de cada chave nesta origem (não pela ordem dos
+    # códigos, que num índice compartilhado segue a outra origem)
+    group_ids, _ = pd.factorize(codes[rows])
+    order = np.argsort(group_ids, kind="stable")
+    rows, group_ids = rows[order], group_ids[order]
+
+    return pd.DataFrame({
+          ROW_COLUMN: rows
+        , GROUP_COLUMN: group_ids + 1
+        , COUNT_COLUMN: counts[codes[rows]]
+    })
+
+
+def analyze_duplicates(df: pd.DataFrame, key_columns: list, key_index: KeyIndex = None, side: int = 0,
+                       fingerprints=None) -> pd.DataFrame:
+    """
+    Retorna os registros duplicados pela chave composta, agrupados e numerados.
+
+    O índice de chaves pode ser recebido pronto (p.ex. o mesmo KeyIndex que será usado
+    na comparação entre as origens); só é construído aqui quando não corresponde ao
+    DataFrame e às chaves informadas.
+
+    Args:
+        df (pd.DataFrame): Dados da origem.
+        key_columns (list): Colunas que compõem a chave.
+        key_index (KeyIndex): Índice de chaves já construído (opcional).
+        side (int): Posição desta origem no índice (0 = origem A, 1 = origem B).
+        fingerprints (pd.DataFrame | np.ndarray | bool): Fingerprints das linhas (opcional), ou
+            True para calculá-los só das linhas duplicadas. Quando informados, a coluna
+            DUPLICIDADE indica se o grupo é 'EXATA' ou 'DIVERGENTE'.
+
+    Returns:
+        pd.DataFrame: Registros duplicados com GRUPO_DUPLICIDADE, QTD_DUPLICADOS e LINHA_ORIGEM.
+    """
+    key_columns = normalize_column_names_list(key_columns)
+    if not key_columns:
+        raise ValueError("Nenhuma chave primária definida para validação de duplicidade.")
+
+    if (key_index is None or key_index.key_columns != key_columns
+            or side >= len(key_index.codes) or len(key_index.codes[side]) != len(df)):
+        key_index = KeyIndex.build(key_columns, df)
+        side = 0
+
+    groups = duplicate_groups(key_index.codes[side], key_index.n_keys)
+    result = df.iloc[groups[ROW_COLUMN].to_numpy()].reset_index(drop=True)
+    for col in (GROUP_COLUMN, COUNT_COLUMN, ROW_COLUMN):
+        result[col] = groups[col].to_numpy()
+
+    if fingerprints is True:
+        fingerprints = row_fingerprints(result, [col for col in df.columns if col not in key_columns])
+    elif fingerprints is not None:
+        if isinstance(fingerprints, pd.DataFrame):
+            fingerprints = fingerprints[FINGERPRINT_COLUMN]
+        fingerprints = np.asarray(fingerprints)[groups[ROW_COLUMN].to_numpy()]
+    if fingerprints is not None:
+        distinct = pd.Series(fingerprints).groupby(groups[GROUP_COLUMN].to_numpy()).transform("nunique").to_numpy()
+        result[KIND_COLUMN] = np.where(distinct == 1, "EXATA", "DIVERGENTE")
+
+    return result
+
+
+def partition_duplicates(df: pd.DataFrame, key_columns: list, key_index: KeyIndex = None, side: int = 0,
+                         kind: bool = True) -> pd.DataFrame:
+    """
+    Duplicados de uma partição (modos partitioned e parallel), com LINHA_ORIGEM na origem
+    inteira: o índice da partição traz a posição de cada linha na origem.
+
+    Com `kind`, DUPLICIDADE é calculada pelo fingerprint apenas das linhas duplicadas.
+    Os grupos são numerados dentro da partição; ver merge_duplicates.
+    """
+    positions = df.index.to_numpy()
+    df.index = pd.RangeIndex(len(df))
+    try:
+        result = analyze_duplicates(df, key_columns, key_index=key_index, side=side, fingerprints=True if kind else None)
+    finally:
+        df.index = positions
+    result[ROW_COLUMN] = positions[result[ROW_COLUMN].to_numpy()]
+    return result
+
+
+def merge_duplicates(parts: list) -> pd.DataFrame:
+    """
+    Une os duplicados das partições de uma origem e numera os grupos pela primeira linha de
+    cada chave na origem inteira: o mesmo resultado de analyze_duplicates na origem completa.
+    """
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame()
+
+    # Grupos de partições diferentes são distintos mesmo com o mesmo número
+    for partition, part in enumerate(parts):
+        part[GROUP_COLUMN] = part[GROUP_COLUMN].astype(np.int64) + (partition << 32)
+    result = pd.concat(parts, ignore_index=True)
+    first = result.groupby(GROUP_COLUMN)[ROW_COLUMN].transform("min").to_numpy()
+    result[GROUP_COLUMN] = pd.factorize(first, sort=True)[0] + 1
+    return result.sort_values([GROUP_COLUMN, ROW_COLUMN], kind="stable", ignore_index=True)
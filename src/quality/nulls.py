@@ -0,0 +1,30 @@
+# ------------------------------------------------------------
+# Análise de valores nulos por coluna
+# ------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+from py_processor.utils.tratamentos import normalize_values
+
+
+def null_mask(series: pd.Series) -> np.ndarray:
+    """
+    Indica os valores nulos da série: ausentes (NaN/None) ou texto vazio/só espaços.
+    """
+    values = pd.Series(normalize_values(series), dtype=object)
+    return (values.str.strip() == "").to_numpy()
+
+
+def null_report(stats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quantidade e percentual de nulos por coluna, a partir de StatsCollector.result().
+    """
+    return stats[["COLUNA", "LINHAS", "NULOS", "PERC_NULOS"]].sort_values("PERC_NULOS", ascending=False)
+
+
+def validate_null_percentage(stats: pd.DataFrame, maximum: float) -> pd.DataFrame:
+    """
+    Colunas com percentual de nulos acima de `maximum` (0..1).
+    """
+    report = null_report(stats)
+    return report[report["PERC_NULOS"] > maximum]
@@ -0,0 +1,337 @@
+# ------------------------------------------------------------
+# Estatísticas por coluna em uma única passada (sketches combináveis)
+# ------------------------------------------------------------
+#
+# Cada estrutura abaixo ocupa memória constante, independente da quantidade de linhas,
+# e possui `merge()`: blocos, partições ou workers podem ser processados separadamente
+# e combinados ao final com o mesmo resultado de uma leitura única.
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from py_processor.utils.tratamentos import normalize_values
+from quality.nulls import null_mask
+
+DEFAULT_COMPRESSION = 100
+DEFAULT_HLL_PRECISION = 14
+DEFAULT_TOP_K = 10
+DEFAULT_QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+
+
+class RunningMoments:
+    """
+    Contagem, média, variância (Welford/Chan, combinável por blocos), mínimo e máximo.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _combine(self, count, mean, m2, minimum, maximum) -> None:
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        mean = float(values.mean())
+        self._combine(len(values), mean, float(((values - mean) ** 2).sum()), float(values.min()), float(values.max()))
+
+    def merge(self, other: "RunningMoments") -> None:
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+
+class QuantileSketch:
+    """
+    Quantis aproximados no estilo t-digest (merging digest).
+
+    Os valores viram centróides (média, peso). Na compressão, os pontos ordenados são
+    agrupados pela escala k1(q) = compression/(2π)·asin(2q-1): cada centróide cobre no
+    máximo uma unidade de k, o que dá mais resolução aos extremos (q perto de 0 ou 1) e
+    limita o digest a compression/2 + 1 centróides (teto rígido de ceil(compression)),
+    qualquer que seja a quantidade de valores.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer_size = 10 * compression
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        self.means = np.concatenate([self.means, np.asarray(values, dtype=float)])
+        self.weights = np.concatenate([self.weights, np.ones(len(values))])
+        if len(self.means) > self._buffer_size:
+            self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.means = np.concatenate([self.means, other.means])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self._compress()
+
+    def _compress(self) -> None:
+        if len(self.means) <= 1:
+            return
+        order = np.argsort(self.means, kind="stable")
+        means, weights = self.means[order], self.weights[order]
+        total = weights.sum()
+
+        # Posição (q) do centro de cada ponto e a unidade da escala k1 em que ele cai
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * (np.arcsin(2 * q - 1) + np.pi / 2)
+        cells = np.minimum(k.astype(np.int64), int(np.ceil(self.compression)) - 1)
+        starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+
+        new_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / new_weights
+        self.weights = new_weights
+
+    def quantile(self, q: float) -> float:
+        """
+        Valor aproximado do quantil q (0..1), interpolando entre os centróides.
+        """
+        if len(self.means) == 0:
+            return float("nan")
+        self._compress()
+        if len(self.means) == 1:
+            return float(self.means[0])
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), centers, self.means))
+
+
+class HyperLogLog:
+    """
+    Estimativa de valores distintos (HyperLogLog) com 2^precision registradores de 1 byte.
+
+    Com a precisão padrão (14) ocupa 16 KB e o erro típico é de ~0,8%.
+    """
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        if not 11 <= precision <= 18:
+            raise ValueError("A precisão do HyperLogLog deve estar entre 11 e 18.")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        rest_bits = 64 - self.precision
+        index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        # rest tem até 53 bits: a conversão para float preserva a posição do bit mais alto
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (rest_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def update(self, values: pd.Series) -> None:
+        self.update_hashes(pd.util.hash_array(np.asarray(values, dtype=object)))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Não é possível combinar HyperLogLog com precisões diferentes.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # correção para cardinalidades pequenas
+        return float(estimate)
+
+
+class SpaceSaving:
+    """
+    Valores mais frequentes (top-k) pelo algoritmo Space-Saving, em versão combinável.
+
+    Guarda até `capacity` contadores. Um valor fora dos contadores herda o piso (`floor`,
+    maior contagem já descartada) como erro máximo, de modo que as contagens são sempre
+    superestimativas com erro conhecido.
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K, capacity: int = None):
+        self.k = k
+        self.capacity = capacity or max(10 * k, 100)
+        self.counts = pd.Series(dtype="int64")
+        self.errors = pd.Series(dtype="int64")
+        self.floor = 0
+
+    def _combine(self, counts: pd.Series, errors: pd.Series, floor: int) -> None:
+        index = self.counts.index.union(counts.index)
+        merged = (
+            self.counts.reindex(index, fill_value=self.floor)
+            + counts.reindex(index, fill_value=floor)
+        )
+        merged_errors = (
+            self.errors.reindex(index, fill_value=self.floor)
+            + errors.reindex(index, fill_value=floor)
+        )
+        floor = self.floor + floor
+        if len(merged) > self.capacity:
+            merged = merged.sort_values(ascending=False, kind="stable")
+            floor = max(floor, int(merged.iloc[self.capacity]))
+            merged = merged.iloc[:self.capacity]
+        self.counts = merged.astype("int64")
+        self.errors = merged_errors.reindex(merged.index).astype("int64")
+        self.floor = floor
+
+    def update(self, values: pd.Series) -> None:
+        counts = pd.Series(values).value_counts(sort=True)
+        floor = 0
+        if len(counts) > self.capacity:
+            floor = int(counts.iloc[self.capacity])
+            counts = counts.iloc[:self.capacity]
+        self._combine(counts.astype("int64"), pd.Series(floor, index=counts.index, dtype="int64"), floor)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        self._combine(other.counts, other.errors, other.floor)
+
+    def top(self, k: int = None) -> list:
+        """
+        Lista [(valor, contagem estimada, erro máximo)] dos k valores mais frequentes.
+        """
+        top = self.counts.sort_values(ascending=False, kind="stable").head(k or self.k)
+        return [(value, int(count), int(self.errors[value])) for value, count in top.items()]
+
+
+class ColumnStats:
+    """
+    Estatísticas de uma coluna: nulos, distintos (HLL), top-k e, para valores numéricos,
+    média/variância (Welford) e quantis (t-digest).
+
+    Valores nulos e textos vazios contam como nulos. Os demais entram nos sketches na forma
+    normalizada em texto; os que forem numéricos também alimentam as métricas numéricas.
+    """
+
+    def __init__(self, name: str, compression: int = DEFAULT_COMPRESSION,
+                 precision: int = DEFAULT_HLL_PRECISION, top_k: int = DEFAULT_TOP_K):
+        self.name = name
+        self.rows = 0
+        self.nulls = 0
+        self.moments = RunningMoments()
+        self.quantiles = QuantileSketch(compression)
+        self.distinct = HyperLogLog(precision)
+        self.frequent = SpaceSaving(top_k)
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        present = ~null_mask(series)
+        self.nulls += int(len(series) - present.sum())
+
+        values = pd.Series(normalize_values(series)[present], dtype=object)
+        self.distinct.update(values)
+        self.frequent.update(values)
+
+        if pd.api.types.is_numeric_dtype(series):
+            numbers = series.to_numpy(dtype=float)[present]
+        else:
+            numbers = pd.to_numeric(values.str.replace(",", ".", regex=False), errors="coerce").to_numpy()
+        numbers = numbers[np.isfinite(numbers)]
+        self.moments.update(numbers)
+        self.quantiles.update(numbers)
+
+    def merge(self, other: "ColumnStats") -> None:
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+
+    def result(self, quantiles=DEFAULT_QUANTILES) -> dict:
+        non_null = self.rows - self.nulls
+        distinct = min(round(self.distinct.estimate()), non_null)
+        result = {
+              "COLUNA": self.name
+            , "LINHAS": self.rows
+            , "NULOS": self.nulls
+            , "PERC_NULOS": self.nulls / self.rows if self.rows else 0.0
+            , "DISTINTOS_ESTIMADOS": distinct
+            , "PERC_UNICOS": distinct / non_null if non_null else 0.0
+            , "NUMERICOS": self.moments.count
+            , "MEDIA": self.moments.mean if self.moments.count else None
+            , "DESVIO_PADRAO": self.moments.std if self.moments.count > 1 else None
+            , "MINIMO": self.moments.min if self.moments.count else None
+            , "MAXIMO": self.moments.max if self.moments.count else None
+        }
+        for q in quantiles:
+            result[f"P{round(q * 100)}"] = self.quantiles.quantile(q) if self.moments.count else None
+        # Apenas valores com frequência garantida (contagem maior que o erro máximo)
+        result["TOP_VALORES"] = "; ".join(
+            f"{value} ({count})" for value, count, error in self.frequent.top() if count > error
+        )
+        return result
+
+
+class StatsCollector:
+    """
+    Coleta as estatísticas de todas as colunas de uma origem, bloco a bloco.
+    """
+
+    def __init__(self, columns: list = None, **options):
+        self.columns = columns
+        self.options = options
+        self.stats = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        for col in (self.columns or chunk.columns):
+            if col not in self.stats:
+                self.stats[col] = ColumnStats(col, **self.options)
+            self.stats[col].update(chunk[col])
+
+    def merge(self, other: "StatsCollector") -> None:
+        for col, stats in other.stats.items():
+            if col in self.stats:
+                self.stats[col].merge(stats)
+            else:
+                self.stats[col] = stats
+
+    def result(self) -> pd.DataFrame:
+        """
+        Uma linha por coluna, na ordem em que as colunas foram vistas.
+        """
+        return pd.DataFrame([stats.result() for stats in self.stats.values()])
+
+
+def collect_stats(chunks: Iterable[pd.DataFrame], columns: list = None, **options) -> StatsCollector:
+    """
+    Lê os blocos uma única vez e retorna o coletor com as estatísticas de cada coluna.
+    """
+    collector = StatsCollector(columns, **options)
+    for chunk in chunks:
+        collector.update(chunk)
+    return collector
+
+
+def validate_unique_percentage(stats: pd.DataFrame, minimum: float) -> pd.DataFrame:
+    """
+    Colunas cuja proporção de valores distintos (sobre os não nulos) fica abaixo de `minimum`.
+    """
+    return stats[stats["PERC_UNICOS"] < minimum]
@@ -0,0 +1,76 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from py_processor.compact import load_compact
+from py_processor.loader import load_file
+from py_processor.utils.tratamentos import normalize_values
+
+
+def _source(tmp_path, name, rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+          "MES_REFERENCIA": rng.choice(["202401", "202402", "202403"], rows)
+        , "UF": rng.choice(["SP", "RJ", "MG", "BA", "PR", "RS"], rows)
+        , "NOME_MUNICIPIO": rng.choice([f"MUNICIPIO {i}" for i in range(50)], rows)
+        , "NIS_FAVORECIDO": [f"{i:011d}" for i in rng.permutation(rows)]
+        , "VALOR_PARCELA": rng.choice(["600,00", "650,00", "150,00"], rows)
+    })
+    df.loc[::97, "UF"] = None
+    df.to_csv(tmp_path / f"{name}.csv", sep=";", index=False)
+    return {"type": "file", "file_path": str(tmp_path / f"{name}.csv"), "separator": ";", "dtype": "str",
+            "key_columns": ["MES_REFERENCIA", "NIS_FAVORECIDO"]}
+
+
+def _config(tmp_path):
+    return {
+          "sources": {"origemA": _source(tmp_path, "a", 100_000, 0), "origemB": _source(tmp_path, "b", 20_000, 1)}
+        , "cache": {"enabled": False}
+        , "processing": {"chunk_size": 1_000}
+    }
+
+
+def _peak(load, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        df = load(*args, **kwargs)
+        return df, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_load_compact_matches_load_file_with_less_memory(tmp_path):
+    config = _config(tmp_path)
+    plain, plain_peak = _peak(load_file, config, "origemA")
+    compact, compact_peak = _peak(load_compact, config, "origemA", sample_rows=4_000)
+
+    assert list(compact.columns) == list(plain.columns)
+    for col in plain.columns:
+        assert (normalize_values(compact[col]) == normalize_values(plain[col])).all(), col
+
+    assert {col for col in compact.columns if isinstance(compact[col].dtype, pd.CategoricalDtype)} == {
+        "MES_REFERENCIA", "UF", "NOME_MUNICIPIO", "VALOR_PARCELA"}
+    assert str(compact["NIS_FAVORECIDO"].dtype) == "string"
+
+    # Blocos convertidos durante a leitura: sem a origem inteira em strings Python
+    assert compact.memory_usage(deep=True).sum() < plain.memory_usage(deep=True).sum() / 3
+    assert compact_peak < plain_peak / 3
+
+
+def test_load_compact_shares_dictionaries_with_the_reference(tmp_path):
+    config = _config(tmp_path)
+    b = pd.read_csv(tmp_path / "b.csv", sep=";", dtype=str)
+    b.loc[0, "UF"] = "AC"
+    b.to_csv(tmp_path / "b.csv", sep=";", index=False)
+
+    df_a = load_compact(config, "origemA", sample_rows=4_000)
+    before = normalize_values(df_a["UF"])
+    df_b = load_compact(config, "origemB", sample_rows=4_000, reference=df_a)
+
+    for col in ("MES_REFERENCIA", "UF", "NOME_MUNICIPIO", "VALOR_PARCELA"):
+        assert df_a[col].cat.categories.equals(df_b[col].cat.categories), col
+    assert "AC" in df_a["UF"].cat.categories and df_b.loc[0, "UF"] == "AC"
+    # Categorias da referência ampliadas sem mudar os valores dela
+    assert (normalize_values(df_a["UF"]) == before).all()
+    assert (normalize_values(df_b["UF"]) == normalize_values(load_file(config, "origemB")["UF"])).all()
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from py_processor.key_index import KeyIndex
+from py_processor.partitioning import partition_ids
+from quality.duplicates import analyze_duplicates, partition_duplicates, merge_duplicates, GROUP_COLUMN, ROW_COLUMN
+
+KEY_COLUMNS = ["MES", "NIS"]
+
+
+def _frame(seed, rows=3000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+          "MES": rng.integers(1, 3, rows).astype(str)
+        , "NIS": rng.integers(0, 1500, rows).astype(str)
+        , "VALOR": rng.integers(0, 3, rows).astype(str)
+    })
+
+
+def test_shared_index_numbers_groups_like_standalone():
+    a, b = _frame(0), _frame(1)
+    key_index = KeyIndex.build(KEY_COLUMNS, a, b)
+
+    for side, df in enumerate((a, b)):
+        shared = analyze_duplicates(df, KEY_COLUMNS, key_index=key_index, side=side, fingerprints=True)
+        standalone = analyze_duplicates(df, KEY_COLUMNS, fingerprints=True)
+        assert not standalone.empty
+        pd.testing.assert_frame_equal(shared, standalone)
+
+    # Grupo 1 é a chave duplicada que aparece primeiro na própria origem
+    groups = analyze_duplicates(b, KEY_COLUMNS)
+    assert groups[ROW_COLUMN].iloc[0] == groups[ROW_COLUMN].min()
+    assert groups.groupby(GROUP_COLUMN)[ROW_COLUMN].min().is_monotonic_increasing
+
+
+def test_merged_partitions_match_the_whole_source():
+    df = _frame(2)
+    ids = partition_ids(df, KEY_COLUMNS, 4)
+    parts = [partition_duplicates(df[ids == partition].copy(), KEY_COLUMNS) for partition in range(4)]
+
+    pd.testing.assert_frame_equal(merge_duplicates(parts), analyze_duplicates(df, KEY_COLUMNS, fingerprints=True))
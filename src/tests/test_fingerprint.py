@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import main
+from py_processor.loader import load_file
+
+KEY_COLUMNS = ["NIS"]
+
+
+def _config(tmp_path):
+    df = pd.DataFrame({"NIS": np.arange(500).astype(str), "VALOR": np.arange(500).astype(str)})
+    df.to_csv(tmp_path / "a.csv", sep=";", index=False)
+    return {
+          "sources": {"origemA": {"type": "file", "file_path": str(tmp_path / "a.csv"), "separator": ";", "dtype": "str"}}
+        , "cache": {"enabled": False}
+        , "comparison": {"fingerprint_dir": str(tmp_path / "fingerprints")}
+    }
+
+
+def test_stored_fingerprints_are_reused_until_the_file_changes(tmp_path, monkeypatch):
+    config = _config(tmp_path)
+    df = load_file(config, "origemA")
+    first = main.fingerprint(config, df, KEY_COLUMNS, "origemA")
+
+    calls = []
+    compute = main.compute_fingerprints
+    monkeypatch.setattr(main, "compute_fingerprints", lambda *args: calls.append(args) or compute(*args))
+    reused = main.fingerprint(config, df, KEY_COLUMNS, "origemA")
+    assert not calls
+    pd.testing.assert_frame_equal(reused, first)
+
+    # Arquivo alterado: a chave da origem muda e os fingerprints são recalculados
+    path = tmp_path / "a.csv"
+    path.write_text(path.read_text().replace("\n499;499", "\n499;x"))
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    changed = main.fingerprint(config, load_file(config, "origemA"), KEY_COLUMNS, "origemA")
+    assert len(calls) == 1
+    assert changed["FINGERPRINT"].iloc[-1] != first["FINGERPRINT"].iloc[-1]
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from py_processor.compare import compare_sources
+from py_processor.incremental import SnapshotStore, incremental_compare
+from py_processor.loader import load_file
+from py_processor.pushdown import PushdownSource, resolve_value_columns
+
+KEY_COLUMNS = ["MES", "NIS"]
+
+
+def _write(tmp_path, a, b):
+    a.to_csv(tmp_path / "a.csv", sep=";", index=False)
+    b.to_csv(tmp_path / "b.csv", sep=";", index=False)
+
+
+def _sorted(df):
+    return df.astype(str).sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def _check(config, store):
+    sources = {name: PushdownSource(config, name) for name in ("origemA", "origemB")}
+    value_columns = resolve_value_columns(sources["origemA"], sources["origemB"], KEY_COLUMNS)
+    _, results = incremental_compare(sources, KEY_COLUMNS, value_columns, store, engine="pandas")
+    memory = compare_sources(load_file(config, "origemA"), load_file(config, "origemB"), KEY_COLUMNS, engine="pandas")
+    for result, expected in zip(results, memory):
+        pd.testing.assert_frame_equal(_sorted(result), _sorted(expected))
+
+
+def test_incremental_matches_memory_mode_with_duplicate_keys(tmp_path):
+    rng = np.random.default_rng(0)
+    a = pd.DataFrame({
+          "MES": rng.integers(1, 3, 2000).astype(str)
+        , "NIS": rng.integers(0, 800, 2000).astype(str)
+        , "VALOR": rng.integers(0, 5, 2000).astype(str)
+    })
+    b = a.sample(frac=0.9, random_state=1).reset_index(drop=True)
+    b = pd.concat([b, a.drop_duplicates(KEY_COLUMNS, keep="last").head(40)], ignore_index=True)
+    _write(tmp_path, a, b)
+
+    source = lambda name: {"type": "file", "file_path": str(tmp_path / name), "separator": ";", "dtype": "str"}
+    config = {"sources": {"origemA": source("a.csv"), "origemB": source("b.csv")}, "cache": {"enabled": False}}
+    store = SnapshotStore(tmp_path / "snapshots")
+
+    # Primeira execução (sem snapshot) e execução seguinte, com parte das chaves alteradas
+    _check(config, store)
+    b.loc[:50, "VALOR"] = "x"
+    _write(tmp_path, a, b)
+    _check(config, store)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+KEY_COLUMNS = ["MES", "NIS"]
+
+
+class _Output:
+    # Acumula os resultados gravados por nome, como o ResultWriter
+    def __init__(self):
+        self.results = {}
+
+    def write(self, name, df):
+        self.results.setdefault(name, []).append(df)
+
+    def frames(self):
+        return {name: pd.concat(parts, ignore_index=True) for name, parts in self.results.items()}
+
+
+def _config(tmp_path, mode, **processing):
+    rng = np.random.default_rng(0)
+    a = pd.DataFrame({
+          "MES": rng.integers(1, 3, 3000).astype(str)
+        , "NIS": rng.integers(0, 1200, 3000).astype(str)
+        , "UF": rng.choice(["SP", "RJ", "MG"], 3000)
+        , "VALOR": rng.integers(0, 5, 3000).astype(str)
+    })
+    b = a.sample(frac=0.9, random_state=1).reset_index(drop=True)
+    b.loc[:50, "VALOR"] = "x"
+    b = pd.concat([b, pd.DataFrame({"MES": ["9"], "NIS": ["novo"], "UF": ["SP"], "VALOR": ["1"]})], ignore_index=True)
+    a.to_csv(tmp_path / "a.csv", sep=";", index=False)
+    b.to_csv(tmp_path / "b.csv", sep=";", index=False)
+
+    source = lambda name: {"type": "file", "file_path": str(tmp_path / name), "separator": ";", "dtype": "str",
+                           "key_columns": KEY_COLUMNS}
+    return {
+          "sources": {"origemA": source("a.csv"), "origemB": source("b.csv")}
+        , "cache": {"enabled": False}
+        , "comparison": {"engine": "pandas"}
+        , "processing": {"mode": mode, "chunk_size": 700, "partitions": 3, **processing}
+    }
+
+
+def _run(config):
+    output = _Output()
+    main.run_comparison(config, output)
+    return output.frames()
+
+
+@pytest.mark.parametrize("mode, processing, ordered", [
+      ("memory", {"compact": True}, True)
+    , ("memory", {"backend": "duckdb"}, True)
+    , ("partitioned", {}, False)
+    , ("parallel", {"parallel_processing": 2}, False)
+])
+def test_mode_matches_memory_mode(tmp_path, mode, processing, ordered):
+    expected = _run(_config(tmp_path, "memory"))
+    result = _run(_config(tmp_path, mode, **processing))
+
+    assert set(result) == set(expected)
+    for name, df in expected.items():
+        assert not df.empty
+        got = result[name].astype(str)
+        df = df.astype(str)
+        if name.endswith("_duplicados"):
+            # Duplicados: mesmas colunas, grupos e ordem em todos os modos
+            pd.testing.assert_frame_equal(got, df)
+        elif ordered:
+            pd.testing.assert_frame_equal(got, df)
+        else:
+            # Partições: mesmas linhas, na ordem das partições
+            pd.testing.assert_frame_equal(got.sort_values(list(got.columns), ignore_index=True),
+                                          df.sort_values(list(df.columns), ignore_index=True))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from py_processor.compare import compare_sources
+from py_processor.loader import load_file
+from py_processor.pushdown import PushdownSource, resolve_value_columns, pushdown_compare, duplicate_rows
+from quality.duplicates import analyze_duplicates, ROW_COLUMN
+
+KEY_COLUMNS = ["MES", "NIS"]
+
+
+def _sources(tmp_path):
+    rng = np.random.default_rng(0)
+    a = pd.DataFrame({
+          "MES": rng.integers(1, 3, 2000).astype(str)
+        , "NIS": rng.integers(0, 800, 2000).astype(str)
+        , "VALOR": rng.integers(0, 5, 2000).astype(str)
+    })
+    b = a.sample(frac=0.9, random_state=1).reset_index(drop=True)
+    b.loc[:30, "VALOR"] = "x"
+    # Chaves de A repetidas em B com o mesmo valor da última ocorrência em A
+    b = pd.concat([b, a.drop_duplicates(KEY_COLUMNS, keep="last").head(40)], ignore_index=True)
+    a.to_csv(tmp_path / "a.csv", sep=";", index=False)
+    b.to_csv(tmp_path / "b.csv", sep=";", index=False)
+
+    source = lambda name: {"type": "file", "file_path": str(tmp_path / name), "separator": ";", "dtype": "str"}
+    return {
+          "sources": {"origemA": source("a.csv"), "origemB": source("b.csv")}
+        , "cache": {"enabled": False}
+    }
+
+
+def _sorted(df):
+    return df.astype(str).sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def test_pushdown_matches_memory_mode_with_duplicate_keys(tmp_path):
+    config = _sources(tmp_path)
+    sources = {name: PushdownSource(config, name) for name in ("origemA", "origemB")}
+    value_columns = resolve_value_columns(sources["origemA"], sources["origemB"], KEY_COLUMNS)
+    hashes = {name: source.key_hashes(KEY_COLUMNS, value_columns) for name, source in sources.items()}
+
+    pushdown = pushdown_compare(sources["origemA"], sources["origemB"], KEY_COLUMNS,
+                                hashes["origemA"], hashes["origemB"], engine="pandas")
+    memory = compare_sources(load_file(config, "origemA"), load_file(config, "origemB"), KEY_COLUMNS, engine="pandas")
+
+    assert not memory[2].empty
+    for result, expected in zip(pushdown, memory):
+        pd.testing.assert_frame_equal(_sorted(result), _sorted(expected))
+
+
+def test_pushdown_duplicates_are_full_rows(tmp_path):
+    config = _sources(tmp_path)
+    source = PushdownSource(config, "origemB")
+    hashes = source.key_hashes(KEY_COLUMNS, ["VALOR"])
+
+    duplicates = duplicate_rows(source, hashes, KEY_COLUMNS)
+    expected = analyze_duplicates(load_file(config, "origemB"), KEY_COLUMNS).drop(columns=ROW_COLUMN)
+
+    assert not expected.empty
+    assert list(duplicates.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(_sorted(duplicates), _sorted(expected))
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pytest
+
+from py_processor.incremental import DEFAULT_SNAPSHOT_DIR, get_snapshot_store
+from py_processor.loader import resolve_path
+from py_processor.scheduler import get_jobs, job_config
+
+
+def _config(**sections):
+    source = {"type": "file", "file_path": "a.csv", "key_columns": ["NIS"]}
+    return {
+          "sources": {"origemA": source, "origemB": dict(source), "origemC": dict(source)}
+        , "jobs": [
+              {"name": "a_x_b", "source_a": "origemA", "source_b": "origemB"}
+            , {"name": "a_x_c", "source_a": "origemA", "source_b": "origemC"}
+        ]
+        , **sections
+    }
+
+
+def test_job_snapshots_default_to_a_folder_per_job():
+    config = _config(processing={"mode": "incremental"})
+    dirs = [job_config(config, job)["incremental"]["snapshot_dir"] for job in config["jobs"]]
+
+    assert dirs == [str(resolve_path(DEFAULT_SNAPSHOT_DIR) / "a_x_b"), str(resolve_path(DEFAULT_SNAPSHOT_DIR) / "a_x_c")]
+    assert "incremental" not in config
+
+
+def test_job_snapshot_stores_are_distinct(tmp_path):
+    config = _config(incremental={"snapshot_dir": str(tmp_path)})
+    stores = [get_snapshot_store(job_config(config, job)) for job in config["jobs"]]
+
+    assert [store.directory for store in stores] == [tmp_path / "a_x_b", tmp_path / "a_x_c"]
+    assert all(Path(store.directory).is_dir() for store in stores)
+    assert config["incremental"]["snapshot_dir"] == str(tmp_path)
+
+
+def test_jobs_reject_memory_governor_overrides():
+    config = _config(processing={"memory_limit": "2GB", "chunk_size": 10000})
+    config["jobs"][0]["processing"] = {"mode": "partitioned", "memory_limit": "2GB"}
+    assert get_jobs(config) == config["jobs"]
+
+    config["jobs"][1]["processing"] = {"chunk_size": 500}
+    with pytest.raises(ValueError, match="a_x_c.*chunk_size"):
+        get_jobs(config)
@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+from py_processor.utils.tratamentos import classify_values, infer_column_types
+
+
+@pytest.mark.parametrize("values, kind, fmt", [
+      (["1", "-2", "30"], "integer", None)
+    , (["1.5", "-2", "3", "10"], "decimal", ".")
+    , (["1,5", "2", "3"], "decimal", ",")
+    , (["2024-01-31T10:00:00", "2024-02-01T11:30:00"], "datetime", "%Y-%m-%dT%H:%M:%S")
+    , (["2024-01-31 10:00:00", "2024-02-01 11:30:00"], "datetime", "%Y-%m-%d %H:%M:%S")
+    , (["007", "012"], "string", None)
+])
+def test_classify_values(values, kind, fmt):
+    result = classify_values(values)
+    assert (result["type"], result["format"]) == (kind, fmt)
+
+
+def test_infer_column_types_mixed_numbers_are_numeric():
+    df = pd.DataFrame({"VALOR": ["1.5", "-2", "3", "10"], "NOME": ["a", "b", None, "c"]})
+    assert infer_column_types(df) == {"VALOR": "numeric", "NOME": "string"}
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from py_processor.loader import load_file, iter_file
+from py_processor.type_inference import ReservoirSample, infer_types
+
+
+def _fail(*args):
+    raise AssertionError("inferência refeita com o cache válido")
+
+
+def _chunks(df, size):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def test_reservoir_sample_is_uniform_over_the_stream():
+    df = pd.DataFrame({"ID": np.arange(100_000)})
+    means = []
+    for seed in range(20):
+        reservoir = ReservoirSample(size=500, seed=seed)
+        for chunk in _chunks(df, 7_000):
+            reservoir.update(chunk)
+        sample = reservoir.sample["ID"].astype(int)
+        assert reservoir.seen == len(df) and len(sample) == 500 and sample.is_unique
+        means.append(sample.mean())
+
+    # Linhas de todo o fluxo (não apenas do início), com média próxima da média da origem
+    assert abs(np.mean(means) - df["ID"].mean()) < 0.02 * len(df)
+
+
+def test_infer_types_on_a_sorted_stream():
+    # Arquivo ordenado: as primeiras linhas parecem inteiras, as últimas têm decimais e textos
+    df = pd.DataFrame({
+          "VALOR": [str(i) for i in range(5000)] + [f"{i},5" for i in range(5000)]
+        , "DATA": ["2024-01-31"] * 10000
+        , "NOME": ["1"] * 5000 + ["maria"] * 5000
+    })
+    types = infer_types(_chunks(df, 1000), sample_size=1000)
+
+    assert (types["VALOR"]["type"], types["VALOR"]["format"]) == ("decimal", ",")
+    assert (types["DATA"]["type"], types["DATA"]["format"]) == ("datetime", "%Y-%m-%d")
+    assert types["NOME"]["type"] == "string"
+    assert types["VALOR"]["confidence"] == 1.0
+
+
+def test_infer_types_option_converts_and_caches(tmp_path, monkeypatch):
+    pd.DataFrame({
+          "NIS": ["001", "002", "003"]
+        , "VALOR": ["1,5", "2", "3,25"]
+        , "DATA": ["2024-01-31", "2024-02-01", "2024-02-29"]
+    }).to_csv(tmp_path / "a.csv", sep=";", index=False)
+    config = {
+          "sources": {"origemA": {"type": "file", "file_path": str(tmp_path / "a.csv"), "separator": ";",
+                                  "dtype": "str", "infer_types": True}}
+        , "cache": {"enabled": False, "directory": str(tmp_path / "cache")}
+    }
+
+    df = load_file(config, "origemA")
+    assert df["NIS"].tolist() == ["001", "002", "003"]
+    assert str(df["VALOR"].dtype) == "Float64" and df["VALOR"].tolist() == [1.5, 2.0, 3.25]
+    assert pd.api.types.is_datetime64_any_dtype(df["DATA"])
+    assert len(list((tmp_path / "cache" / "types").glob("*.json"))) == 1
+
+    # Tipos lidos do cache: a leitura em blocos não refaz a inferência
+    monkeypatch.setattr("py_processor.type_inference.infer_types", _fail)
+    chunks = pd.concat(iter_file(config, "origemA", 2), ignore_index=True)
+    pd.testing.assert_frame_equal(chunks, df)